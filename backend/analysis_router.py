@@ -7,6 +7,9 @@ from fastapi import APIRouter, Query, HTTPException
 from fastapi.responses import JSONResponse
 
 from analyzers.factory import get_analyzer
+from metrics.centrality import parse_metrics
+from metrics.csr_graph import GRAPH_BACKENDS
+from metrics.memo import RESULT_MEMO
 
 from utils import (
     apply_comparison_filters,
@@ -48,6 +51,15 @@ async def analyze_network(
     message_weights: Optional[str] = Query(None),
     is_for_save: bool = Query(False),
     keywords: Optional[str] = Query(None),
+    sample_seed: Optional[int] = Query(None),
+    approximate: bool = Query(False),
+    centrality_samples: Optional[int] = Query(None),
+    metrics: Optional[str] = Query(None),
+    power_tolerance: Optional[float] = Query(None, gt=0),
+    incremental: bool = Query(False),
+    parallel_betweenness: bool = Query(False),
+    graph_backend: str = Query("networkx"),
+    deadline_ms: Optional[int] = Query(None, gt=0),
 
 ):
     
@@ -61,6 +73,12 @@ async def analyze_network(
             logger.warning(f"Invalid message_weights format: {message_weights}, error: {e}")
             parsed_message_weights = [0.5, 0.3, 0.2] if history_length == 3 else [0.7, 0.3]
 
+    try:
+        parse_metrics(metrics)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if graph_backend not in GRAPH_BACKENDS:
+        raise HTTPException(status_code=400, detail=f"Unknown graph backend: {graph_backend}")
 
     analyzer = get_analyzer(platform)
     return await analyzer.analyze(
@@ -86,10 +104,102 @@ async def analyze_network(
         history_length=history_length,
         message_weights=parsed_message_weights,
         is_for_save=is_for_save,
-        keywords=keywords
+        keywords=keywords,
+        sample_seed=sample_seed,
+        approximate=approximate,
+        centrality_samples=centrality_samples,
+        metrics=metrics,
+        power_tolerance=power_tolerance,
+        incremental=incremental,
+        parallel_betweenness=parallel_betweenness,
+        graph_backend=graph_backend,
+        deadline_ms=deadline_ms
+    )
+
+
+@router.get("/analyze/network/{filename}/metric/{name}")
+async def analyze_network_metric(
+    filename: str,
+    name: str,
+    platform: str = Query("whatsapp"),
+    limit: Optional[int] = Query(None),
+    limit_type: str = Query("first"),
+    min_length: Optional[int] = Query(None),
+    max_length: Optional[int] = Query(None),
+    min_messages: Optional[int] = Query(None),
+    max_messages: Optional[int] = Query(None),
+    active_users: Optional[int] = Query(None),
+    selected_users: Optional[str] = Query(None),
+    username: Optional[str] = Query(None),
+    anonymize: bool = Query(False),
+    directed: bool = Query(False),
+    use_history: bool = Query(False),
+    start_date: Optional[str] = Query(None),
+    end_date: Optional[str] = Query(None),
+    start_time: Optional[str] = Query(None),
+    end_time: Optional[str] = Query(None),
+    history_length: int = Query(3),
+    message_weights: Optional[str] = Query(None),
+    keywords: Optional[str] = Query(None),
+    sample_seed: Optional[int] = Query(None),
+    approximate: bool = Query(False),
+    centrality_samples: Optional[int] = Query(None),
+    power_tolerance: Optional[float] = Query(None, gt=0),
+    graph_backend: str = Query("networkx"),
+    deadline_ms: Optional[int] = Query(None, gt=0),
+):
+    parsed_message_weights = None
+    if message_weights:
+        try:
+            parsed_message_weights = json.loads(message_weights)
+            if not isinstance(parsed_message_weights, list) or not all(isinstance(x, (int, float)) for x in parsed_message_weights):
+                raise ValueError("message_weights must be a list of numbers")
+        except (json.JSONDecodeError, ValueError) as e:
+            logger.warning(f"Invalid message_weights format: {message_weights}, error: {e}")
+            parsed_message_weights = [0.5, 0.3, 0.2] if history_length == 3 else [0.7, 0.3]
+
+    if graph_backend not in GRAPH_BACKENDS:
+        raise HTTPException(status_code=400, detail=f"Unknown graph backend: {graph_backend}")
+
+    analyzer = get_analyzer(platform)
+    return await analyzer.compute_metric(
+        filename=filename,
+        metric=name,
+        platform=platform,
+        limit=limit,
+        limit_type=limit_type,
+        min_length=min_length,
+        max_length=max_length,
+        min_messages=min_messages,
+        max_messages=max_messages,
+        active_users=active_users,
+        selected_users=selected_users,
+        username=username,
+        anonymize=anonymize,
+        directed=directed,
+        use_history=use_history,
+        start_date=start_date,
+        end_date=end_date,
+        start_time=start_time,
+        end_time=end_time,
+        history_length=history_length,
+        message_weights=parsed_message_weights,
+        keywords=keywords,
+        sample_seed=sample_seed,
+        approximate=approximate,
+        centrality_samples=centrality_samples,
+        power_tolerance=power_tolerance,
+        graph_backend=graph_backend,
+        deadline_ms=deadline_ms
     )
 
 
+@router.get("/analyze/memo-stats")
+async def analyze_memo_stats():
+    """Hit and miss counters of the graph-fingerprint result memo."""
+    return JSONResponse(content=RESULT_MEMO.stats(), status_code=200)
+
+
 @router.get("/analyze/compare-networks")
 async def analyze_network_comparison(
         original_filename: str = Query(...),
@@ -185,7 +295,18 @@ async def analyze_communities(
     algorithm: str = Query("louvain"),
     history_length: int = Query(3),
     message_weights: Optional[str] = Query(None),
+    sample_seed: Optional[int] = Query(None),
+    approximate: bool = Query(False),
+    centrality_samples: Optional[int] = Query(None),
+    deadline_ms: Optional[int] = Query(None, gt=0),
+    num_communities: Optional[int] = Query(None, ge=1),
+    seed: Optional[int] = Query(None),
+    resolution: Optional[float] = Query(None, gt=0),
+    graph_backend: str = Query("networkx"),
 ):
+    if graph_backend not in GRAPH_BACKENDS:
+        raise HTTPException(status_code=400, detail=f"Unknown graph backend: {graph_backend}")
+
     parsed_message_weights = None
     if message_weights:
         try:
@@ -220,5 +341,13 @@ async def analyze_communities(
         end_time=end_time,
         algorithm=algorithm,
         history_length=history_length,
-        message_weights=parsed_message_weights
+        message_weights=parsed_message_weights,
+        sample_seed=sample_seed,
+        approximate=approximate,
+        centrality_samples=centrality_samples,
+        deadline_ms=deadline_ms,
+        num_communities=num_communities,
+        seed=seed,
+        resolution=resolution,
+        graph_backend=graph_backend
     )
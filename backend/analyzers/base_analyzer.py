@@ -8,3 +8,7 @@ class BaseAnalyzer(ABC):
     @abstractmethod
     async def detect_communities(self, filename: str, **kwargs):
         pass
+
+    @abstractmethod
+    async def compute_metric(self, filename: str, metric: str, **kwargs):
+        pass
@@ -1,10 +1,12 @@
 import os
 import logging
-import networkx as nx
 from fastapi.responses import JSONResponse
 from fastapi import HTTPException
-from graph_builder import build_graph_from_txt
+from graph_builder import build_graph_from_txt, compute_graph_metric
+from metrics.communities import COMMUNITY_ALGORITHMS, partition_report, partition_settings
+from metrics.community_stats import COMMUNITY_STAT_DIGITS
 from analyzers.base_analyzer import BaseAnalyzer
+from compute_service import COMPUTE
 
 
 UPLOAD_FOLDER = "uploads"
@@ -21,32 +23,54 @@ class WhatsAppAnalyzer(BaseAnalyzer):
 
             kwargs.pop("platform", None)
 
-            graph_data = build_graph_from_txt(txt_path, platform="whatsapp", **kwargs)
+            graph_data = await COMPUTE.run("graph", build_graph_from_txt, txt_path, platform="whatsapp", **kwargs)
 
             return JSONResponse({
                 "nodes": graph_data["nodes"],
                 "links": graph_data["links"],
                 "messages": graph_data.get("messages") if kwargs.get("is_for_save") else None,
-                "is_connected": graph_data.get("is_connected", False)
+                "is_connected": graph_data.get("is_connected", False),
+                "sample_seed": graph_data.get("sample_seed"),
+                "convergence": graph_data.get("convergence", {}),
+                "timeline": graph_data.get("timeline"),
+                "plan": graph_data["plan"]
             })
 
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"[WhatsApp] analyze_network error: {e}")
             raise HTTPException(status_code=500, detail=str(e))
 
+    async def compute_metric(self, filename: str, metric: str, **kwargs):
+        txt_path = os.path.join(UPLOAD_FOLDER, filename)
+        if not os.path.exists(txt_path):
+            raise HTTPException(status_code=404, detail=f"File '{filename}' not found")
+
+        kwargs.pop("platform", None)
+        try:
+            return JSONResponse(await COMPUTE.run("graph", compute_graph_metric, txt_path, metric, platform="whatsapp", **kwargs))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"[WhatsApp] compute_metric error: {e}")
+            raise HTTPException(status_code=500, detail=str(e))
+
     async def detect_communities(self, filename: str, **kwargs):
             try:
-                from community import community_louvain
-                from networkx.algorithms import community as nx_community
-
                 logger.info(f"[WhatsApp] Detecting communities in: {filename}")
                 kwargs.pop("platform", None)  
+                num_communities = kwargs.pop("num_communities", None)
+                seed = kwargs.pop("seed", None)
+                resolution = kwargs.pop("resolution", None)
 
                 txt_path = os.path.join(UPLOAD_FOLDER, filename)
                 if not os.path.exists(txt_path):
                     raise HTTPException(status_code=404, detail=f"File {txt_path} not found")
 
-                graph_data = build_graph_from_txt(txt_path, platform="whatsapp", **{k: v for k, v in kwargs.items() if k != "algorithm"})
+                graph_data = await COMPUTE.run("graph", build_graph_from_txt, txt_path, platform="whatsapp", **{k: v for k, v in kwargs.items() if k != "algorithm"})
 
                 if not graph_data["nodes"] or not graph_data["links"]:
                     return JSONResponse({
@@ -60,71 +84,47 @@ class WhatsAppAnalyzer(BaseAnalyzer):
                         "warning": "No data found for community analysis"
                     })
 
-                G = nx.Graph()
-                for node in graph_data["nodes"]:
-                    G.add_node(node["id"], **{k: v for k, v in node.items() if k != "id"})
-                for link in graph_data["links"]:
-                    G.add_edge(link["source"], link["target"], weight=link.get("weight", 1))
-
                 algorithm = kwargs.get("algorithm", "louvain")
-                communities = {}
-                node_communities = {}
-
-                if algorithm == "louvain":
-                    partition = community_louvain.best_partition(G)
-                    node_communities = partition
-                    for node, cid in partition.items():
-                        communities.setdefault(cid, []).append(node)
-                elif algorithm == "girvan_newman":
-                    communities_iter = nx_community.girvan_newman(G)
-                    communities_list = list(next(communities_iter))
-                    for i, community in enumerate(communities_list):
-                        communities[i] = list(community)
-                        for node in community:
-                            node_communities[node] = i
-                elif algorithm == "greedy_modularity":
-                    communities_list = list(nx_community.greedy_modularity_communities(G))
-                    for i, community in enumerate(communities_list):
-                        communities[i] = list(community)
-                        for node in community:
-                            node_communities[node] = i
-                else:
+                if algorithm not in COMMUNITY_ALGORITHMS:
                     raise HTTPException(status_code=400, detail=f"Unknown algorithm: {algorithm}")
 
+                deadline_ms = kwargs.get("deadline_ms")
+                if deadline_ms is not None:
+                    deadline_ms = max(0.0, deadline_ms - graph_data["plan"]["elapsed_ms"])
+                report = await COMPUTE.run(
+                    "communities", partition_report, graph_data["nodes"], graph_data["links"], algorithm,
+                    num_communities, seed, resolution, deadline_ms, digits=COMMUNITY_STAT_DIGITS,
+                    backend=kwargs.get("graph_backend", "networkx")
+                )
+                algorithm = report["plan"]["algorithm"]
+                communities, node_communities = report["communities"], report["node_communities"]
+
                 for node in graph_data["nodes"]:
                     if node["id"] in node_communities:
                         node["community"] = node_communities[node["id"]]
 
-                communities_list = []
-                for cid, nodes in communities.items():
-                    comm_nodes = [n for n in graph_data["nodes"] if n["id"] in nodes]
-                    avg_betweenness = sum(n["betweenness"] for n in comm_nodes) / len(comm_nodes) if comm_nodes else 0
-                    avg_pagerank = sum(n["pagerank"] for n in comm_nodes) / len(comm_nodes) if comm_nodes else 0
-                    avg_messages = sum(n["messages"] for n in comm_nodes) / len(comm_nodes) if comm_nodes else 0
-
-                    communities_list.append({
-                        "id": cid,
-                        "size": len(nodes),
-                        "nodes": nodes,
-                        "avg_betweenness": round(avg_betweenness, 4),
-                        "avg_pagerank": round(avg_pagerank, 4),
-                        "avg_messages": round(avg_messages, 2),
-                    })
-
-                communities_list.sort(key=lambda x: x["size"], reverse=True)
-                modularity = community_louvain.modularity(node_communities, G) if algorithm == "louvain" else None
+                modularity = report["modularity"]
+                settings = partition_settings(algorithm, seed=seed, resolution=resolution)
 
                 return JSONResponse({
                     "nodes": graph_data["nodes"],
                     "links": graph_data["links"],
-                    "communities": communities_list,
+                    "communities": report["rows"],
+                    "community_links": report["community_links"],
                     "node_communities": node_communities,
                     "algorithm": algorithm,
                     "num_communities": len(communities),
-                    "modularity": round(modularity, 4) if modularity else None,
-                    "is_connected": graph_data.get("is_connected", False)
+                    "modularity": round(modularity, 4) if modularity is not None else None,
+                    "runtime_ms": report["runtime_ms"],
+                    "seed": settings["seed"],
+                    "resolution": settings["resolution"],
+                    "cache": "hit" if report["cache_hit"] else "miss",
+                    "is_connected": graph_data.get("is_connected", False),
+                    "plan": {**graph_data["plan"], "communities": report["plan"]}
                 })
 
+            except HTTPException:
+                raise
             except Exception as e:
                 logger.error(f"[WhatsApp] Community detection error: {e}")
                 raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
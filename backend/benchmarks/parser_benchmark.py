@@ -0,0 +1,96 @@
+"""Lines/second of the WhatsApp line parser, per export dialect.
+
+Compares the original per-line approach (up to four uncompiled patterns and
+ten strptime formats per message) with the dialect-bound parser.
+
+Run from the backend directory:
+    python -m benchmarks.parser_benchmark --lines 200000
+"""
+import re
+import time
+import random
+import argparse
+from datetime import datetime, timedelta
+
+from ingestion.whatsapp_parser import WhatsAppParser, detect_dialect
+
+
+LEGACY_PATTERNS = [
+    r"\[(\d{1,2}[./]\d{1,2}[./]\d{4}), (\d{1,2}:\d{2}(?::\d{2})?)\] *[~\s\u200f\u202f\u200e]*([^:]+):(.*)",
+    r"\[(\d{1,2}\.\d{1,2}\.\d{4}), (\d{2}:\d{2})\] ([^:]+):(.*)",
+    r"(\d{1,2}/\d{1,2}/\d{2,4}), (\d{2}:\d{2}) - ([^:]+):(.*)",
+    r"(\d{1,2}/\d{1,2}/\d{2,4}), (\d{2}:\d{2}:\d{2}) - ([^:]+):(.*)",
+]
+LEGACY_FORMATS = [
+    "%d.%m.%Y %H:%M:%S", "%d.%m.%Y %H:%M", "%d/%m/%Y %H:%M:%S", "%d/%m/%Y %H:%M",
+    "%m/%d/%Y %H:%M:%S", "%m/%d/%Y %H:%M", "%d.%m.%Y, %H:%M:%S", "%d.%m.%Y, %H:%M",
+    "%m/%d/%y %H:%M:%S", "%m/%d/%y %H:%M",
+]
+
+DIALECTS = {
+    "bracket_dmy (dots)": lambda t: f"[{t.day}.{t.month}.{t.year}, {t.hour}:{t.minute:02d}:{t.second:02d}]",
+    "bracket_dmy (slashes)": lambda t: f"[{t.day:02d}/{t.month:02d}/{t.year}, {t.hour:02d}:{t.minute:02d}:{t.second:02d}]",
+    "dash_mdy": lambda t: f"{t.month}/{t.day}/{t.year % 100:02d}, {t.hour:02d}:{t.minute:02d} -",
+    "dash_dmy": lambda t: f"{t.day:02d}/{t.month:02d}/{t.year}, {t.hour:02d}:{t.minute:02d} -",
+}
+
+
+def legacy_parse(line):
+    line = line.replace('\u202f', ' ').replace('\u200f', ' ').replace('\u200e', ' ').strip()
+    match = None
+    for pattern in LEGACY_PATTERNS:
+        match = re.match(pattern, line)
+        if match:
+            break
+    if not match:
+        return None
+
+    date_str, time_str, user, text = match.groups()
+    if '.' in date_str:
+        parts = date_str.split('.')
+        if len(parts) == 3:
+            date_str = f"{parts[0].zfill(2)}.{parts[1].zfill(2)}.{parts[2]}"
+    if time_str.count(':') == 1:
+        time_str = f"{time_str}:00"
+    for fmt in LEGACY_FORMATS:
+        try:
+            return user.strip(), text.strip(), datetime.strptime(f"{date_str} {time_str}", fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def make_lines(header, count, seed=7):
+    rnd = random.Random(seed)
+    users = [f"User {i}" for i in range(40)]
+    t = datetime(2022, 1, 1, 8, 0, 0)
+    lines = []
+    for _ in range(count):
+        t += timedelta(seconds=rnd.randint(20, 4000))
+        lines.append(f"{header(t)} {rnd.choice(users)}: message body {rnd.randint(0, 10**6)}")
+    return lines
+
+
+def rate(fn, lines):
+    start = time.perf_counter()
+    for line in lines:
+        fn(line)
+    return len(lines) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=100_000)
+    args = parser.parse_args()
+
+    print(f"{'dialect':<24}{'before (lines/s)':>18}{'after (lines/s)':>18}{'speedup':>10}")
+    for name, header in DIALECTS.items():
+        lines = make_lines(header, args.lines)
+        before = rate(legacy_parse, lines)
+        whatsapp_parser = WhatsAppParser(detect_dialect(lines[:2000]))
+        after = rate(whatsapp_parser.parse, lines)
+        print(f"{name:<24}{before:>18,.0f}{after:>18,.0f}{after / before:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import os
+import asyncio
+import logging
+import threading
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException
+
+logger = logging.getLogger(__name__)
+
+COMPUTE_WORKERS = int(os.getenv("COMPUTE_WORKERS", min(4, os.cpu_count() or 1)))
+COMPUTE_QUEUE_DEPTH = int(os.getenv("COMPUTE_QUEUE_DEPTH", 16))
+
+# Seconds a request waits for each stage before it gets a 504. The job
+# itself is not stopped by the timeout: it keeps its worker and its
+# admission slot until it finishes.
+STAGE_TIMEOUTS = {
+    "fetch": float(os.getenv("COMPUTE_FETCH_TIMEOUT", 30)),
+    "parse": float(os.getenv("COMPUTE_PARSE_TIMEOUT", 120)),
+    "graph": float(os.getenv("COMPUTE_GRAPH_TIMEOUT", 300)),
+    "communities": float(os.getenv("COMPUTE_COMMUNITIES_TIMEOUT", 300)),
+}
+# Extra parse seconds per MB of input, so a large but valid upload is not
+# cut off (and retried into a second parse) by the fixed parse timeout.
+PARSE_SECONDS_PER_MB = float(os.getenv("COMPUTE_PARSE_SECONDS_PER_MB", 2))
+
+
+def parse_timeout(size_bytes: int) -> float:
+    """The parse stage's timeout for ``size_bytes`` of input."""
+    return STAGE_TIMEOUTS["parse"] + PARSE_SECONDS_PER_MB * size_bytes / (1024 * 1024)
+
+
+class ComputeService:
+    """Runs blocking parsing and graph work off the event loop.
+
+    Jobs go to a bounded thread pool, so the caches in graph_builder and
+    metrics stay shared. At most ``workers + queue_depth`` jobs are admitted;
+    beyond that requests get a 503 instead of piling up. A timed-out job
+    cannot be interrupted, so it keeps its slot until it really finishes.
+
+    The threads share the GIL: CPU-bound jobs keep the event loop free but
+    do not run on several cores at once. Work that needs that (the chunks
+    of a large upload's parse, large components, parallel betweenness)
+    goes to ``process_pool.PROCESS_POOL`` from inside the job.
+    """
+
+    def __init__(self, workers: int = COMPUTE_WORKERS, queue_depth: int = COMPUTE_QUEUE_DEPTH):
+        self.capacity = workers + queue_depth
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="compute")
+        self._admitted = 0
+        self._lock = threading.Lock()
+
+    def _admit(self) -> bool:
+        with self._lock:
+            if self._admitted >= self.capacity:
+                return False
+            self._admitted += 1
+            return True
+
+    def _release(self, _future):
+        with self._lock:
+            self._admitted -= 1
+
+    async def run(self, stage: str, fn, *args, **kwargs):
+        return await self.run_with_timeout(stage, STAGE_TIMEOUTS.get(stage), fn, *args, **kwargs)
+
+    async def run_with_timeout(self, stage: str, stage_timeout, fn, *args, **kwargs):
+        """``run`` with an explicit timeout; after a 504 the job still runs to completion in its slot."""
+        if not self._admit():
+            logger.warning(f"Compute queue full, rejecting {stage} stage")
+            raise HTTPException(status_code=503, detail="Server is busy, please retry shortly")
+
+        try:
+            future = self._executor.submit(partial(fn, *args, **kwargs))
+        except Exception:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), stage_timeout)
+        except asyncio.TimeoutError:
+            logger.error(f"{stage} stage timed out after {stage_timeout}s, it keeps its compute slot until it finishes")
+            raise HTTPException(status_code=504, detail=f"The {stage} stage took longer than {stage_timeout:g}s")
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+COMPUTE = ComputeService()
@@ -15,6 +15,19 @@ async_session = sessionmaker(
 
 Base = declarative_base()
 
+# Columns added to existing tables. create_all only creates missing tables,
+# so databases created before a column existed get it here, on startup.
+SCHEMA_UPGRADES = [
+    "ALTER TABLE research_filters ADD COLUMN IF NOT EXISTS sample_seed INTEGER",
+    "ALTER TABLE research_filters ADD COLUMN IF NOT EXISTS community_seed INTEGER",
+    "ALTER TABLE research ADD COLUMN IF NOT EXISTS file_name VARCHAR",
+]
+
+
+async def upgrade_schema(conn):
+    for statement in SCHEMA_UPGRADES:
+        await conn.execute(text(statement))
+
 async def get_db():
     async with async_session() as session:
         try:
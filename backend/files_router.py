@@ -7,6 +7,10 @@ from fastapi import APIRouter, UploadFile, File, HTTPException, Form
 from fastapi.responses import JSONResponse
 from typing import Optional
 
+from ingestion.artifact import build_artifact, load_artifact, remove_artifacts
+from ingestion.incremental import extend_artifact, shares_prefix
+from compute_service import COMPUTE, parse_timeout
+
 UPLOAD_FOLDER = "uploads" 
 
 logger = logging.getLogger(__name__)
@@ -134,6 +138,32 @@ def validate_wikipedia_format(content: str) -> Tuple[bool, str]:
     details = ", ".join([f"{count} {element}" for element, count in wiki_elements.items() if count > 0])
     return True, f"Found {total_elements} Wikipedia elements: {details}"
 
+
+def store_upload(file_path: str, platform: str, content: bytes):
+    """Writes an upload and brings its message artifact up to date.
+
+    An upload that only appends to the previous one extends its artifact in
+    place; anything else is parsed again. Failing to build the artifact is
+    not fatal, the graph builder then parses on demand.
+    """
+    previous = load_artifact(file_path, platform) if os.path.exists(file_path) else None
+    appended = previous is not None and shares_prefix(previous.meta, content)
+    if previous is not None and not appended:
+        previous.close()
+
+    with open(file_path, "wb") as f:
+        f.write(content)
+
+    try:
+        if appended:
+            logger.info(f"{os.path.basename(file_path)} extends the previous upload, parsing only the new messages")
+            extend_artifact(file_path, platform, previous)
+        else:
+            build_artifact(file_path, platform)
+    except Exception as e:
+        logger.warning(f"Message artifact not built for {os.path.basename(file_path)}, will parse on demand: {e}")
+
+
 @router.post("/upload")
 async def upload_file(
     file: UploadFile = File(...),
@@ -219,8 +249,7 @@ async def upload_file(
             os.makedirs(UPLOAD_FOLDER)
 
         file_path = os.path.join(UPLOAD_FOLDER, file.filename)
-        with open(file_path, "wb") as f:
-            f.write(content)
+        await COMPUTE.run_with_timeout("parse", parse_timeout(len(content)), store_upload, file_path, platform, content)
 
         logger.info(f"File uploaded successfully: {file.filename} (type: {platform})")
         return JSONResponse(
@@ -233,6 +262,8 @@ async def upload_file(
             status_code=200
         )
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error uploading file {file.filename}: {e}")
         raise HTTPException(detail=str(e), status_code=500)
@@ -244,6 +275,7 @@ async def delete_file(filename: str):
         file_path = os.path.join(UPLOAD_FOLDER, filename)
         if os.path.exists(file_path):
             os.remove(file_path)
+            remove_artifacts(file_path)
             return JSONResponse(content={"message": f"File '{filename}' deleted successfully!"}, status_code=200)
         else:
             return JSONResponse(content={"error": f"File '{filename}' not found."}, status_code=404)
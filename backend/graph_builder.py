@@ -1,15 +1,22 @@
-import re
+import time
+import inspect
 import networkx as nx
-from datetime import datetime
-from collections import defaultdict
+from collections import defaultdict, deque
 import logging
 from utils import (
     calculate_sequential_weights, 
     normalize_links_by_target,
-    parse_date_time,
-    MEDIA_RE,
-    spam_messages
+    parse_date_time
 )
+from ingestion.artifact import load_or_build_artifact
+from ingestion.filter_plan import FilterPlan
+from ingestion.message_table import MessageTable
+from ingestion.stream import iter_blocks, limit_messages
+from ingestion.sampling import SAMPLED_LIMIT_TYPES, TIME_STRATA, new_seed
+from metrics.centrality import compute_centralities, parse_metrics
+from metrics.csr_graph import GRAPH_BACKENDS, CSRGraph
+from metrics.graph_cache import GRAPH_CACHE, CachedGraph, graph_request_key
+from metrics.timeline import TIMELINE_CACHE, advance, timeline_key
 
 logger = logging.getLogger("graph_builder")
 
@@ -23,6 +30,59 @@ def debug_check_target_weights(links):
         print(f"Target: {target}, Total Weight: {round(total, 4)}")
 
 
+def row_blocks(rows, reverse=False):
+    if isinstance(rows, slice):
+        blocks = [slice(start, end) for start, end in iter_blocks(rows.start, rows.stop)]
+    else:
+        blocks = [rows[start:end] for start, end in iter_blocks(0, len(rows))]
+    return blocks[::-1] if reverse else blocks
+
+
+def iter_whatsapp_rows(plan):
+    for block in row_blocks(plan.rows):
+        yield from plan.select_rows(block).tolist()
+
+
+def tail_whatsapp_rows(plan, limit):
+    tail = deque()
+    for block in row_blocks(plan.rows, reverse=True):
+        tail.extendleft(reversed(plan.select_rows(block).tolist()))
+        if len(tail) >= limit:
+            break
+    return list(tail)[-limit:]
+
+
+def sampling_stratum(artifact, limit_type, window):
+    if limit_type == "random_per_user":
+        user_ids = artifact.user_ids
+        return lambda row: int(user_ids[row])
+
+    if limit_type == "random_by_time":
+        timestamps = artifact.timestamps
+        window_timestamps = timestamps[window]
+        if not len(window_timestamps):
+            return None
+        first = int(window_timestamps.min())
+        span = int(window_timestamps.max()) - first + 1
+        return lambda row: (int(timestamps[row]) - first) * TIME_STRATA // span
+
+    return None
+
+
+def count_from_summary(artifact, summary, user_message_count, usernames, edges_counter, directed=False, anonymize=False):
+    names = artifact.users
+    if anonymize:
+        names = [f"User_{i + 1}" for i in range(len(names))]
+
+    for name, count in zip(names, summary.user_counts.tolist()):
+        if count:
+            usernames.add(name)
+            user_message_count[name] += count
+
+    for edge, weight in summary.edges(names, directed).items():
+        edges_counter[edge] += weight
+
+
 def build_graph_from_txt(
     txt_path,
     limit=None,
@@ -48,8 +108,23 @@ def build_graph_from_txt(
     message_weights=None,
     is_for_save=False,
     platform="whatsapp",
-    algorithm=None
+    algorithm=None,
+    parse_workers=None,
+    sample_seed=None,
+    approximate=False,
+    centrality_samples=None,
+    metrics=None,
+    power_tolerance=None,
+    incremental=False,
+    parallel_betweenness=False,
+    graph_backend="networkx",
+    deadline_ms=None,
+    return_graph=False
 ):
+    started = time.monotonic()
+    if graph_backend not in GRAPH_BACKENDS:
+        raise ValueError(f"Unknown graph backend: {graph_backend}. Supported: {', '.join(GRAPH_BACKENDS)}")
+    request_params = dict(locals())
     print(f"\n=== GRAPH BUILDING DEBUG ===")
     print(f"Platform: {platform}")
     print(f"File: {txt_path}")
@@ -62,177 +137,19 @@ def build_graph_from_txt(
     print(f"  keywords: {keywords}")
     print(f"  username: {username}")
 
-    def parse_whatsapp_datetime(date_str, time_str):
-
-        if '.' in date_str:
-            parts = date_str.split('.')
-            if len(parts) == 3:
-                day = parts[0].zfill(2)
-                month = parts[1].zfill(2)
-                year = parts[2]
-                date_str = f"{day}.{month}.{year}"
-        
-        if time_str.count(':') == 1:
-            time_str = f"{time_str}:00"
-        
-        timestamp_str = f"{date_str} {time_str}"
-        
-        formats_to_try = [
-            "%d.%m.%Y %H:%M:%S",    
-            "%d.%m.%Y %H:%M",       
-            "%d/%m/%Y %H:%M:%S",    
-            "%d/%m/%Y %H:%M",       
-            "%m/%d/%Y %H:%M:%S",    
-            "%m/%d/%Y %H:%M",       
-            "%d.%m.%Y, %H:%M:%S",   
-            "%d.%m.%Y, %H:%M",
-            "%m/%d/%y %H:%M:%S", 
-            "%m/%d/%y %H:%M",
-        ]
-        
-        for fmt in formats_to_try:
-            try:
-                parsed_dt = datetime.strptime(timestamp_str, fmt)
-                return parsed_dt
-            except ValueError:
-                continue
-        
-        print(f"Failed to parse datetime: '{timestamp_str}'")
-        return None
-
-    def process_whatsapp_messages(lines, filters):        
-        print(f"Processing {len(lines)} lines as WhatsApp format...")
-        
-        filtered_lines = []
-        processed_count = 0
-        date_filter_skipped = 0
-        
-        start_dt = filters.get('start_dt')
-        end_dt = filters.get('end_dt')
-        
-        for line_num, line in enumerate(lines):
-            line = line.replace('\u202f', ' ').replace('\u200f', ' ').replace('\u200e', ' ').strip()
-            
-            match = None
-            
-            if not match:
-                match = re.match(r"\[(\d{1,2}[./]\d{1,2}[./]\d{4}), (\d{1,2}:\d{2}(?::\d{2})?)\] *[~\s\u200f\u202f\u200e]*([^:]+):(.*)", line)
-            
-            if not match:
-                match = re.match(r"\[(\d{1,2}\.\d{1,2}\.\d{4}), (\d{2}:\d{2})\] ([^:]+):(.*)", line)
-            
-            if not match:
-                match = re.match(r"(\d{1,2}/\d{1,2}/\d{2,4}), (\d{2}:\d{2}) - ([^:]+):(.*)", line)
-            
-            if not match:
-                match = re.match(r"(\d{1,2}/\d{1,2}/\d{2,4}), (\d{2}:\d{2}:\d{2}) - ([^:]+):(.*)", line)
-            
-            if not match:
-                continue
-            
-            date, time, user, text = match.groups()
-            text = text.strip()
-            user = user.strip().lstrip('~ ').replace('\u202f', '').replace('\u200f', '').replace('\u200e', '')
-            
-            processed_count += 1
-            
-            if line_num < 5:
-                print(f"Line {line_num+1}: Date='{date}', Time='{time}', User='{user}', Text='{text[:30]}...'")
-            
-            min_len = filters.get('min_length')
-            max_len = filters.get('max_length')
-            if (min_len is not None and min_len != '' and len(text) < int(min_len)) or \
-               (max_len is not None and max_len != '' and len(text) > int(max_len)):
-                continue
-            
-            keywords = filters.get('keywords')
-            if keywords:
-                keyword_list = [k.strip().lower() for k in keywords.split(",")]
-                if not any(k in text.lower() for k in keyword_list):
-                    continue
-            
-            message_dt = parse_whatsapp_datetime(date, time)
-            if not message_dt:
-                if line_num < 5:
-                    print(f"Failed to parse datetime: {date} {time}")
-                continue
-            
-            if line_num < 5:
-                print(f"Parsed datetime: {message_dt}")
-                if start_dt:
-                    print(f"  Start check: {message_dt} >= {start_dt} = {message_dt >= start_dt}")
-                if end_dt:
-                    print(f"  End check: {message_dt} <= {end_dt} = {message_dt <= end_dt}")
-            
-            if start_dt and message_dt < start_dt:
-                date_filter_skipped += 1
-                if line_num < 5:
-                    print(f"SKIPPED: Before start date")
-                continue
-                
-            if end_dt and message_dt > end_dt:
-                date_filter_skipped += 1
-                if line_num < 5:
-                    print(f"SKIPPED: After end date")
-                continue
-            
-            try:
-                if any(spam in text for spam in spam_messages) or MEDIA_RE.search(text):
-                    continue
-            except NameError:
-                pass
-            
-            username_filter = filters.get('username')
-            if username_filter and username_filter.strip().lower() != user.lower():
-                continue
-            
-            if line_num < 5:
-                print(f"ACCEPTED")
-            
-            filtered_lines.append((user, text))
-        
-        print(f"WhatsApp processing summary:")
-        print(f"  Lines processed: {processed_count}")
-        print(f"  Skipped by date filter: {date_filter_skipped}")
-        print(f"  Final accepted messages: {len(filtered_lines)}")
-        
-        return filtered_lines
-
-    def process_wikipedia_messages(lines, filters):
-        print(f"Processing {len(lines)} lines as Wikipedia format...")
-
-        filtered_lines = []
-        for line in lines:
-            if not line.strip() or line.startswith('#'):
-                continue
-
-            match = re.match(r"\[(.*?)\] (.*?) -> (.*?): (.*)", line)
-            if match:
-                datetime_str, user, reply_to, text = match.groups()
-            else:
-                match_simple = re.match(r"\[(.*?)\] (.*?): (.*)", line)
-                if match_simple:
-                    datetime_str, user, text = match_simple.groups()
-                    reply_to = None
-                else:
-                    continue
-
-            filtered_lines.append((user.strip(), text.strip(), reply_to.strip() if reply_to else None))
-
-        print(f"Wikipedia processing summary: {len(filtered_lines)} messages")
-        return filtered_lines
-
-
-
     usernames = set()
     user_message_count = defaultdict(int)
     edges_counter = defaultdict(int)
-    anonymized_map = {}
 
-    with open(txt_path, "r", encoding="utf-8") as f:
-        lines = f.readlines()
+    # parse_workers only applies when the artifact has to be (re)built: a fresh
+    # stored artifact is used as is, and small files are always parsed inline.
+    artifact = load_or_build_artifact(
+        txt_path,
+        "wikipedia" if platform == "wikipedia" else "whatsapp",
+        workers=int(parse_workers) if parse_workers else None
+    )
 
-    print(f"Total lines in file: {len(lines)}")
+    logger.debug(f"Messages in artifact: {len(artifact)}")
 
     print(f"Processing date filters:")
     print(f"  start_date: '{start_date}', start_time: '{start_time}'")
@@ -268,80 +185,63 @@ def build_graph_from_txt(
         'username': username
     }
 
-    if platform == "whatsapp":
-        filtered_lines = process_whatsapp_messages(lines, filter_params)
-    elif platform == "wikipedia":
-        filtered_lines = process_wikipedia_messages(lines, filter_params)
-    else:
-        print(f"Unknown platform: {platform}, defaulting to WhatsApp")
-        filtered_lines = process_whatsapp_messages(lines, filter_params)
-
-    print(f"Messages after platform-specific filtering: {len(filtered_lines)}")
-
-    if limit and limit != '' and int(limit) > 0:
-        original_count = len(filtered_lines)
-        if limit_type == "last":
-            filtered_lines = filtered_lines[-int(limit):]
-        elif limit_type == "random":
-            import random
-            random.shuffle(filtered_lines)
-            filtered_lines = filtered_lines[:int(limit)]
-        else:  
-            filtered_lines = filtered_lines[:int(limit)]
-        
-        print(f"Applied limit filter: {original_count} -> {len(filtered_lines)} messages")
+    keep_text = bool(include_messages or is_for_save)
+    tail_limit = int(limit) if limit_type == "last" and limit and limit != '' and int(limit) > 0 else None
 
-    all_messages = []
-    for msg in filtered_lines:
+    all_messages = None
+    unfiltered = not (keep_text or use_history or any(filter_params.values()) or (limit and limit != '' and int(limit) > 0))
+    summary = artifact.summary if unfiltered and platform != "wikipedia" else None
+
+    if summary is not None:
+        logger.debug("No message filters, using stored sender counts...")
+        count_from_summary(artifact, summary, user_message_count, usernames, edges_counter, directed, anonymize)
+    else:
         if platform == "wikipedia":
-            user, text, reply_to = msg
+            rows = iter(range(len(artifact)))
         else:
-            user, text = msg
-            reply_to = None  
-
+            if platform != "whatsapp":
+                print(f"Unknown platform: {platform}, defaulting to WhatsApp")
+            plan = FilterPlan(artifact, filter_params)
+            window = plan.rows
+            window_size = window.stop - window.start if isinstance(window, slice) else len(window)
+            logger.debug(f"Messages inside date window: {window_size} of {len(artifact)}")
+            logger.debug(f"Filter plan: {' -> '.join(plan.describe())}")
+
+            if tail_limit:
+                rows = tail_whatsapp_rows(plan, tail_limit)
+            else:
+                rows = iter_whatsapp_rows(plan)
+
+        stratum = None
+        if limit and limit != '' and int(limit) > 0:
+            print(f"Applying limit filter: {limit_type} {limit} messages")
+            if limit_type in SAMPLED_LIMIT_TYPES:
+                sample_seed = int(sample_seed) if sample_seed is not None and sample_seed != '' else new_seed()
+                stratum = sampling_stratum(artifact, limit_type, window if platform != "wikipedia" else slice(0, len(artifact)))
+                logger.debug(f"Sampling seed: {sample_seed}")
+        rows = limit_messages(rows, limit, limit_type, sample_seed, stratum)
+
+        table = MessageTable.from_rows(artifact, rows, keep_text)
         if anonymize:
-            if user not in anonymized_map:
-                anonymized_map[user] = f"User_{len(anonymized_map) + 1}"
-            user = anonymized_map[user]
-            if reply_to and reply_to not in anonymized_map:
-                anonymized_map[reply_to] = f"User_{len(anonymized_map) + 1}"
-            reply_to = anonymized_map.get(reply_to, reply_to)
-
-        usernames.add(user)
-        user_message_count[user] += 1
-        all_messages.append((user, text, reply_to) if platform == "wikipedia" else (user, text))
-
+            table = table.anonymized()
+
+        user_message_count.update(table.message_counts())
+        usernames.update(user_message_count)
+        all_messages = table.messages() if keep_text else None
+
+        if use_history:
+            print("Using history algorithm for edge weights...")
+            history_n = int(history_length) if history_length else 3
+            edges = calculate_sequential_weights(table, n_prev=history_n, message_weights=message_weights)
+            for (source, target), weight in edges.items():
+                edge = (source, target)
+                edges_counter[edge] += weight
+        else:
+            print("Using simple sequential algorithm...")
+            edges_counter.update(table.sequential_edges(directed))
 
     print(f"Unique users found: {len(usernames)}")
-    print(f"Total messages: {len(all_messages)}")
-
-    if use_history:
-        print("Using history algorithm for edge weights...")
-        history_n = int(history_length) if history_length else 3
-        edges = calculate_sequential_weights(all_messages, n_prev=history_n, message_weights=message_weights)
-        for (source, target), weight in edges.items():
-            edge = (source, target)
-            edges_counter[edge] += weight
-    else:
-        print("Using simple sequential algorithm...")
-        previous_user = None
-        for msg in all_messages:
-            if len(msg) == 3:
-                user, _, reply_to = msg
-                if reply_to and reply_to != user:
-                    edge = (user, reply_to) if directed else tuple(sorted([user, reply_to]))
-                    edges_counter[edge] += 1
-                elif previous_user and previous_user != user:
-                    edge = (user, previous_user) if directed else tuple(sorted([user, previous_user]))
-                    edges_counter[edge] += 1
-                previous_user = user
-            elif len(msg) == 2:
-                user, _ = msg
-                if previous_user and previous_user != user:
-                    edge = (user, previous_user) if directed else tuple(sorted([user, previous_user]))
-                    edges_counter[edge] += 1
-                previous_user = user
-
+    print(f"Total messages: {sum(user_message_count.values())}")
 
     if min_messages or max_messages or active_users or selected_users:
         print("Applying user filters...")
@@ -363,81 +263,73 @@ def build_graph_from_txt(
         usernames = set(filtered_users.keys())
         print(f"Users after filtering: {len(usernames)}")
 
-    G = nx.DiGraph() if directed else nx.Graph()
-    G.add_nodes_from(usernames)
+    if graph_backend == "csr":
+        G = CSRGraph.from_edges(
+            usernames,
+            ((a, b, w) for (a, b), w in edges_counter.items() if a in usernames and b in usernames),
+            directed
+        )
+        logger.debug(f"Graph built (csr): {len(G)} nodes, {G.number_of_edges()} edges")
+        is_connected = G.is_connected() if len(G) > 0 else False
+    else:
+        G = nx.DiGraph() if directed else nx.Graph()
+        G.add_nodes_from(usernames)
 
-    for edge, weight in edges_counter.items():
-        if edge[0] in usernames and edge[1] in usernames:
-            G.add_edge(edge[0], edge[1], weight=weight)
+        for edge, weight in edges_counter.items():
+            if edge[0] in usernames and edge[1] in usernames:
+                G.add_edge(edge[0], edge[1], weight=weight)
 
-    print(f"Graph built: {len(G.nodes())} nodes, {len(G.edges())} edges")
+        print(f"Graph built: {len(G.nodes())} nodes, {len(G.edges())} edges")
 
-    if directed:
-        is_connected = nx.is_weakly_connected(G) if len(G.nodes()) > 0 else False
-    else:
-        is_connected = nx.is_connected(G) if len(G.nodes()) > 0 else False
+        if directed:
+            is_connected = nx.is_weakly_connected(G) if len(G.nodes()) > 0 else False
+        else:
+            is_connected = nx.is_connected(G) if len(G.nodes()) > 0 else False
 
     print(f"Graph is connected: {is_connected}")
 
-    try:
-        degree_centrality = nx.degree_centrality(G)
-        betweenness_centrality = nx.betweenness_centrality(G, weight="weight")
-        
-        if is_connected and len(G.nodes()) > 1:
-            closeness_centrality = nx.closeness_centrality(G)
-            eigenvector_centrality = nx.eigenvector_centrality(G, max_iter=1000)
-            pagerank = nx.pagerank(G)
-        else:
-            if len(G.nodes()) > 1:
-                if directed:
-                    components = list(nx.weakly_connected_components(G))
-                else:
-                    components = list(nx.connected_components(G))
-                
-                if components:
-                    largest_cc = max(components, key=len)
-                    subgraph = G.subgraph(largest_cc).copy()
-                    
-                    closeness_centrality = nx.closeness_centrality(subgraph)
-                    eigenvector_centrality = nx.eigenvector_centrality(subgraph, max_iter=1000)
-                    pagerank = nx.pagerank(subgraph)
-                    
-                    for node in G.nodes():
-                        if node not in largest_cc:
-                            closeness_centrality[node] = 0.0
-                            eigenvector_centrality[node] = 0.0
-                            pagerank[node] = 0.0
-                else:
-                    closeness_centrality = {node: 0.0 for node in G.nodes()}
-                    eigenvector_centrality = {node: 0.0 for node in G.nodes()}
-                    pagerank = {node: 1.0/len(G.nodes()) for node in G.nodes()}
-            else:
-                closeness_centrality = {}
-                eigenvector_centrality = {}
-                pagerank = {}
-                
-    except Exception as e:
-        logger.error(f"Error calculating centrality measures: {e}")
-        degree_centrality = {}
-        betweenness_centrality = {}
-        closeness_centrality = {}
-        eigenvector_centrality = {}
-        pagerank = {}
-
-    nodes_list = [
-        {
+    metric_names = parse_metrics(metrics)
+    logger.debug(f"Computing metrics: {', '.join(metric_names) or 'none'}")
+    request_params["sample_seed"] = sample_seed
+
+    timeline = None
+    if incremental:
+        window_key = timeline_key(txt_path, request_params)
+        timeline = advance(TIMELINE_CACHE.get(window_key), G)
+        logger.debug(f"Timeline step: {timeline.changed_edges} changed edges, warm start: {timeline.warm}")
+
+    remaining_ms = None
+    if deadline_ms is not None:
+        remaining_ms = max(0.0, deadline_ms - (time.monotonic() - started) * 1000)
+    centralities, centrality_errors, convergence, methods = compute_centralities(
+        G, metric_names, is_connected, approximate, centrality_samples, power_tolerance, timeline,
+        parallel_betweenness, remaining_ms
+    )
+    computed = [name for name in metric_names if methods[name]["method"] in ("exact", "approximate")]
+    logger.debug("Metric plan: " + ", ".join(f"{name}={step['method']}" for name, step in methods.items()))
+
+    if timeline is not None:
+        timeline.remember(centralities)
+        TIMELINE_CACHE.put(window_key, timeline)
+    GRAPH_CACHE.put(graph_request_key(txt_path, request_params), CachedGraph(G, is_connected))
+
+    nodes_list = []
+    for user in usernames:
+        node = {
             "id": user,
             "name": user,
             "group": 1,
             "messages": user_message_count.get(user, 0),
-            "degree": round(degree_centrality.get(user, 0), 4),
-            "betweenness": round(betweenness_centrality.get(user, 0), 4),
-            "closeness": round(closeness_centrality.get(user, 0), 4),
-            "eigenvector": round(eigenvector_centrality.get(user, 0), 4),
-            "pagerank": round(pagerank.get(user, 0), 4)
         }
-        for user in usernames
-    ]
+        for name in metric_names:
+            node[name] = round(centralities[name].get(user, 0), 4) if name in computed else None
+        nodes_list.append(node)
+
+    if centrality_errors:
+        for node in nodes_list:
+            node["approximate"] = True
+            for name, errors in centrality_errors.items():
+                node[f"{name}_error"] = round(errors.get(node["id"], 0), 4)
 
     links_list = [
         {"source": a, "target": b, "weight": round(w, 3)}
@@ -456,9 +348,62 @@ def build_graph_from_txt(
     print(f"Platform: {platform}")
     print(f"Date range applied: {start_dt} to {end_dt}")
 
-    return {
+    result = {
         "nodes": nodes_list,
         "links": links_list,
         "is_connected": is_connected,
-        "messages": all_messages
-    }
\ No newline at end of file
+        "messages": all_messages or [],
+        "sample_seed": sample_seed if limit_type in SAMPLED_LIMIT_TYPES else None,
+        "convergence": convergence,
+        "timeline": {"warm_start": timeline.warm, "changed_edges": timeline.changed_edges} if timeline else None,
+        "plan": {
+            "deadline_ms": deadline_ms,
+            "elapsed_ms": round((time.monotonic() - started) * 1000, 1),
+            "metrics": methods,
+        }
+    }
+    if return_graph:
+        # In-process callers (compute_graph_metric) reuse the built graph
+        # instead of rebuilding it from the lists.
+        result["graph"] = G
+    return result
+
+
+def compute_graph_metric(txt_path, name, approximate=False, centrality_samples=None, power_tolerance=None,
+                         deadline_ms=None, **params):
+    """Computes one more centrality measure for a graph built by an earlier request.
+
+    ``params`` are the build_graph_from_txt filters of that request; the
+    graph is rebuilt (without metrics) only when it is no longer cached.
+    """
+    metric_names = parse_metrics([name])
+    bound = inspect.signature(build_graph_from_txt).bind(txt_path, **params)
+    bound.apply_defaults()
+    request_params = dict(bound.arguments)
+
+    entry = GRAPH_CACHE.get(graph_request_key(txt_path, request_params))
+    cached = entry is not None
+    if cached:
+        G, is_connected = entry.graph, entry.is_connected
+    else:
+        # Use the built graph itself: its cache entry may already be evicted.
+        result = build_graph_from_txt(**{**request_params, "metrics": "", "return_graph": True})
+        G, is_connected = result["graph"], result["is_connected"]
+
+    metric = metric_names[0]
+    centralities, errors, convergence, methods = compute_centralities(
+        G, metric_names, is_connected, approximate, centrality_samples, power_tolerance,
+        deadline_ms=deadline_ms
+    )
+    response = {
+        "metric": metric,
+        "values": {node: round(value, 4) for node, value in centralities[metric].items()},
+        "cached_graph": cached,
+        "approximate": metric in errors,
+        "method": methods[metric],
+    }
+    if metric in errors:
+        response["errors"] = {node: round(value, 4) for node, value in errors[metric].items()}
+    if metric in convergence:
+        response["convergence"] = convergence[metric]
+    return response
\ No newline at end of file
@@ -1,11 +1,7 @@
 import logging
 import uuid
-from typing import List
-from pydantic import BaseModel
-
-import networkx as nx
-from community import community_louvain
-from networkx.algorithms import community as nx_community
+from typing import List, Optional
+from pydantic import BaseModel, Field
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.responses import JSONResponse
@@ -17,6 +13,8 @@ from database import get_db
 from models import Research, ResearchFilter, NetworkAnalysis, Comparisons
 from auth_router import get_current_user
 from utils import apply_comparison_filters, find_common_nodes, mark_common_nodes, get_network_metrics
+from metrics.communities import COMMUNITY_ALGORITHMS, partition_report, partition_settings
+from compute_service import COMPUTE
 
 
 from fastapi.responses import StreamingResponse
@@ -156,6 +154,28 @@ class CommunityAnalysisData(BaseModel):
     nodes: List[dict]
     links: List[dict]
     algorithm: str = Query("louvain")
+    num_communities: Optional[int] = None
+    seed: Optional[int] = None
+    resolution: Optional[float] = Field(None, gt=0)
+
+
+def history_partition_report(data: CommunityAnalysisData) -> dict:
+    """Runs ``partition_report`` on the posted graph, as one compute job."""
+    links = []
+    for link in data.links:
+        source = link["source"]
+        target = link["target"]
+
+        if isinstance(source, dict) and "id" in source:
+            source = source["id"]
+        if isinstance(target, dict) and "id" in target:
+            target = target["id"]
+
+        links.append({"source": source, "target": target, "weight": link.get("weight", 1)})
+
+    return partition_report(data.nodes, links, data.algorithm, data.num_communities, data.seed, data.resolution,
+                            fields=("betweenness", "pagerank"))
+
 
 @router.post("/history/analyze/communities") 
 async def analyze_communities_history(
@@ -163,75 +183,18 @@ async def analyze_communities_history(
 ):
     try:    
         algorithm = data.algorithm
-    
-        G = nx.Graph()
-
-        for node in data.nodes:
-            G.add_node(node["id"], **{k: v for k, v in node.items() if k != "id"})
-
-        for link in data.links:
-            source = link["source"]
-            target = link["target"]
-            weight = link.get("weight", 1)
-
-            if isinstance(source, dict) and "id" in source:
-                source = source["id"]
-            if isinstance(target, dict) and "id" in target:
-                target = target["id"]
-
-            G.add_edge(source, target, weight=weight)
-
-        communities = {}
-        node_communities = {}
-
-        if algorithm == "louvain":
-            partition = community_louvain.best_partition(G)
-            node_communities = partition
-
-            for node, community_id in partition.items():
-                if community_id not in communities:
-                    communities[community_id] = []
-                communities[community_id].append(node)
-
-        elif algorithm == "girvan_newman":
-            communities_iter = nx_community.girvan_newman(G)
-            communities_list = list(next(communities_iter))
-
-            for i, community in enumerate(communities_list):
-                communities[i] = list(community)
-                for node in community:
-                    node_communities[node] = i
-
-        elif algorithm == "greedy_modularity":
-            communities_list = list(nx_community.greedy_modularity_communities(G))
-
-            for i, community in enumerate(communities_list):
-                communities[i] = list(community)
-                for node in community:
-                    node_communities[node] = i
-        else:
-            logger.error(f"Unknown algorithm: {algorithm}. Supported: louvain, girvan_newman, greedy_modularity")
+
+        if algorithm not in COMMUNITY_ALGORITHMS:
+            logger.error(f"Unknown algorithm: {algorithm}. Supported: {', '.join(COMMUNITY_ALGORITHMS)}")
             raise HTTPException(
-                detail=f"Unknown algorithm: {algorithm}. Supported: louvain, girvan_newman, greedy_modularity",
+                detail=f"Unknown algorithm: {algorithm}. Supported: {', '.join(COMMUNITY_ALGORITHMS)}",
                 status_code=400
             )
 
-        communities_list = [
-            {
-                "id": community_id,
-                "size": len(nodes),
-                "nodes": nodes,
-                "avg_betweenness": sum(data.nodes[i]["betweenness"]
-                                       for i, node in enumerate(data.nodes)
-                                       if node["id"] in nodes) / len(nodes) if nodes else 0,
-                "avg_pagerank": sum(data.nodes[i]["pagerank"]
-                                    for i, node in enumerate(data.nodes)
-                                    if node["id"] in nodes) / len(nodes) if nodes else 0,
-            }
-            for community_id, nodes in communities.items()
-        ]
+        report = await COMPUTE.run("communities", history_partition_report, data)
+        communities, node_communities = report["communities"], report["node_communities"]
 
-        communities_list.sort(key=lambda x: x["size"], reverse=True)
+        settings = partition_settings(algorithm, seed=data.seed, resolution=data.resolution)
 
         for i, node in enumerate(data.nodes):
             node_id = node["id"]
@@ -241,11 +204,16 @@ async def analyze_communities_history(
         return JSONResponse(content={
             "nodes": data.nodes,
             "links": data.links,
-            "communities": communities_list,
+            "communities": report["rows"],
+            "community_links": report["community_links"],
             "node_communities": node_communities,
             "algorithm": algorithm,
             "num_communities": len(communities),
-            "modularity": community_louvain.modularity(node_communities, G) if algorithm == "louvain" else None
+            "modularity": report["modularity"],
+            "runtime_ms": report["runtime_ms"],
+            "seed": settings["seed"],
+            "resolution": settings["resolution"],
+            "cache": "hit" if report["cache_hit"] else "miss"
         }, status_code=200)
 
     except Exception as e:
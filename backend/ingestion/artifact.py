@@ -0,0 +1,459 @@
+import os
+import json
+import mmap
+import shutil
+import hashlib
+import logging
+import tempfile
+import threading
+from array import array
+from contextlib import contextmanager
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: builds are then only serialized within one process.
+    fcntl = None
+
+from ingestion.stream import iter_lines, iter_whatsapp_records, iter_wikipedia_records, split_line_ranges
+from ingestion.whatsapp_parser import WhatsAppParser, sniff_dialect
+from ingestion.timestamp_index import TimestampIndex
+from ingestion.summary import SenderSummary
+from process_pool import PROCESS_POOL
+
+logger = logging.getLogger(__name__)
+
+ARTIFACT_VERSION = 4
+ARTIFACT_DIRNAME = ".artifacts"
+PARALLEL_MIN_BYTES = 32 * 1024 * 1024
+PARALLEL_CHUNK_BYTES = 8 * 1024 * 1024
+PREFIX_BLOCK_BYTES = 1024 * 1024
+
+COLUMNS = {
+    "user_ids": np.uint32,
+    "reply_to": np.int32,
+    "timestamps": np.int64,
+    "lengths": np.int32,
+    "text_offsets": np.int64,
+}
+
+
+_path_locks = {}
+_path_locks_guard = threading.Lock()
+_held = threading.local()
+
+
+def artifact_path(txt_path: str, platform: str) -> str:
+    folder, name = os.path.split(txt_path)
+    return os.path.join(folder, ARTIFACT_DIRNAME, f"{name}.{platform}")
+
+
+@contextmanager
+def artifact_lock(path: str):
+    """Builds and extensions of one artifact directory take turns.
+
+    Threads of this process wait on a per-path RLock. Other processes (e.g.
+    several uvicorn workers) wait on an ``flock`` of ``<path>.lock`` beside
+    the directory, taken once by the outermost holder; where ``fcntl`` or
+    the lockfile is unavailable only the thread lock applies.
+    """
+    with _path_locks_guard:
+        lock = _path_locks.setdefault(path, threading.RLock())
+    with lock:
+        held = getattr(_held, "paths", None)
+        if held is None:
+            held = _held.paths = set()
+        if path in held or fcntl is None:
+            yield
+            return
+
+        lock_file = None
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            lock_file = open(f"{path}.lock", "a")
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        except OSError as e:
+            logger.warning(f"Could not lock {path} across processes: {e}")
+        held.add(path)
+        try:
+            yield
+        finally:
+            held.discard(path)
+            if lock_file is not None:
+                lock_file.close()
+
+
+def publish_artifact(tmp_path: str, path: str):
+    """Moves a finished temp directory to ``path``, replacing what is there.
+
+    The old directory is renamed aside before it is removed, so readers that
+    still map its files keep them. Raises OSError when another process
+    published ``path`` between the two renames.
+    """
+    old_path = None
+    if os.path.exists(path):
+        old_path = tempfile.mkdtemp(prefix=f"{os.path.basename(path)}.old-", dir=os.path.dirname(path))
+        os.replace(path, os.path.join(old_path, "artifact"))
+    try:
+        os.replace(tmp_path, path)
+    finally:
+        if old_path is not None:
+            shutil.rmtree(old_path, ignore_errors=True)
+
+
+def source_signature(txt_path: str) -> dict:
+    stat = os.stat(txt_path)
+    return {"source_size": stat.st_size, "source_mtime_ns": stat.st_mtime_ns}
+
+
+class MessageArtifact:
+    """Parsed messages of one export, stored column-wise.
+
+    Only messages that survive the static checks (well-formed header,
+    parsable timestamp, not a system/media notice) are kept, so request
+    filters can run straight over the columns.
+    """
+
+    def __init__(self, meta, columns, text, path=None):
+        self.path = path
+        self.meta = meta
+        self.users = meta["users"]
+        self.user_ids = columns["user_ids"]
+        self.reply_to = columns["reply_to"]
+        self.timestamps = columns["timestamps"]
+        self.lengths = columns["lengths"]
+        self.text_offsets = columns["text_offsets"]
+        self._text = text
+        self._timestamp_index = None
+        self._summary = None
+
+    def __len__(self):
+        return len(self.user_ids)
+
+    def text(self, i: int) -> str:
+        start, end = int(self.text_offsets[i]), int(self.text_offsets[i + 1])
+        return self._text[start:end].decode("utf-8")
+
+    @property
+    def timestamp_index(self) -> TimestampIndex:
+        if self._timestamp_index is None:
+            if self.path:
+                self._timestamp_index = TimestampIndex.load(self.path, self.timestamps)
+            else:
+                self._timestamp_index = TimestampIndex.build(self.timestamps)
+        return self._timestamp_index
+
+    @property
+    def summary(self) -> SenderSummary | None:
+        """Unfiltered sender counts, only meaningful for chat exports."""
+        if self._summary is None and self.meta.get("platform") != "wikipedia":
+            if self.path:
+                self._summary = SenderSummary.load(self.path)
+            if self._summary is None:
+                self._summary = SenderSummary.build(self.user_ids, len(self.users))
+        return self._summary
+
+    def close(self):
+        if isinstance(self._text, mmap.mmap):
+            self._text.close()
+
+
+class ArtifactWriter:
+    def __init__(self, text_file=None):
+        self.users = []
+        self.user_index = {}
+        self.user_ids = array("I")
+        self.reply_to = array("i")
+        self.timestamps = array("q")
+        self.lengths = array("i")
+        self.text_offsets = array("q", [0])
+        self.text_file = text_file
+        self.text = bytearray() if text_file is None else None
+        self.offset = 0
+
+    @classmethod
+    def resume(cls, users: list, columns: dict, text_file=None, text=b""):
+        """Continues writing after rows that were already stored."""
+        writer = cls(text_file)
+        for name in users:
+            writer.intern(name)
+        for name, dtype in COLUMNS.items():
+            column = getattr(writer, name)
+            del column[:]
+            column.frombytes(np.ascontiguousarray(columns[name], dtype=dtype).tobytes())
+        if text_file is None:
+            writer.text += text
+        writer.offset = int(writer.text_offsets[-1])
+        return writer
+
+    def intern(self, name: str) -> int:
+        idx = self.user_index.get(name)
+        if idx is None:
+            idx = self.user_index[name] = len(self.users)
+            self.users.append(name)
+        return idx
+
+    def append(self, user: str, text: str, timestamp: int, reply_to: str | None = None):
+        encoded = text.encode("utf-8")
+        if self.text_file is None:
+            self.text += encoded
+        else:
+            self.text_file.write(encoded)
+        self.offset += len(encoded)
+
+        self.user_ids.append(self.intern(user))
+        self.reply_to.append(self.intern(reply_to) if reply_to else -1)
+        self.timestamps.append(timestamp)
+        self.lengths.append(len(text))
+        self.text_offsets.append(self.offset)
+
+    def merge(self, users: list, columns: dict, text_part: str):
+        """Appends a chunk parsed by another writer, remapping its user ids."""
+        mapping = np.array([self.intern(name) for name in users] or [0], dtype=np.int64)
+
+        user_ids = mapping[np.frombuffer(columns["user_ids"], dtype=np.uint32)]
+        reply_to = np.frombuffer(columns["reply_to"], dtype=np.int32)
+        reply_to = np.where(reply_to >= 0, mapping[np.maximum(reply_to, 0)], -1)
+        offsets = np.frombuffer(columns["text_offsets"], dtype=np.int64)[1:] + self.offset
+
+        self.user_ids.frombytes(user_ids.astype(np.uint32).tobytes())
+        self.reply_to.frombytes(reply_to.astype(np.int32).tobytes())
+        self.timestamps.frombytes(columns["timestamps"].tobytes())
+        self.lengths.frombytes(columns["lengths"].tobytes())
+        self.text_offsets.frombytes(offsets.tobytes())
+
+        with open(text_part, "rb") as f:
+            if self.text_file is None:
+                self.text += f.read()
+            else:
+                shutil.copyfileobj(f, self.text_file)
+        self.offset = int(self.text_offsets[-1])
+
+    def columns(self) -> dict:
+        return {
+            name: np.frombuffer(getattr(self, name), dtype=dtype)
+            for name, dtype in COLUMNS.items()
+        }
+
+
+def iter_block_hashes(read_block, length: int):
+    for start in range(0, length, PREFIX_BLOCK_BYTES):
+        block = read_block(start, min(start + PREFIX_BLOCK_BYTES, length))
+        yield hashlib.blake2b(block, digest_size=16).hexdigest()
+
+
+def complete_prefix_length(txt_path: str) -> int:
+    """Byte length of the file up to and including its last newline."""
+    size = os.path.getsize(txt_path)
+    with open(txt_path, "rb") as f:
+        end = size
+        while end > 0:
+            start = max(0, end - PREFIX_BLOCK_BYTES)
+            f.seek(start)
+            newline = f.read(end - start).rfind(b"\n")
+            if newline >= 0:
+                return start + newline + 1
+            end = start
+    return 0
+
+
+def source_prefix(txt_path: str, platform: str, dialect, count: int) -> dict:
+    """Describes the newline-terminated part of the source.
+
+    A re-upload that starts with the same ``complete_bytes`` (checked block
+    by block against ``prefix_hashes``) only needs its tail parsed; the
+    first ``complete_count`` rows are exactly the messages of that prefix.
+    """
+    complete = complete_prefix_length(txt_path)
+    trailing = 0
+    if complete < os.path.getsize(txt_path):
+        trailing = sum(1 for _ in iter_records(txt_path, platform, dialect, complete))
+
+    with open(txt_path, "rb") as f:
+        def read_block(start, end):
+            f.seek(start)
+            return f.read(end - start)
+        hashes = list(iter_block_hashes(read_block, complete))
+
+    return {"complete_bytes": complete, "complete_count": count - trailing, "prefix_hashes": hashes}
+
+
+def iter_records(txt_path: str, platform: str, dialect=None, start: int = 0, end: int | None = None):
+    lines = iter_lines(txt_path, start, end)
+    if platform == "wikipedia":
+        return iter_wikipedia_records(lines)
+    return iter_whatsapp_records(lines, WhatsAppParser(dialect))
+
+
+def parse_range(txt_path: str, platform: str, dialect, start: int, end: int, text_part: str):
+    with open(text_part, "wb") as text_file:
+        writer = ArtifactWriter(text_file)
+        for user, text, timestamp, reply_to in iter_records(txt_path, platform, dialect, start, end):
+            writer.append(user, text, timestamp, reply_to)
+    return writer.users, {name: getattr(writer, name) for name in COLUMNS}
+
+
+def default_parse_workers(txt_path: str, requested: int | None = None) -> int:
+    """Chunks to parse ``txt_path`` in, ``requested`` or the process pool's size.
+
+    Capped at one chunk per PARALLEL_CHUNK_BYTES, and files below
+    PARALLEL_MIN_BYTES are always parsed inline, where handing chunks to
+    worker processes costs more than it saves.
+    """
+    size = os.path.getsize(txt_path)
+    if size < PARALLEL_MIN_BYTES:
+        return 1
+    return max(1, min(requested or PROCESS_POOL.workers, size // PARALLEL_CHUNK_BYTES))
+
+
+def write_records(writer: ArtifactWriter, txt_path: str, platform: str, workers: int = 1, work_dir: str | None = None) -> dict:
+    meta = {
+        "version": ARTIFACT_VERSION,
+        "platform": platform,
+        "dialect": None,
+        **source_signature(txt_path),
+    }
+
+    dialect = None
+    if platform != "wikipedia":
+        dialect = sniff_dialect(txt_path)
+        meta["dialect"] = dialect.name
+
+    ranges = split_line_ranges(txt_path, workers) if workers > 1 and work_dir else []
+    if len(ranges) > 1:
+        logger.info(f"Parsing {txt_path} in {len(ranges)} chunks")
+        futures = [
+            PROCESS_POOL.submit(parse_range, txt_path, platform, dialect, start, end,
+                                os.path.join(work_dir, f"text.{i}.part"))
+            for i, (start, end) in enumerate(ranges)
+        ]
+        for i, future in enumerate(futures):
+            users, columns = future.result()
+            text_part = os.path.join(work_dir, f"text.{i}.part")
+            writer.merge(users, columns, text_part)
+            os.remove(text_part)
+    else:
+        for user, text, timestamp, reply_to in iter_records(txt_path, platform, dialect):
+            writer.append(user, text, timestamp, reply_to)
+
+    meta["count"] = len(writer.user_ids)
+    meta["users"] = writer.users
+    meta.update(source_prefix(txt_path, platform, dialect, meta["count"]))
+    return meta
+
+
+def save_indexes(path: str, platform: str, columns: dict, n_users: int):
+    TimestampIndex.build(columns["timestamps"]).save(path)
+    if platform != "wikipedia":
+        SenderSummary.build(columns["user_ids"], n_users).save(path)
+
+
+def open_artifact(path: str, meta: dict) -> MessageArtifact:
+    columns = {
+        name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+        for name in COLUMNS
+    }
+
+    text = b""
+    if os.path.getsize(os.path.join(path, "text.bin")) > 0:
+        with open(os.path.join(path, "text.bin"), "rb") as f:
+            text = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    return MessageArtifact(meta, columns, text, path)
+
+
+def build_artifact(txt_path: str, platform: str = "whatsapp", workers: int | None = None) -> MessageArtifact:
+    """Parses ``txt_path`` into a fresh artifact, unless another build stored one meanwhile.
+
+    Builds of the same artifact are serialized by ``artifact_lock``, and each
+    writes into its own ``mkdtemp`` directory, so no build can remove or
+    publish a half-written one. A directory another process published
+    without the lock (no ``fcntl``) is kept when it is fresh.
+    """
+    path = artifact_path(txt_path, platform)
+    with artifact_lock(path):
+        artifact = load_artifact(txt_path, platform)
+        if artifact is not None:
+            return artifact
+        return _build_artifact(txt_path, platform, path, workers)
+
+
+def _build_artifact(txt_path: str, platform: str, path: str, workers: int | None) -> MessageArtifact:
+    workers = default_parse_workers(txt_path, workers)
+    tmp_path = None
+
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = tempfile.mkdtemp(prefix=f"{os.path.basename(path)}.tmp-", dir=os.path.dirname(path))
+
+        with open(os.path.join(tmp_path, "text.bin"), "wb") as text_file:
+            writer = ArtifactWriter(text_file)
+            meta = write_records(writer, txt_path, platform, workers, tmp_path)
+
+        columns = writer.columns()
+        for name, column in columns.items():
+            np.save(os.path.join(tmp_path, f"{name}.npy"), column)
+        save_indexes(tmp_path, platform, columns, len(meta["users"]))
+        with open(os.path.join(tmp_path, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+
+        published = load_artifact(txt_path, platform)
+        if published is None:
+            try:
+                publish_artifact(tmp_path, path)
+            except OSError:
+                published = load_artifact(txt_path, platform)
+                if published is None:
+                    raise
+        if published is not None:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            return published
+    except OSError as e:
+        logger.warning(f"Could not store message artifact for {txt_path}, keeping it in memory: {e}")
+        if tmp_path is not None:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+        writer = ArtifactWriter()
+        meta = write_records(writer, txt_path, platform)
+        return MessageArtifact(meta, writer.columns(), bytes(writer.text))
+
+    logger.info(f"Stored message artifact for {txt_path} ({platform}): {meta['count']} messages")
+    return open_artifact(path, meta)
+
+
+def load_artifact(txt_path: str, platform: str = "whatsapp") -> MessageArtifact | None:
+    path = artifact_path(txt_path, platform)
+    meta_path = os.path.join(path, "meta.json")
+    if not os.path.exists(meta_path):
+        return None
+
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Unreadable message artifact {path}: {e}")
+        return None
+
+    signature = source_signature(txt_path)
+    if meta.get("version") != ARTIFACT_VERSION or any(meta.get(k) != v for k, v in signature.items()):
+        logger.info(f"Message artifact for {txt_path} is stale")
+        return None
+
+    return open_artifact(path, meta)
+
+
+def load_or_build_artifact(txt_path: str, platform: str = "whatsapp", workers: int | None = None) -> MessageArtifact:
+    artifact = load_artifact(txt_path, platform)
+    if artifact is None:
+        artifact = build_artifact(txt_path, platform, workers)
+    return artifact
+
+
+def remove_artifacts(txt_path: str):
+    folder, name = os.path.split(txt_path)
+    artifacts_dir = os.path.join(folder, ARTIFACT_DIRNAME)
+    for platform in ("whatsapp", "wikipedia"):
+        path = os.path.join(artifacts_dir, f"{name}.{platform}")
+        shutil.rmtree(path, ignore_errors=True)
+        if os.path.exists(f"{path}.lock"):
+            os.remove(f"{path}.lock")
@@ -0,0 +1,123 @@
+import numpy as np
+
+from ingestion.matcher import MultiPatternMatcher
+from ingestion.parsing import to_epoch
+
+SAMPLE_ROWS = 4096
+
+
+class ColumnPredicate:
+    """A filter that only reads numeric columns, run as a boolean mask."""
+
+    __slots__ = ("name", "mask", "selectivity")
+
+    def __init__(self, name: str, mask, selectivity: float):
+        self.name = name
+        self.mask = mask
+        self.selectivity = selectivity
+
+    def __repr__(self):
+        return f"{self.name} (~{self.selectivity:.0%})"
+
+
+def _int_or_none(value):
+    return int(value) if value is not None and value != '' else None
+
+
+def _sample(column):
+    step = max(1, len(column) // SAMPLE_ROWS)
+    return np.asarray(column[::step])
+
+
+class FilterPlan:
+    """Request filters compiled against one message artifact.
+
+    Predicates run cheapest first: the date window is a binary search on
+    the timestamp index, username and length are masks over integer
+    columns (most selective first), and keyword matching, the only step
+    that has to decode text, sees just the rows that are left.
+    """
+
+    def __init__(self, artifact, filters):
+        self.artifact = artifact
+        self.predicates = []
+        self.keyword_matcher = None
+        self.empty = False
+
+        start_ts = to_epoch(filters['start_dt']) if filters.get('start_dt') else None
+        end_ts = to_epoch(filters['end_dt']) if filters.get('end_dt') else None
+        if start_ts is None and end_ts is None:
+            self.rows = slice(0, len(artifact))
+        else:
+            self.rows = artifact.timestamp_index.rows_between(start_ts, end_ts)
+
+        username = filters.get('username')
+        if username and username.strip():
+            self._add_username(username.strip().lower())
+
+        min_len = _int_or_none(filters.get('min_length'))
+        max_len = _int_or_none(filters.get('max_length'))
+        if min_len is not None or max_len is not None:
+            self._add_length(min_len, max_len)
+
+        keywords = filters.get('keywords')
+        if keywords:
+            self.keyword_matcher = MultiPatternMatcher([k.strip() for k in keywords.split(",")], lowercase=True)
+
+        self.predicates.sort(key=lambda predicate: predicate.selectivity)
+
+    def _add_username(self, username: str):
+        user_ids = np.array([i for i, name in enumerate(self.artifact.users) if name.lower() == username], dtype=np.int64)
+        if not len(user_ids):
+            self.empty = True
+            return
+
+        summary = self.artifact.summary
+        total = len(self.artifact) or 1
+        selectivity = summary.user_counts[user_ids].sum() / total if summary is not None else 1 / max(len(self.artifact.users), 1)
+
+        if len(user_ids) == 1:
+            user_id = int(user_ids[0])
+            mask = lambda rows: self.artifact.user_ids[rows] == user_id
+        else:
+            mask = lambda rows: np.isin(self.artifact.user_ids[rows], user_ids)
+        self.predicates.append(ColumnPredicate("username", mask, float(selectivity)))
+
+    def _add_length(self, min_len, max_len):
+        lo = min_len if min_len is not None else np.iinfo(np.int32).min
+        hi = max_len if max_len is not None else np.iinfo(np.int32).max
+        if lo > hi:
+            self.empty = True
+            return
+
+        sample = _sample(self.artifact.lengths)
+        selectivity = float(((sample >= lo) & (sample <= hi)).mean()) if len(sample) else 1.0
+
+        def mask(rows):
+            lengths = self.artifact.lengths[rows]
+            return (lengths >= lo) & (lengths <= hi)
+        self.predicates.append(ColumnPredicate("length", mask, selectivity))
+
+    def describe(self) -> list:
+        steps = ["date window"] + [repr(p) for p in self.predicates]
+        if self.keyword_matcher:
+            steps.append("keywords")
+        return steps
+
+    def select_rows(self, rows):
+        """Row numbers inside ``rows`` (a slice or sorted array) that pass every filter."""
+        if self.empty:
+            return np.zeros(0, dtype=np.int64)
+
+        selected = np.arange(rows.start, rows.stop) if isinstance(rows, slice) else np.asarray(rows)
+        for predicate in self.predicates:
+            if not len(selected):
+                break
+            selected = selected[predicate.mask(selected)]
+
+        if self.keyword_matcher and len(selected):
+            text = self.artifact.text
+            search = self.keyword_matcher.search
+            keep = np.fromiter((search(text(i)) for i in selected.tolist()), dtype=bool, count=len(selected))
+            selected = selected[keep]
+        return selected
@@ -0,0 +1,107 @@
+import os
+import json
+import shutil
+import logging
+import tempfile
+
+import numpy as np
+
+from ingestion.artifact import (
+    COLUMNS, ArtifactWriter, MessageArtifact, artifact_lock, iter_block_hashes, iter_records, load_artifact,
+    open_artifact, publish_artifact, source_prefix, source_signature,
+)
+from ingestion.summary import SenderSummary
+from ingestion.timestamp_index import TimestampIndex
+from ingestion.whatsapp_parser import WhatsAppDialect
+
+logger = logging.getLogger(__name__)
+
+
+def shares_prefix(meta: dict, content: bytes) -> bool:
+    """True when ``content`` starts with the parsed prefix of the stored source."""
+    complete = meta.get("complete_bytes")
+    hashes = meta.get("prefix_hashes")
+    if complete is None or hashes is None or len(content) < complete:
+        return False
+
+    view = memoryview(content)
+    new_hashes = iter_block_hashes(lambda start, end: view[start:end], complete)
+    return all(new == old for new, old in zip(new_hashes, hashes))
+
+
+def extend_artifact(txt_path: str, platform: str, previous: MessageArtifact) -> MessageArtifact:
+    """Appends the messages past the stored prefix to a copy of ``previous`` and publishes it.
+
+    The source must already hold the longer export and ``shares_prefix``
+    must have accepted it. Only the new tail is parsed; rows that came from
+    an unterminated last line are dropped and parsed again, since the
+    re-upload may have completed that line. The extended artifact is written
+    into its own ``mkdtemp`` directory and swapped in by
+    ``publish_artifact``, so readers that still map the old files never see
+    them truncated or half-written.
+    """
+    with artifact_lock(previous.path):
+        published = load_artifact(txt_path, platform)
+        if published is not None:
+            previous.close()
+            return published
+
+        tmp_path = tempfile.mkdtemp(prefix=f"{os.path.basename(previous.path)}.tmp-",
+                                    dir=os.path.dirname(previous.path))
+        try:
+            meta = _extend_artifact(txt_path, platform, previous, tmp_path)
+            publish_artifact(tmp_path, previous.path)
+        except BaseException:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            raise
+        return open_artifact(previous.path, meta)
+
+
+def _extend_artifact(txt_path: str, platform: str, previous: MessageArtifact, path: str) -> dict:
+    meta = dict(previous.meta)
+    keep = meta["complete_count"]
+    start = meta["complete_bytes"]
+
+    columns = {name: np.array(getattr(previous, name)[:keep]) for name in COLUMNS}
+    columns["text_offsets"] = np.array(previous.text_offsets[:keep + 1])
+    index = previous.timestamp_index if keep == len(previous) else TimestampIndex.build(columns["timestamps"])
+    summary = previous.summary if keep == len(previous) else SenderSummary.build(columns["user_ids"], len(meta["users"]))
+
+    dialect = WhatsAppDialect.from_name(meta["dialect"]) if meta.get("dialect") else None
+    with open(os.path.join(previous.path, "text.bin"), "rb") as old_text, \
+            open(os.path.join(path, "text.bin"), "wb") as text_file:
+        writer = ArtifactWriter.resume(meta["users"], columns, text_file)
+        copy_bytes(old_text, text_file, writer.offset)
+        for user, text, timestamp, reply_to in iter_records(txt_path, platform, dialect, start):
+            writer.append(user, text, timestamp, reply_to)
+    previous.close()
+
+    columns = writer.columns()
+    for name, column in columns.items():
+        np.save(os.path.join(path, f"{name}.npy"), column)
+
+    TimestampIndex.extend(index, columns["timestamps"]).save(path)
+
+    if summary is not None:
+        last_sender = int(columns["user_ids"][keep - 1]) if keep else -1
+        summary.extend(columns["user_ids"][keep:], keep, last_sender, len(writer.users)).save(path)
+
+    meta.update(source_signature(txt_path))
+    meta["count"] = len(writer.user_ids)
+    meta["users"] = writer.users
+    meta.update(source_prefix(txt_path, platform, dialect, meta["count"]))
+    with open(os.path.join(path, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False)
+
+    logger.info(f"Extended message artifact for {txt_path} ({platform}): {keep} kept, {meta['count'] - keep} appended")
+    return meta
+
+
+def copy_bytes(source, target, length: int):
+    """Copies the first ``length`` bytes of ``source`` into ``target``."""
+    while length > 0:
+        block = source.read(min(length, 1 << 20))
+        if not block:
+            raise ValueError("Stored message text is shorter than its offsets")
+        target.write(block)
+        length -= len(block)
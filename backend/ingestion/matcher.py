@@ -0,0 +1,70 @@
+import re
+
+
+def _build_trie(patterns):
+    root = {}
+    for pattern in patterns:
+        node = root
+        for char in pattern:
+            if "" in node:
+                break
+            node = node.setdefault(char, {})
+        else:
+            # A shorter pattern already matches everything this node would.
+            node.clear()
+            node[""] = True
+    return root
+
+
+def _trie_to_regex(node) -> str:
+    if "" in node:
+        return ""
+
+    leaves = []
+    branches = []
+    for char in sorted(node):
+        tail = _trie_to_regex(node[char])
+        if tail:
+            branches.append(re.escape(char) + tail)
+        else:
+            leaves.append(re.escape(char))
+
+    if len(leaves) == 1:
+        branches.append(leaves[0])
+    elif leaves:
+        branches.append(f"[{''.join(leaves)}]")
+
+    return branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+
+
+class MultiPatternMatcher:
+    """Tests a text against many literal patterns in a single scan.
+
+    The patterns are folded into a prefix trie and compiled to one regex,
+    so at every position the engine follows at most one branch per
+    character instead of running one substring search per pattern.
+    """
+
+    def __init__(self, patterns, lowercase=False, extra_regexes=()):
+        self.lowercase = lowercase
+        patterns = [p.lower() if lowercase else p for p in patterns]
+        self.matches_everything = "" in patterns
+
+        parts = []
+        literals = [p for p in patterns if p]
+        if literals:
+            parts.append(_trie_to_regex(_build_trie(literals)))
+        for regex in extra_regexes:
+            flags = "i" if regex.flags & re.IGNORECASE else ""
+            parts.append(f"(?{flags}:{regex.pattern})" if flags else f"(?:{regex.pattern})")
+
+        self.regex = re.compile("|".join(parts)) if parts else None
+
+    def search(self, text: str) -> bool:
+        if self.matches_everything:
+            return True
+        if self.regex is None:
+            return False
+        if self.lowercase:
+            text = text.lower()
+        return self.regex.search(text) is not None
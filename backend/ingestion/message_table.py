@@ -0,0 +1,179 @@
+from array import array
+
+import numpy as np
+
+
+def _first_occurrence_order(values):
+    """Distinct non-negative values ordered by where they first appear."""
+    values = values[values >= 0]
+    unique, first = np.unique(values, return_index=True)
+    return unique[np.argsort(first, kind="stable")]
+
+
+class MessageTable:
+    """Selected messages as int columns instead of tuples of strings.
+
+    User names are interned in order of first appearance (sender, then
+    reply target), so anonymizing is a rename of ``users``. Text is not
+    copied: when it is needed the table keeps the source rows and decodes
+    them on the way out.
+    """
+
+    __slots__ = ("users", "user_ids", "reply_to", "threaded", "_text_source", "_text_rows")
+
+    def __init__(self, users, user_ids, reply_to, threaded=False, text_source=None, text_rows=None):
+        self.users = users
+        self.user_ids = user_ids
+        self.reply_to = reply_to
+        self.threaded = threaded
+        self._text_source = text_source
+        self._text_rows = text_rows
+
+    def __len__(self):
+        return len(self.user_ids)
+
+    @classmethod
+    def from_rows(cls, artifact, rows, keep_text=False):
+        rows = np.fromiter(rows, dtype=np.int64) if not isinstance(rows, np.ndarray) else rows.astype(np.int64)
+        user_ids = np.asarray(artifact.user_ids[rows], dtype=np.int32)
+        reply_to = np.asarray(artifact.reply_to[rows], dtype=np.int32)
+
+        if (reply_to >= 0).any():
+            used = _first_occurrence_order(np.column_stack((user_ids, reply_to)).ravel())
+        else:
+            used = _first_occurrence_order(user_ids)
+        mapping = np.full(len(artifact.users) + 1, -1, dtype=np.int32)
+        mapping[used] = np.arange(len(used), dtype=np.int32)
+
+        return cls(
+            [artifact.users[i] for i in used.tolist()],
+            mapping[user_ids].astype(np.uint32),
+            mapping[reply_to],
+            artifact.meta.get("platform") == "wikipedia",
+            artifact.text if keep_text else None,
+            rows if keep_text else None,
+        )
+
+    @classmethod
+    def from_messages(cls, messages):
+        """Builds a table from ``(user, text)`` or ``(user, text, reply_to)`` tuples."""
+        users, index = [], {}
+        user_ids, reply_to, texts = array("I"), array("i"), []
+        threaded = False
+
+        def intern(name):
+            idx = index.get(name)
+            if idx is None:
+                idx = index[name] = len(users)
+                users.append(name)
+            return idx
+
+        for msg in messages:
+            threaded = threaded or len(msg) == 3
+            user, text, target = msg if len(msg) == 3 else (*msg, None)
+            user_ids.append(intern(user))
+            reply_to.append(intern(target) if target else -1)
+            texts.append(text)
+
+        return cls(
+            users,
+            np.frombuffer(user_ids, dtype=np.uint32),
+            np.frombuffer(reply_to, dtype=np.int32),
+            threaded,
+            texts.__getitem__,
+            np.arange(len(texts)),
+        )
+
+    def anonymized(self):
+        return MessageTable(
+            [f"User_{i + 1}" for i in range(len(self.users))],
+            self.user_ids, self.reply_to, self.threaded, self._text_source, self._text_rows
+        )
+
+    def message_counts(self) -> dict:
+        """Messages per sender, in order of each sender's first message."""
+        user_ids = self.user_ids.astype(np.int64)
+        counts = np.bincount(user_ids, minlength=len(self.users))
+        return {self.users[i]: int(counts[i]) for i in _first_occurrence_order(user_ids).tolist()}
+
+    def sequential_edges(self, directed=False) -> dict:
+        """Counts reply edges, or consecutive-sender edges when there is no reply target.
+
+        Undirected edges are keyed by the name-sorted pair, like the
+        per-message loop they replace.
+        """
+        user_ids = self.user_ids.astype(np.int32)
+        previous = np.empty_like(user_ids)
+        previous[:1] = -1
+        previous[1:] = user_ids[:-1]
+
+        valid = (previous >= 0) & (previous != user_ids)
+        if self.threaded:
+            is_reply = (self.reply_to >= 0) & (self.reply_to != user_ids)
+            previous = np.where(is_reply, self.reply_to, previous)
+            valid |= is_reply
+        positions = np.flatnonzero(valid)
+        current, target = user_ids[positions], previous[positions]
+        del previous, valid
+
+        if not directed:
+            rank = np.empty(len(self.users), dtype=np.int32)
+            rank[np.argsort(np.array(self.users, dtype=object), kind="stable")] = np.arange(len(self.users), dtype=np.int32)
+            swap = rank[current] > rank[target]
+            current, target = np.where(swap, target, current), np.where(swap, current, target)
+
+        n_users = max(len(self.users), 1)
+        keys = current.astype(np.int64) * n_users + target
+        unique, first, counts = np.unique(keys, return_index=True, return_counts=True)
+        by_first = np.argsort(first, kind="stable")
+        unique = unique[by_first]
+
+        users = self.users
+        return {
+            (users[s], users[t]): c
+            for s, t, c in zip((unique // n_users).tolist(), (unique % n_users).tolist(), counts[by_first].tolist())
+        }
+
+    def sequential_weights(self, n_prev: int, message_weights) -> dict:
+        """Weights (sender, earlier sender) pairs over the last ``n_prev`` messages."""
+        n_users = max(len(self.users), 1)
+        user_ids = self.user_ids.astype(np.int32)
+        lags = min(n_prev, len(message_weights))
+        if not lags or not len(user_ids):
+            return {}
+
+        # One row per message, one column per lag: row-major order is the
+        # order the per-message loop visited the pairs in.
+        previous = np.full((len(user_ids), lags), -1, dtype=np.int32)
+        for lag in range(1, lags + 1):
+            previous[lag:, lag - 1] = user_ids[:-lag]
+        valid = (previous >= 0) & (previous != user_ids[:, None])
+
+        keys = user_ids[:, None].astype(np.int64) * n_users + previous
+        keys = keys[valid]
+        weights = np.broadcast_to(np.asarray(message_weights[:lags], dtype=np.float64), previous.shape)[valid]
+        del previous, valid
+
+        unique, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+        sums = np.bincount(inverse, weights=weights, minlength=len(unique))
+        by_first = np.argsort(first, kind="stable")
+        unique = unique[by_first]
+
+        users = self.users
+        return {
+            (users[s], users[t]): w
+            for s, t, w in zip((unique // n_users).tolist(), (unique % n_users).tolist(), sums[by_first].tolist())
+        }
+
+    def messages(self) -> list:
+        """The ``(user, text)`` tuples, with ``reply_to`` as a third field for threaded sources."""
+        if self._text_source is None:
+            return []
+        users = self.users
+        text = self._text_source
+        names = [users[i] for i in self.user_ids.tolist()]
+        texts = [text(i) for i in self._text_rows.tolist()]
+        if not self.threaded:
+            return list(zip(names, texts))
+        targets = [users[i] if i >= 0 else None for i in self.reply_to.tolist()]
+        return list(zip(names, texts, targets))
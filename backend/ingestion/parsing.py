@@ -0,0 +1,34 @@
+import re
+from datetime import datetime
+
+from utils import MEDIA_RE, spam_messages
+from ingestion.matcher import MultiPatternMatcher
+
+
+EPOCH = datetime(1970, 1, 1)
+SYSTEM_MESSAGE_MATCHER = MultiPatternMatcher(spam_messages, extra_regexes=[MEDIA_RE])
+
+
+def to_epoch(dt: datetime) -> int:
+    return int((dt - EPOCH).total_seconds())
+
+
+def is_system_message(text: str) -> bool:
+    return SYSTEM_MESSAGE_MATCHER.search(text)
+
+
+def parse_wikipedia_line(line: str):
+    if not line.strip() or line.startswith('#'):
+        return None
+
+    match = re.match(r"\[(.*?)\] (.*?) -> (.*?): (.*)", line)
+    if match:
+        _, user, reply_to, text = match.groups()
+    else:
+        match_simple = re.match(r"\[(.*?)\] (.*?): (.*)", line)
+        if not match_simple:
+            return None
+        _, user, text = match_simple.groups()
+        reply_to = None
+
+    return user.strip(), text.strip(), reply_to.strip() if reply_to else None
@@ -0,0 +1,98 @@
+import math
+import random
+from itertools import islice
+
+SAMPLED_LIMIT_TYPES = {"random", "random_per_user", "random_by_time"}
+TIME_STRATA = 24
+
+_END = object()
+
+
+def new_seed() -> int:
+    return random.SystemRandom().randrange(2 ** 31)
+
+
+def _open_uniform(rng) -> float:
+    u = rng.random()
+    while u == 0.0:
+        u = rng.random()
+    return u
+
+
+def reservoir_sample(items, k: int, rng) -> list:
+    """Uniform sample of ``k`` items from a stream of unknown length.
+
+    Algorithm L: keeps only the reservoir and draws O(k log(n/k)) random
+    numbers, skipping over the items in between. The sample is returned in
+    stream order.
+    """
+    it = iter(items)
+    reservoir = list(zip(range(k), it))
+    if len(reservoir) < k:
+        return [item for _, item in reservoir]
+
+    position = k - 1
+    w = math.exp(math.log(_open_uniform(rng)) / k)
+    while True:
+        skip = int(math.log(_open_uniform(rng)) / math.log1p(-w))
+        nxt = next(islice(it, skip, None), _END)
+        if nxt is _END:
+            break
+        position += skip + 1
+        reservoir[rng.randrange(k)] = (position, nxt)
+        w *= math.exp(math.log(_open_uniform(rng)) / k)
+
+    reservoir.sort(key=lambda entry: entry[0])
+    return [item for _, item in reservoir]
+
+
+def allocate(counts: dict, k: int) -> dict:
+    """Splits ``k`` across strata in proportion to their sizes (largest remainder)."""
+    total = sum(counts.values())
+    if total <= k:
+        return dict(counts)
+
+    exact = {key: k * n / total for key, n in counts.items()}
+    quotas = {key: int(share) for key, share in exact.items()}
+    leftover = k - sum(quotas.values())
+    by_remainder = sorted(counts, key=lambda key: exact[key] - quotas[key], reverse=True)
+    for key in by_remainder[:leftover]:
+        quotas[key] += 1
+    return quotas
+
+
+def stratified_sample(items, k: int, rng, stratum) -> list:
+    """Proportionally allocated sample with a reservoir per stratum.
+
+    Every stratum keeps at most ``k`` items (algorithm R), so memory is
+    O(k * strata). Each stratum's share of ``k`` is then drawn from its
+    reservoir, and the result is returned in stream order.
+    """
+    reservoirs = {}
+    seen = {}
+    for position, item in enumerate(items):
+        key = stratum(item)
+        reservoir = reservoirs.get(key)
+        if reservoir is None:
+            reservoir = reservoirs[key] = []
+            seen[key] = 0
+        seen[key] += 1
+        if len(reservoir) < k:
+            reservoir.append((position, item))
+        else:
+            j = rng.randrange(seen[key])
+            if j < k:
+                reservoir[j] = (position, item)
+
+    sample = []
+    for key, quota in allocate(seen, k).items():
+        sample.extend(rng.sample(reservoirs[key], quota))
+    sample.sort(key=lambda entry: entry[0])
+    return [item for _, item in sample]
+
+
+def sample_messages(messages, k: int, seed: int, stratum=None) -> list:
+    rng = random.Random(seed)
+    if stratum is None:
+        return reservoir_sample(messages, k, rng)
+    return stratified_sample(messages, k, rng, stratum)
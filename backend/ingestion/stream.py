@@ -0,0 +1,83 @@
+import os
+from collections import deque
+from itertools import islice
+
+from ingestion.parsing import parse_wikipedia_line, is_system_message
+from ingestion.sampling import SAMPLED_LIMIT_TYPES, sample_messages
+
+
+CHUNK_SIZE = 1 << 20
+BLOCK_ROWS = 1 << 16
+
+
+def iter_lines(txt_path: str, start: int = 0, end: int | None = None, chunk_size: int = CHUNK_SIZE):
+    with open(txt_path, "rb") as f:
+        f.seek(start)
+        remaining = end - start if end is not None else None
+        pending = b""
+        while remaining is None or remaining > 0:
+            chunk = f.read(chunk_size if remaining is None else min(chunk_size, remaining))
+            if not chunk:
+                break
+            if remaining is not None:
+                remaining -= len(chunk)
+            lines = (pending + chunk).split(b"\n")
+            pending = lines.pop()
+            for line in lines:
+                yield line.rstrip(b"\r").decode("utf-8")
+        if pending:
+            yield pending.rstrip(b"\r").decode("utf-8")
+
+
+def split_line_ranges(txt_path: str, parts: int):
+    size = os.path.getsize(txt_path)
+    bounds = [0]
+    with open(txt_path, "rb") as f:
+        for i in range(1, parts):
+            f.seek(max(size * i // parts, bounds[-1]))
+            f.readline()
+            position = f.tell()
+            if position >= size:
+                break
+            if position > bounds[-1]:
+                bounds.append(position)
+    bounds.append(size)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def iter_whatsapp_records(lines, parser):
+    for line in lines:
+        parsed = parser.parse(line)
+        if not parsed:
+            continue
+        user, text, timestamp = parsed
+        if timestamp is None or is_system_message(text):
+            continue
+        yield user, text, timestamp, None
+
+
+def iter_wikipedia_records(lines):
+    for line in lines:
+        parsed = parse_wikipedia_line(line)
+        if not parsed:
+            continue
+        user, text, reply_to = parsed
+        yield user, text, 0, reply_to
+
+
+def iter_blocks(start: int, stop: int, block_rows: int = BLOCK_ROWS):
+    for block_start in range(start, stop, block_rows):
+        yield block_start, min(block_start + block_rows, stop)
+
+
+def limit_messages(messages, limit, limit_type="first", seed=None, stratum=None):
+    """Applies a message limit; sampled limit types need ``seed`` (and ``stratum`` when stratified)."""
+    if not limit or limit == '' or int(limit) <= 0:
+        return messages
+
+    limit = int(limit)
+    if limit_type == "last":
+        return iter(deque(messages, maxlen=limit))
+    elif limit_type in SAMPLED_LIMIT_TYPES:
+        return iter(sample_messages(messages, limit, seed, stratum))
+    return islice(messages, limit)
@@ -0,0 +1,93 @@
+import os
+
+import numpy as np
+
+
+class SenderSummary:
+    """Unfiltered per-user message counts and consecutive-sender pairs.
+
+    A pair (user, previous) is counted every time ``user`` writes right
+    after a different ``previous`` sender, which is exactly what the
+    simple sequential edge builder counts when no message filter applies.
+    ``first_rows`` keeps the row where each pair first occurs so edges can
+    be replayed in their original insertion order.
+    """
+
+    FILES = ("user_counts", "pair_users", "pair_previous", "pair_counts", "pair_first_rows")
+
+    def __init__(self, user_counts, pair_users, pair_previous, pair_counts, pair_first_rows):
+        self.user_counts = user_counts
+        self.pair_users = pair_users
+        self.pair_previous = pair_previous
+        self.pair_counts = pair_counts
+        self.pair_first_rows = pair_first_rows
+
+    @classmethod
+    def build(cls, user_ids, n_users: int):
+        return cls.empty(n_users).extend(user_ids, 0, -1, n_users)
+
+    @classmethod
+    def empty(cls, n_users: int = 0):
+        return cls(
+            np.zeros(n_users, dtype=np.int64),
+            np.zeros(0, dtype=np.int64),
+            np.zeros(0, dtype=np.int64),
+            np.zeros(0, dtype=np.int64),
+            np.zeros(0, dtype=np.int64),
+        )
+
+    def extend(self, user_ids, first_row: int, last_sender: int, n_users: int):
+        """Returns the summary of these messages appended after ``first_row``.
+
+        ``last_sender`` is the sender of the row right before the appended
+        block (-1 when there is none), so the pair across the seam is kept.
+        """
+        user_ids = np.asarray(user_ids, dtype=np.int64)
+        user_counts = np.zeros(n_users, dtype=np.int64)
+        user_counts[:len(self.user_counts)] = self.user_counts
+        user_counts += np.bincount(user_ids, minlength=n_users)
+
+        senders = np.concatenate(([last_sender], user_ids)) if last_sender >= 0 else user_ids
+        rows = np.arange(first_row - (1 if last_sender >= 0 else 0), first_row + len(user_ids))
+        current, previous = senders[1:], senders[:-1]
+        changed = current != previous
+
+        keys = np.concatenate((
+            self.pair_users * n_users + self.pair_previous,
+            current[changed] * n_users + previous[changed],
+        ))
+        counts = np.concatenate((self.pair_counts, np.ones(int(changed.sum()), dtype=np.int64)))
+        first_rows = np.concatenate((self.pair_first_rows, rows[1:][changed]))
+
+        unique_keys, inverse = np.unique(keys, return_inverse=True)
+        merged_counts = np.bincount(inverse, weights=counts, minlength=len(unique_keys)).astype(np.int64)
+        merged_first = np.full(len(unique_keys), np.iinfo(np.int64).max, dtype=np.int64)
+        np.minimum.at(merged_first, inverse, first_rows)
+
+        order = np.argsort(merged_first, kind="stable")
+        unique_keys = unique_keys[order]
+        return SenderSummary(
+            user_counts,
+            unique_keys // n_users if n_users else unique_keys,
+            unique_keys % n_users if n_users else unique_keys,
+            merged_counts[order],
+            merged_first[order],
+        )
+
+    def save(self, path: str):
+        for name in self.FILES:
+            np.save(os.path.join(path, f"{name}.npy"), getattr(self, name))
+
+    @classmethod
+    def load(cls, path: str):
+        if not os.path.exists(os.path.join(path, "user_counts.npy")):
+            return None
+        return cls(*(np.load(os.path.join(path, f"{name}.npy")) for name in cls.FILES))
+
+    def edges(self, users, directed=False) -> dict:
+        edges_counter = {}
+        for user, previous, count in zip(self.pair_users.tolist(), self.pair_previous.tolist(), self.pair_counts.tolist()):
+            user, previous = users[user], users[previous]
+            edge = (user, previous) if directed else tuple(sorted([user, previous]))
+            edges_counter[edge] = edges_counter.get(edge, 0) + count
+        return edges_counter
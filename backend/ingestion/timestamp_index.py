@@ -0,0 +1,67 @@
+import os
+
+import numpy as np
+
+
+class TimestampIndex:
+    """Sorted message timestamps mapped back to artifact rows.
+
+    Exports are normally chronological, in which case the timestamp column
+    itself is the index and a date window is one contiguous row span.
+    Out-of-order exports keep a stable sort permutation next to the
+    artifact so a window still costs a binary search plus its own rows.
+    """
+
+    ORDER_FILE = "timestamp_order.npy"
+
+    def __init__(self, timestamps, order=None):
+        self.order = order
+        self.sorted_timestamps = timestamps if order is None else timestamps[order]
+
+    @classmethod
+    def build(cls, timestamps):
+        if len(timestamps) < 2 or bool(np.all(timestamps[1:] >= timestamps[:-1])):
+            return cls(timestamps)
+        return cls(timestamps, np.argsort(timestamps, kind="stable"))
+
+    @classmethod
+    def extend(cls, previous, timestamps):
+        """Index for ``timestamps`` whose leading rows ``previous`` indexed.
+
+        Appending in order to a chronological export only checks the new
+        rows; anything else falls back to a full build.
+        """
+        start = len(previous.sorted_timestamps)
+        if previous.is_chronological and start <= len(timestamps):
+            tail = timestamps[max(start - 1, 0):]
+            if len(tail) < 2 or bool(np.all(tail[1:] >= tail[:-1])):
+                return cls(timestamps)
+        return cls.build(timestamps)
+
+    @classmethod
+    def load(cls, path: str, timestamps):
+        order_path = os.path.join(path, cls.ORDER_FILE)
+        if os.path.exists(order_path):
+            return cls(timestamps, np.load(order_path, mmap_mode="r"))
+        return cls(timestamps)
+
+    def save(self, path: str):
+        if self.order is not None:
+            np.save(os.path.join(path, self.ORDER_FILE), self.order)
+
+    @property
+    def is_chronological(self) -> bool:
+        return self.order is None
+
+    def rows_between(self, start_ts: int | None = None, end_ts: int | None = None):
+        """Rows with start_ts <= timestamp <= end_ts, in file order.
+
+        Returns a slice for chronological exports, otherwise a sorted array
+        of row numbers.
+        """
+        lo = 0 if start_ts is None else int(np.searchsorted(self.sorted_timestamps, start_ts, side="left"))
+        hi = len(self.sorted_timestamps) if end_ts is None else int(np.searchsorted(self.sorted_timestamps, end_ts, side="right"))
+        hi = max(lo, hi)
+        if self.order is None:
+            return slice(lo, hi)
+        return np.sort(self.order[lo:hi])
@@ -0,0 +1,161 @@
+import re
+import logging
+from datetime import date
+from functools import lru_cache
+from itertools import islice
+
+logger = logging.getLogger(__name__)
+
+INVISIBLE_CHARS = str.maketrans({"\u202f": " ", "\u200f": " ", "\u200e": " "})
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+# Each layout captures (date, hour, minute, second, user, text).
+LAYOUTS = {
+    "bracket": re.compile(
+        r"\[(\d{1,2}([./])\d{1,2}\2\d{4}), (\d{1,2}):(\d{2})(?::(\d{2}))?\] *[~\s]*([^:]+):(.*)"
+    ),
+    "dash": re.compile(
+        r"(\d{1,2}/\d{1,2}/\d{2,4}), (\d{2}):(\d{2})(?::(\d{2}))? - ([^:]+):(.*)"
+    ),
+}
+LAYOUT_GROUPS = {
+    "bracket": (1, 3, 4, 5, 6, 7),
+    "dash": (1, 2, 3, 4, 5, 6),
+}
+SAMPLE_LINES = 2000
+SAMPLE_TAIL_BYTES = 64 * 1024
+
+
+class WhatsAppDialect:
+    __slots__ = ("layout", "day_first")
+
+    def __init__(self, layout: str, day_first: bool):
+        self.layout = layout
+        self.day_first = day_first
+
+    @property
+    def name(self) -> str:
+        return f"{self.layout}_{'dmy' if self.day_first else 'mdy'}"
+
+    @classmethod
+    def from_name(cls, name: str):
+        layout, order = name.rsplit("_", 1)
+        return cls(layout, order == "dmy")
+
+    def __repr__(self):
+        return f"WhatsAppDialect({self.name})"
+
+
+def clean_line(line: str) -> str:
+    return line.translate(INVISIBLE_CHARS).strip()
+
+
+def _date_fields(date_str: str):
+    return [int(part) for part in re.split(r"[./]", date_str)]
+
+
+def detect_dialect(lines) -> WhatsAppDialect:
+    layout_hits = {layout: 0 for layout in LAYOUTS}
+    dates = {layout: [] for layout in LAYOUTS}
+
+    for line in lines:
+        line = clean_line(line)
+        for layout, pattern in LAYOUTS.items():
+            match = pattern.match(line)
+            if match:
+                layout_hits[layout] += 1
+                dates[layout].append(match.group(1))
+                break
+
+    layout = max(layout_hits, key=layout_hits.get)
+    samples = [_date_fields(d) for d in dates[layout]]
+
+    if any(first > 12 for first, _, _ in samples):
+        day_first = True
+    elif any(second > 12 for _, second, _ in samples):
+        day_first = False
+    else:
+        # No unambiguous date in the sample: fall back to the order the
+        # original per-line format list preferred (day-first for dotted and
+        # four-digit years, month-first for two-digit years).
+        dotted = any("." in d for d in dates[layout])
+        four_digit_years = all(len(d.rsplit("/", 1)[-1]) == 4 for d in dates[layout] if "/" in d)
+        day_first = dotted or four_digit_years
+
+    dialect = WhatsAppDialect(layout, day_first)
+    logger.info(f"Detected WhatsApp dialect {dialect.name} ({layout_hits[layout]} sample lines)")
+    return dialect
+
+
+def sample_file_lines(txt_path: str, max_lines: int = SAMPLE_LINES, tail_bytes: int = SAMPLE_TAIL_BYTES):
+    with open(txt_path, "rb") as f:
+        head = [line.decode("utf-8", errors="ignore") for line in islice(f, max_lines)]
+        f.seek(0, 2)
+        size = f.tell()
+        if size <= tail_bytes:
+            return head
+        f.seek(size - tail_bytes)
+        tail = f.read().decode("utf-8", errors="ignore").splitlines()[1:]
+    return head + tail
+
+
+def sniff_dialect(txt_path: str) -> WhatsAppDialect:
+    return detect_dialect(sample_file_lines(txt_path))
+
+
+@lru_cache(maxsize=8192)
+def _day_epoch(date_str: str, day_first: bool) -> int | None:
+    first, second, year = _date_fields(date_str)
+    day, month = (first, second) if day_first else (second, first)
+    if year < 100:
+        year += 2000 if year < 69 else 1900
+    elif year < 1000:
+        return None
+    try:
+        return (date(year, month, day).toordinal() - EPOCH_ORDINAL) * 86400
+    except ValueError:
+        return None
+
+
+class WhatsAppParser:
+    """Line parser bound to one export dialect.
+
+    Every line goes through the dialect's precompiled pattern; only lines
+    that look like a message header but miss it are retried against the
+    other layouts, so a stray line in a different format is still read.
+    """
+
+    def __init__(self, dialect: WhatsAppDialect):
+        self.dialect = dialect
+        self.pattern = LAYOUTS[dialect.layout]
+        self.groups = LAYOUT_GROUPS[dialect.layout]
+        self.fallbacks = [
+            (LAYOUTS[layout], LAYOUT_GROUPS[layout])
+            for layout in LAYOUTS if layout != dialect.layout
+        ]
+
+    def parse(self, line: str):
+        line = clean_line(line)
+        match = self.pattern.match(line)
+        groups = self.groups
+        if match is None:
+            if not line or not (line[0] == "[" or line[0].isdigit()):
+                return None
+            for pattern, fallback_groups in self.fallbacks:
+                match = pattern.match(line)
+                if match:
+                    groups = fallback_groups
+                    break
+            else:
+                return None
+
+        date_str, hour, minute, second, user, text = match.group(*groups)
+        day_epoch = _day_epoch(date_str, self.dialect.day_first)
+        hour, minute = int(hour), int(minute)
+        second = int(second) if second else 0
+        if day_epoch is None or hour > 23 or minute > 59 or second > 59:
+            timestamp = None
+        else:
+            timestamp = day_epoch + hour * 3600 + minute * 60 + second
+
+        return user.strip().lstrip("~ "), text.strip(), timestamp
@@ -5,7 +5,7 @@ import logging
 from dotenv import load_dotenv
 import os 
 
-from database import verify_connection, engine, Base
+from database import verify_connection, engine, Base, upgrade_schema
 from wikipedia_router import router as wikipedia_router
 from user_router import router as user_router
 from analysis_router import router as analysis_router
@@ -14,6 +14,8 @@ from auth_router import router as auth_router
 from research_router import router as research_router
 from history_router import router as history_router
 from dashboard_router import router as dashboard_router
+from compute_service import COMPUTE
+from process_pool import PROCESS_POOL
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -31,6 +33,13 @@ async def startup():
     await verify_connection()
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await upgrade_schema(conn)
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    COMPUTE.shutdown()
+    PROCESS_POOL.shutdown()
 
 
 app.add_middleware(
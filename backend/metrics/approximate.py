@@ -0,0 +1,172 @@
+import math
+import random
+from collections import deque
+from heapq import heappush, heappop
+from itertools import count
+
+import numpy as np
+
+from metrics.csr_graph import CSRGraph
+
+DEFAULT_CENTRALITY_SAMPLES = 100
+CENTRALITY_SEED = 42
+
+
+def sample_pivots(G, k: int, seed: int = CENTRALITY_SEED) -> list:
+    """``k`` source nodes drawn from the name-sorted node list, so the choice is reproducible."""
+    return random.Random(seed).sample(sorted(G), k)
+
+
+def _shortest_path_dag(G, source, weight=None):
+    """Brandes' single-source stage: visit order, predecessors and path counts."""
+    order = []
+    predecessors = {source: []}
+    sigma = {source: 1.0}
+
+    if weight is None:
+        distance = {source: 0}
+        queue = deque([source])
+        while queue:
+            v = queue.popleft()
+            order.append(v)
+            for w in G[v]:
+                if w not in distance:
+                    distance[w] = distance[v] + 1
+                    queue.append(w)
+                    predecessors[w] = []
+                    sigma[w] = 0.0
+                if distance[w] == distance[v] + 1:
+                    sigma[w] += sigma[v]
+                    predecessors[w].append(v)
+        return order, predecessors, sigma
+
+    final = {}
+    seen = {source: 0}
+    tie = count()
+    heap = [(0, next(tie), source, source)]
+    while heap:
+        dist, _, pred, v = heappop(heap)
+        if v in final:
+            continue
+        if v != source:
+            sigma[v] += sigma[pred]
+        order.append(v)
+        final[v] = dist
+        for w, data in G[v].items():
+            vw_dist = dist + data.get(weight, 1)
+            if w not in final and (w not in seen or vw_dist < seen[w]):
+                seen[w] = vw_dist
+                heappush(heap, (vw_dist, next(tie), v, w))
+                sigma[w] = 0.0
+                predecessors[w] = [v]
+            elif vw_dist == seen.get(w):
+                sigma[w] += sigma[v]
+                predecessors[w].append(v)
+    return order, predecessors, sigma
+
+
+def source_dependencies(G, source, weight=None) -> dict:
+    """Pair dependencies of ``source`` on every node it reaches (0 for itself)."""
+    if isinstance(G, CSRGraph):
+        return G.source_dependencies(source, weight)
+    order, predecessors, sigma = _shortest_path_dag(G, source, weight)
+    delta = dict.fromkeys(order, 0.0)
+    while order:
+        w = order.pop()
+        coeff = (1 + delta[w]) / sigma[w]
+        for v in predecessors[w]:
+            delta[v] += sigma[v] * coeff
+    delta[source] = 0.0
+    return delta
+
+
+def bfs_lengths(G, source) -> dict:
+    """Hop distances from ``source`` to every node it reaches, itself included."""
+    if isinstance(G, CSRGraph):
+        return G.bfs_lengths(source)
+    lengths = {source: 0}
+    queue = deque([source])
+    while queue:
+        v = queue.popleft()
+        for w in G[v]:
+            if w not in lengths:
+                lengths[w] = lengths[v] + 1
+                queue.append(w)
+    return lengths
+
+
+def approximate_betweenness(G, k: int, seed: int = CENTRALITY_SEED, weight="weight"):
+    """Pivot-sampled betweenness with a per-node standard error.
+
+    Uses the same scaling as ``nx.betweenness_centrality(G, k=k)``; the
+    error is the standard error of that estimator over the sampled
+    pivots, with a finite-population correction.
+    """
+    n = len(G)
+    if n <= 2:
+        zeros = dict.fromkeys(G, 0.0)
+        return zeros, dict(zeros)
+
+    nodes = list(G)
+    index = {v: i for i, v in enumerate(nodes)}
+    total = np.zeros(n)
+    total_sq = np.zeros(n)
+    for source in sample_pivots(G, k, seed):
+        delta = source_dependencies(G, source, weight)
+        rows = np.fromiter((index[v] for v in delta), dtype=np.int64, count=len(delta))
+        values = np.fromiter(delta.values(), dtype=float, count=len(delta))
+        total[rows] += values
+        total_sq[rows] += values * values
+
+    scale = n / ((n - 1) * (n - 2))
+    mean = total / k
+    variance = np.maximum(total_sq / k - mean * mean, 0) * (k / (k - 1) if k > 1 else 0)
+    error = scale * np.sqrt(variance / k) * math.sqrt((n - k) / (n - 1))
+
+    estimate = dict(zip(nodes, (scale * mean).tolist()))
+    return estimate, dict(zip(nodes, error.tolist()))
+
+
+def approximate_closeness(G, k: int, seed: int = CENTRALITY_SEED):
+    """Closeness from BFS runs out of ``k`` sampled pivots, with a per-node error.
+
+    Distances are inward (pivot to node), as in ``nx.closeness_centrality``,
+    and the reachable share is estimated from the pivots as well, so the
+    Wasserman-Faust correction carries over. The error propagates the
+    standard error of the mean sampled distance.
+    """
+    n = len(G)
+    if n <= 1:
+        zeros = dict.fromkeys(G, 0.0)
+        return zeros, dict(zeros)
+
+    nodes = list(G)
+    index = {v: i for i, v in enumerate(nodes)}
+    reached = np.zeros(n)
+    dist_sum = np.zeros(n)
+    dist_sq = np.zeros(n)
+    is_pivot = np.zeros(n, dtype=bool)
+
+    for source in sample_pivots(G, k, seed):
+        is_pivot[index[source]] = True
+        lengths = bfs_lengths(G, source)
+        del lengths[source]
+        rows = np.fromiter((index[v] for v in lengths), dtype=np.int64, count=len(lengths))
+        values = np.fromiter(lengths.values(), dtype=float, count=len(lengths))
+        reached[rows] += 1
+        dist_sum[rows] += values
+        dist_sq[rows] += values * values
+
+    sampled = k - is_pivot.astype(float)
+    closeness = np.zeros(n)
+    error = np.zeros(n)
+    ok = (reached > 0) & (dist_sum > 0)
+    closeness[ok] = (reached[ok] / dist_sum[ok]) * (reached[ok] / sampled[ok])
+
+    mean = np.divide(dist_sum, reached, out=np.zeros(n), where=reached > 0)
+    spread = ok & (reached > 1)
+    variance = np.zeros(n)
+    variance[spread] = np.maximum(dist_sq[spread] / reached[spread] - mean[spread] ** 2, 0) * reached[spread] / (reached[spread] - 1)
+    error[spread] = closeness[spread] * np.sqrt(variance[spread] / reached[spread]) / mean[spread]
+
+    return dict(zip(nodes, closeness.tolist())), dict(zip(nodes, error.tolist()))
@@ -0,0 +1,329 @@
+import math
+import time
+import logging
+
+import networkx as nx
+
+from metrics import sparse
+from metrics.memo import RESULT_MEMO, graph_fingerprint
+from metrics.approximate import DEFAULT_CENTRALITY_SAMPLES, approximate_betweenness, approximate_closeness
+from metrics.betweenness import exact_betweenness, parallel_betweenness
+from metrics.csr_graph import CSRGraph
+from metrics.planner import plan_centralities
+from process_pool import PROCESS_POOL
+
+logger = logging.getLogger(__name__)
+
+CENTRALITY_METRICS = ("degree", "betweenness", "closeness", "eigenvector", "pagerank")
+COMPONENT_METRICS = ("closeness", "eigenvector", "pagerank")
+# Components smaller than this are solved inline; shipping one to a worker
+# process is only worth it for large ones.
+PARALLEL_MIN_COMPONENT = 2000
+
+
+def parse_metrics(metrics=None) -> tuple:
+    """Requested measures in canonical order; ``None`` means all of them."""
+    if metrics is None:
+        return CENTRALITY_METRICS
+    if isinstance(metrics, str):
+        metrics = metrics.split(",")
+    names = {name.strip().lower() for name in metrics if name and name.strip()}
+    unknown = sorted(names.difference(CENTRALITY_METRICS))
+    if unknown:
+        raise ValueError(f"Unknown metric(s): {', '.join(unknown)}. Supported: {', '.join(CENTRALITY_METRICS)}")
+    return tuple(name for name in CENTRALITY_METRICS if name in names)
+
+
+def connected_components(G) -> list:
+    """Connected (weakly, for directed graphs) components, largest first."""
+    if isinstance(G, CSRGraph):
+        return G.connected_components()
+    components = nx.weakly_connected_components(G) if G.is_directed() else nx.connected_components(G)
+    return sorted(components, key=len, reverse=True)
+
+
+def component_scale(name: str, size: int, n: int) -> float:
+    """Factor that puts a component's values on the scale of the whole graph.
+
+    Closeness gets the Wasserman-Faust share (size - 1) / (n - 1), which is
+    exactly what ``nx.closeness_centrality`` gives on the whole graph;
+    PageRank gets size / n so scores still sum to 1; eigenvector gets
+    sqrt(size / n) so each component's share of the squared norm is its
+    share of the nodes.
+    """
+    if name == "closeness":
+        return (size - 1) / (n - 1)
+    if name == "pagerank":
+        return size / n
+    return math.sqrt(size / n)
+
+
+def measure_component(name: str, graph, options: dict):
+    """One measure on one component; top-level so it can run in a worker process.
+
+    ``graph`` is the networkx or CSR subgraph for closeness and the sliced
+    SparseGraph for the power-iteration measures. Returns
+    ``(values, errors, report)``.
+    """
+    if name == "closeness":
+        samples = options["samples"]
+        if samples is not None and samples < len(graph):
+            values, errors = approximate_closeness(graph, samples)
+            return values, errors, None
+        if isinstance(graph, CSRGraph):
+            return graph.closeness(), None, None
+        return nx.closeness_centrality(graph), None, None
+
+    method = sparse.pagerank if name == "pagerank" else sparse.eigenvector
+    result = method(graph, tol=options["tolerance"], start=options["start"].get(name))
+    return result.values, None, result.report()
+
+
+def run_component_tasks(tasks: list, options: dict) -> list:
+    """Runs ``(name, graph)`` tasks, sending the large ones to the shared ``PROCESS_POOL``.
+
+    A task that raises gets its exception as its result, so one failing
+    measure does not take the others down with it.
+    """
+    large = [i for i, (_, graph) in enumerate(tasks) if len(graph.nodes) >= PARALLEL_MIN_COMPONENT]
+    workers = min(PROCESS_POOL.workers, len(large))
+    results = [None] * len(tasks)
+
+    pending = {}
+    if workers > 1:
+        logger.info(f"Solving {len(large)} large components on {workers} workers")
+        pending = {i: PROCESS_POOL.submit(measure_component, *tasks[i], options) for i in large}
+    try:
+        for i, task in enumerate(tasks):
+            if i not in pending:
+                try:
+                    results[i] = measure_component(*task, options)
+                except Exception as e:
+                    results[i] = e
+        for i, future in pending.items():
+            try:
+                results[i] = future.result()
+            except Exception as e:
+                results[i] = e
+    finally:
+        for future in pending.values():
+            future.cancel()
+    return results
+
+
+def centrality_memo_key(name: str, approximate: bool, samples: int, tolerance: float) -> tuple:
+    """The options that can change one measure's values, next to its name."""
+    if name in ("betweenness", "closeness"):
+        return (name, samples if approximate else None)
+    if name in ("eigenvector", "pagerank"):
+        return (name, tolerance)
+    return (name,)
+
+
+def compute_centralities(G, metrics=CENTRALITY_METRICS, is_connected=None, approximate=False,
+                         centrality_samples=None, power_tolerance=None, timeline=None, parallel=False,
+                         deadline_ms=None):
+    """Computes only the requested centrality measures.
+
+    Returns ``(values, errors, convergence, methods)``; the first three are
+    as in ``solve_centralities``. ``methods`` holds each measure's plan step
+    from ``metrics.planner.plan_centralities``: exact, approximate (with its
+    pivot count), skipped or failed, with the estimated cost and, for
+    failures, the reason. Skipped and failed measures get ``{}``.
+
+    Each measure is memoized on the graph fingerprint, so filters that end
+    in an identical graph reuse it instead of recomputing.
+    """
+    samples = int(centrality_samples) if centrality_samples else DEFAULT_CENTRALITY_SAMPLES
+    tolerance = float(power_tolerance) if power_tolerance else sparse.DEFAULT_TOLERANCE
+    backend = "csr" if isinstance(G, CSRGraph) else "networkx"
+    plan = plan_centralities(metrics, len(G), G.number_of_edges(), G.is_directed(), deadline_ms,
+                             approximate, samples, backend)
+    deadline = time.monotonic() + deadline_ms / 1000 if deadline_ms is not None else None
+
+    fingerprint = graph_fingerprint(G)
+    runnable = tuple(name for name in metrics if plan[name]["method"] != "skipped")
+    keys = {
+        name: (fingerprint, *centrality_memo_key(name, plan[name]["method"] == "approximate",
+                                                 plan[name]["samples"], tolerance))
+        for name in runnable
+    }
+
+    cached = {name: RESULT_MEMO.get("centrality", keys[name]) for name in runnable}
+    missing = tuple(name for name in runnable if cached[name] is None)
+    failures = {}
+    if missing:
+        values, errors, convergence, failures = solve_centralities(
+            G, missing, is_connected, {name: plan[name] for name in missing}, tolerance, timeline, parallel,
+            deadline
+        )
+        for name in missing:
+            cached[name] = (values[name], errors.get(name), convergence.get(name))
+            if name not in failures and (len(values[name]) == len(G) or len(G) <= 1):
+                RESULT_MEMO.put("centrality", keys[name], cached[name], len(G))
+
+    methods = {name: {**plan[name], **failures.get(name, {})} for name in metrics}
+    values = {name: cached[name][0] if name in cached else {} for name in metrics}
+    errors = {name: cached[name][1] for name in runnable if cached[name][1] is not None}
+    convergence = {name: cached[name][2] for name in runnable if cached[name][2] is not None}
+    return values, errors, convergence, methods
+
+
+def solve_centralities(G, metrics, is_connected, plan, power_tolerance=None, timeline=None, parallel=False,
+                       deadline=None):
+    """Computes only the requested centrality measures, each as ``plan`` says.
+
+    Returns ``(values, errors, convergence, failures)``: per-metric
+    ``{node: value}`` dicts, per-node standard errors for the measures that
+    were approximated, iteration counts and residuals for the
+    power-iteration measures, and ``{"method", "reason"}`` for each measure
+    that failed or was cut by the deadline (its values are ``{}``; the
+    other measures are unaffected).
+
+    ``plan`` maps each measure to a ``metrics.planner`` step; betweenness
+    and closeness are sampled when its method is ``approximate``.
+    ``deadline`` is a ``time.monotonic()`` value; betweenness and closeness
+    are skipped if it has already passed when their turn comes.
+
+    Closeness, eigenvector and PageRank are solved on every connected
+    component separately and rescaled with ``component_scale``; isolated
+    nodes get 0 for closeness and eigenvector.
+
+    ``timeline`` is an optional ``metrics.timeline.TimelineState`` for G;
+    degree and the CSR adjacency then come from it, and the power
+    iterations warm-start from the previous window. ``parallel`` spreads
+    exact betweenness over all cores.
+
+    G may be a networkx graph or a ``metrics.csr_graph.CSRGraph``; the
+    latter is measured on its own arrays throughout.
+    """
+    if is_connected is None:
+        if isinstance(G, CSRGraph):
+            is_connected = len(G) > 0 and G.is_connected()
+        else:
+            is_connected = len(G) > 0 and (nx.is_weakly_connected(G) if G.is_directed() else nx.is_connected(G))
+    csr = isinstance(G, CSRGraph)
+
+    n = len(G)
+    closeness_plan = plan.get("closeness", {})
+    options = {
+        "samples": closeness_plan.get("samples") if closeness_plan.get("method") == "approximate" else None,
+        "tolerance": float(power_tolerance) if power_tolerance else sparse.DEFAULT_TOLERANCE,
+        "start": timeline.start if timeline is not None else {},
+    }
+    errors = {}
+    convergence = {}
+    values = {}
+    failures = {}
+
+    def fail(name, error):
+        logger.error(f"Error calculating {name} centrality: {error}")
+        values[name] = {}
+        errors.pop(name, None)
+        convergence.pop(name, None)
+        # networkx's convergence error carries itself in args; its message is last.
+        reason = error.args[-1] if isinstance(error, nx.PowerIterationFailedConvergence) else str(error)
+        failures[name] = {"method": "failed", "reason": reason}
+
+    def past_deadline(name):
+        if deadline is None or time.monotonic() <= deadline:
+            return False
+        logger.warning(f"Deadline reached, skipping {name} centrality")
+        values[name] = {}
+        failures[name] = {"method": "skipped", "reason": "deadline reached"}
+        return True
+
+    def betweenness():
+        step = plan["betweenness"]
+        if step["method"] != "approximate":
+            if parallel:
+                return parallel_betweenness(G, weight="weight")
+            return exact_betweenness(G, weight="weight")
+        logger.debug(f"Approximating betweenness from {step['samples']} pivots")
+        values, errors["betweenness"] = approximate_betweenness(G, step["samples"], weight="weight")
+        return values
+
+    def per_component(names):
+        if n <= 1 or not names:
+            return {name: {} for name in names}
+
+        components = [list(G)] if is_connected else [list(c) for c in connected_components(G)]
+        solved = [c for c in components if len(c) > 1]
+        logger.debug(f"Solving {', '.join(names)} on {len(solved)} component(s)")
+
+        adjacency = None
+        if set(names) & {"eigenvector", "pagerank"}:
+            if timeline is not None:
+                adjacency = timeline.sparse
+            else:
+                adjacency = G.sparse if csr else sparse.SparseGraph.from_graph(G)
+        tasks, owners = [], []
+        for name in names:
+            for nodes in solved:
+                if name == "closeness":
+                    if is_connected:
+                        graph = G
+                    else:
+                        graph = G.subgraph(nodes) if csr else G.subgraph(nodes).copy()
+                else:
+                    graph = adjacency if is_connected else adjacency.subgraph(nodes)
+                tasks.append((name, graph))
+                owners.append((name, len(nodes)))
+
+        values = {name: {} for name in names}
+        for name in names:
+            isolated = 1.0 / n if name == "pagerank" else 0.0
+            values[name].update((nodes[0], isolated) for nodes in components if len(nodes) == 1)
+
+        reports = {}
+        failed = {}
+        for (name, size), result in zip(owners, run_component_tasks(tasks, options)):
+            if isinstance(result, Exception):
+                failed.setdefault(name, result)
+                continue
+            part, part_errors, report = result
+            scale = component_scale(name, size, n)
+            values[name].update((node, value * scale) for node, value in part.items())
+            if part_errors is not None:
+                errors.setdefault(name, {}).update((node, value * scale) for node, value in part_errors.items())
+            if report is not None:
+                reports.setdefault(name, []).append(report)
+
+        for name, parts in reports.items():
+            # Largest component's residual trace, worst case across all of them.
+            convergence[name] = {
+                **parts[0],
+                "iterations": max(r["iterations"] for r in parts),
+                "residual": max(r["residual"] for r in parts),
+                "components": len(parts),
+            }
+        for name, error in failed.items():
+            fail(name, error)
+        return {name: part for name, part in values.items() if name not in failed}
+
+    # Cheap measures first, so the deadline only ever cuts the expensive ones.
+    if "degree" in metrics:
+        try:
+            if timeline is not None:
+                values["degree"] = timeline.degree_centrality()
+            else:
+                values["degree"] = G.degree_centrality() if csr else nx.degree_centrality(G)
+        except Exception as e:
+            fail("degree", e)
+
+    names = [name for name in ("pagerank", "eigenvector", "closeness") if name in metrics]
+    if "closeness" in names and past_deadline("closeness"):
+        names.remove("closeness")
+    try:
+        values.update(per_component(names))
+    except Exception as e:
+        for name in names:
+            fail(name, e)
+
+    if "betweenness" in metrics and not past_deadline("betweenness"):
+        try:
+            values["betweenness"] = betweenness()
+        except Exception as e:
+            fail("betweenness", e)
+
+    return {name: values[name] for name in metrics}, errors, convergence, failures
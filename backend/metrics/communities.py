@@ -0,0 +1,148 @@
+import time
+import logging
+
+import numpy as np
+import networkx as nx
+from community import community_louvain
+from networkx.algorithms import community as nx_community
+
+from metrics.memo import RESULT_MEMO, graph_fingerprint
+from metrics.csr_graph import CSRGraph
+from metrics.girvan_newman import girvan_newman
+from metrics.fast_communities import adjacency_arrays, labels_modularity, label_propagation, leiden
+from metrics.community_stats import COMMUNITY_STAT_FIELDS, community_stats
+from metrics.planner import plan_partition
+
+logger = logging.getLogger(__name__)
+
+COMMUNITY_ALGORITHMS = ("louvain", "girvan_newman", "greedy_modularity", "label_propagation", "leiden")
+# Seed of the randomized algorithms when a request sets none, so reloading a
+# research reproduces its communities.
+COMMUNITY_SEED = 42
+DEFAULT_RESOLUTION = 1.0
+SEEDED_ALGORITHMS = ("louvain", "girvan_newman", "label_propagation", "leiden")
+RESOLUTION_ALGORITHMS = ("louvain", "greedy_modularity", "leiden")
+# Algorithms without a CSR implementation; a CSRGraph is converted for them only.
+NETWORKX_ALGORITHMS = ("louvain", "greedy_modularity")
+
+
+def community_graph(nodes, links, backend="networkx"):
+    """The undirected graph the community algorithms run on, from serialized nodes and links.
+
+    Built from the links as returned to the client, so a normalized or
+    directed graph is partitioned on the weights the response shows; of two
+    reciprocal links the later one's weight is kept. Node attributes are
+    not copied.
+    """
+    ids = [node["id"] for node in nodes]
+    edges = ((link["source"], link["target"], link.get("weight", 1)) for link in links)
+    if backend == "csr":
+        return CSRGraph.from_edges(ids, edges, directed=False)
+    G = nx.Graph()
+    G.add_nodes_from(ids)
+    G.add_weighted_edges_from(edges)
+    return G
+
+
+def partition_settings(algorithm: str, num_communities=None, seed=None, resolution=None) -> dict:
+    """The parameters that can change ``algorithm``'s result, with defaults filled in; the others are None."""
+    return {
+        "num_communities": num_communities if algorithm == "girvan_newman" else None,
+        "seed": (COMMUNITY_SEED if seed is None else seed) if algorithm in SEEDED_ALGORITHMS else None,
+        "resolution": (DEFAULT_RESOLUTION if resolution is None else resolution)
+        if algorithm in RESOLUTION_ALGORITHMS else None,
+    }
+
+
+def run_partition(G, algorithm: str, num_communities=None, seed=COMMUNITY_SEED, resolution=DEFAULT_RESOLUTION):
+    communities = {}
+    node_communities = {}
+    if algorithm in NETWORKX_ALGORITHMS and isinstance(G, CSRGraph):
+        G = G.to_networkx()
+
+    if algorithm == "louvain":
+        node_communities = community_louvain.best_partition(G, resolution=resolution, random_state=seed)
+        for node, cid in node_communities.items():
+            communities.setdefault(cid, []).append(node)
+    elif algorithm == "girvan_newman":
+        communities, node_communities = girvan_newman(G, num_communities, seed)
+    elif algorithm == "greedy_modularity":
+        communities_list = list(nx_community.greedy_modularity_communities(G, resolution=resolution))
+        for i, community in enumerate(communities_list):
+            communities[i] = list(community)
+            for node in community:
+                node_communities[node] = i
+    elif algorithm == "label_propagation":
+        communities, node_communities = label_propagation(G, seed)
+    elif algorithm == "leiden":
+        communities, node_communities = leiden(G, resolution, seed)
+    else:
+        raise ValueError(f"Unknown algorithm: {algorithm}. Supported: {', '.join(COMMUNITY_ALGORITHMS)}")
+
+    return communities, node_communities
+
+
+def detect_partition(G, algorithm: str, num_communities=None, seed=None, resolution=None):
+    """``({community_id: [nodes]}, {node: community_id}, cache_hit)`` for G.
+
+    The one entry point of every community endpoint. Partitions are cached
+    in RESULT_MEMO (kind "partition", whose hit and miss counters
+    /analyze/memo-stats reports) by graph fingerprint, algorithm and the
+    ``partition_settings`` that apply to it: the seed (COMMUNITY_SEED by
+    default, so every algorithm is deterministic), the resolution and the
+    Girvan-Newman level picked by ``num_communities``.
+    """
+    if algorithm not in COMMUNITY_ALGORITHMS:
+        raise ValueError(f"Unknown algorithm: {algorithm}. Supported: {', '.join(COMMUNITY_ALGORITHMS)}")
+
+    settings = partition_settings(algorithm, num_communities, seed, resolution)
+    key = (graph_fingerprint(G), algorithm, settings["seed"], settings["resolution"], settings["num_communities"])
+    cached = RESULT_MEMO.get("partition", key)
+    hit = cached is not None
+    if not hit:
+        seed = COMMUNITY_SEED if seed is None else seed
+        resolution = DEFAULT_RESOLUTION if resolution is None else resolution
+        cached = run_partition(G, algorithm, settings["num_communities"], seed, resolution)
+        RESULT_MEMO.put("partition", key, cached, len(G))
+
+    communities, node_communities = cached
+    return {cid: list(nodes) for cid, nodes in communities.items()}, dict(node_communities), hit
+
+
+def partition_modularity(G, node_communities: dict):
+    """Modularity of a partition of G, in one pass over its CSR arrays; None for a graph without edges."""
+    nodes, B = adjacency_arrays(G)
+    labels = np.fromiter((node_communities[node] for node in nodes), dtype=np.int64, count=len(nodes))
+    return labels_modularity(B, labels)
+
+
+def partition_report(nodes, links, algorithm: str, num_communities=None, seed=None, resolution=None,
+                     deadline_ms=None, fields=COMMUNITY_STAT_FIELDS, digits=None, backend="networkx") -> dict:
+    """A whole community request on a graph's nodes and links, meant to be one ``COMPUTE.run`` job.
+
+    Plans ``algorithm`` against ``deadline_ms`` on ``community_graph``,
+    runs ``detect_partition`` and adds ``community_stats`` (rows largest
+    first) and the modularity of the partition.
+    """
+    G = community_graph(nodes, links, backend)
+    plan = plan_partition(algorithm, G.number_of_nodes(), G.number_of_edges(), deadline_ms, num_communities)
+    if plan["fallback"]:
+        logger.info(f"{algorithm} does not fit the deadline, using {plan['algorithm']}")
+
+    started = time.monotonic()
+    communities, node_communities, cache_hit = detect_partition(G, plan["algorithm"], num_communities, seed,
+                                                                resolution)
+    runtime_ms = round((time.monotonic() - started) * 1000, 1)
+
+    rows, community_links = community_stats(G, communities, node_communities, nodes, fields, digits)
+    rows.sort(key=lambda x: x["size"], reverse=True)
+    return {
+        "plan": plan,
+        "communities": communities,
+        "node_communities": node_communities,
+        "cache_hit": cache_hit,
+        "runtime_ms": runtime_ms,
+        "rows": rows,
+        "community_links": community_links,
+        "modularity": partition_modularity(G, node_communities),
+    }
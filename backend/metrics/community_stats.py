@@ -0,0 +1,73 @@
+import numpy as np
+
+from metrics.fast_communities import adjacency_arrays
+
+COMMUNITY_STAT_FIELDS = ("betweenness", "pagerank", "messages")
+# Rounding of the averages in the analyzers' responses.
+COMMUNITY_STAT_DIGITS = {"betweenness": 4, "pagerank": 4, "messages": 2}
+
+
+def community_stats(G, communities: dict, node_communities: dict, node_data, fields=COMMUNITY_STAT_FIELDS,
+                    digits=None):
+    """Per-community statistics of a partition of G, in one grouped pass over its nodes and arcs.
+
+    Nodes are mapped to community positions once; the averages of the
+    ``fields`` of ``node_data`` (node dicts, None counted as 0) are then one
+    ``bincount`` each. The arcs of G (self loops left out) are grouped by
+    their pair of communities: same-community arcs give ``internal_density``,
+    per-community arc counts the volumes behind ``conductance`` (both
+    unweighted, as ``nx.density`` and ``nx.conductance``), and the rest the
+    inter-community edge matrix, returned sparse as ``community_links`` with
+    edge counts and summed weights.
+
+    ``digits`` optionally maps a field to the rounding of its average.
+    Returns ``(rows, community_links)``, with rows in ``communities`` order.
+    """
+    ids = list(communities)
+    position = {cid: i for i, cid in enumerate(ids)}
+    nodes, B = adjacency_arrays(G)
+    labels = np.fromiter((position[node_communities[node]] for node in nodes), dtype=np.int64, count=len(nodes))
+    c = len(ids)
+
+    data = {node["id"]: node for node in node_data}
+    sizes = np.bincount(labels, minlength=c)
+    averages = {}
+    for field in fields:
+        values = np.fromiter(((data.get(node, {}).get(field) or 0) for node in nodes), dtype=float, count=len(nodes))
+        averages[field] = np.bincount(labels, weights=values, minlength=c) / np.maximum(sizes, 1)
+
+    arcs = B.tocoo()
+    off_diagonal = arcs.row != arcs.col
+    source, target = labels[arcs.row[off_diagonal]], labels[arcs.col[off_diagonal]]
+    weight = arcs.data[off_diagonal]
+
+    volume = np.bincount(source, minlength=c)
+    inside = source == target
+    internal = np.bincount(source[inside], minlength=c) / 2
+    pairs = sizes * (sizes - 1) / 2
+    density = np.divide(internal, pairs, out=np.zeros(c), where=pairs > 0)
+    cut = volume - 2 * internal
+    smaller = np.minimum(volume, volume.sum() - volume)
+    conductance = np.divide(cut, smaller, out=np.zeros(c), where=smaller > 0)
+
+    digits = digits or {}
+    rows = []
+    for i, cid in enumerate(ids):
+        row = {"id": cid, "size": int(sizes[i]), "nodes": communities[cid]}
+        for field in fields:
+            value = float(averages[field][i])
+            row[f"avg_{field}"] = round(value, digits[field]) if field in digits else value
+        row["internal_density"] = round(float(density[i]), 4)
+        row["conductance"] = round(float(conductance[i]), 4)
+        rows.append(row)
+
+    # Each undirected edge once, from its lower community position.
+    upper = source < target
+    keys, pair_of_arc = np.unique(source[upper] * c + target[upper], return_inverse=True)
+    edge_counts = np.bincount(pair_of_arc, minlength=len(keys))
+    edge_weights = np.bincount(pair_of_arc, weights=weight[upper], minlength=len(keys))
+    community_links = [
+        {"source": ids[key // c], "target": ids[key % c], "edges": count, "weight": total}
+        for key, count, total in zip(keys.tolist(), edge_counts.tolist(), edge_weights.tolist())
+    ]
+    return rows, community_links
@@ -0,0 +1,256 @@
+from heapq import heappush, heappop
+from itertools import count
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse import csgraph
+import networkx as nx
+
+from metrics.sparse import SparseGraph
+
+GRAPH_BACKENDS = ("networkx", "csr")
+# Rows of the BFS distance matrix computed at once by closeness (~32 MB of float64).
+DISTANCE_BLOCK_CELLS = 1 << 22
+
+
+class CSRGraph:
+    """Compressed adjacency graph: int node ids, an offsets array and float weights.
+
+    Built straight from the edge counter, without networkx's dict-of-dicts.
+    Undirected edges are stored in both directions (a self loop once), and
+    directed graphs keep out-edges in the rows. It answers the read-only part
+    of the networkx API the metrics code relies on (iteration, ``len``,
+    ``is_directed``, ``edges(data=...)``, ``degree``). Algorithms that have
+    not been ported go through ``to_networkx()``.
+    """
+
+    def __init__(self, nodes, matrix, directed):
+        self.nodes = list(nodes)
+        self.index = {node: i for i, node in enumerate(self.nodes)}
+        self.matrix = matrix
+        self.directed = directed
+        self.sparse = SparseGraph(self.nodes, matrix, directed)
+        self._lists = None
+
+    @classmethod
+    def from_edges(cls, nodes, edges, directed=False):
+        """``edges`` yields ``(u, v, weight)``; a repeated edge keeps its last weight, as in networkx."""
+        nodes = list(nodes)
+        index = {node: i for i, node in enumerate(nodes)}
+        weights = {}
+        for u, v, w in edges:
+            a, b = index[u], index[v]
+            if not directed and b < a:
+                a, b = b, a
+            weights[(a, b)] = w
+
+        m = len(weights)
+        rows = np.fromiter((a for a, _ in weights), dtype=np.int64, count=m)
+        cols = np.fromiter((b for _, b in weights), dtype=np.int64, count=m)
+        data = np.fromiter(weights.values(), dtype=float, count=m)
+        return cls._from_arrays(nodes, rows, cols, data, directed)
+
+    @classmethod
+    def _from_arrays(cls, nodes, rows, cols, data, directed):
+        """Undirected edges are given once each and mirrored here."""
+        if not directed:
+            loops = rows == cols
+            rows, cols = np.concatenate((rows, cols[~loops])), np.concatenate((cols, rows[~loops]))
+            data = np.concatenate((data, data[~loops]))
+        matrix = sp.csr_array((data, (rows, cols)), shape=(len(nodes), len(nodes)))
+        matrix.sort_indices()
+        return cls(nodes, matrix, directed)
+
+    @property
+    def indptr(self):
+        return self.matrix.indptr
+
+    @property
+    def indices(self):
+        return self.matrix.indices
+
+    @property
+    def weights(self):
+        return self.matrix.data
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def __iter__(self):
+        return iter(self.nodes)
+
+    def __contains__(self, node):
+        return node in self.index
+
+    def is_directed(self) -> bool:
+        return self.directed
+
+    def number_of_nodes(self) -> int:
+        return len(self.nodes)
+
+    def number_of_edges(self) -> int:
+        if self.directed:
+            return self.matrix.nnz
+        loops = int(np.count_nonzero(self.matrix.diagonal()))
+        return (self.matrix.nnz + loops) // 2
+
+    def edges(self, data=None, default=None):
+        """Each edge once, as ``(u, v)`` or ``(u, v, weight)`` when ``data`` is given."""
+        coo = self.matrix.tocoo()
+        keep = slice(None) if self.directed else coo.row <= coo.col
+        for a, b, w in zip(coo.row[keep].tolist(), coo.col[keep].tolist(), coo.data[keep].tolist()):
+            if data is None:
+                yield self.nodes[a], self.nodes[b]
+            else:
+                yield self.nodes[a], self.nodes[b], w
+
+    def degree_array(self) -> np.ndarray:
+        """networkx degrees: neighbor count, in + out for directed graphs, self loops twice."""
+        out_degree = np.diff(self.indptr)
+        if self.directed:
+            return out_degree + np.bincount(self.indices, minlength=len(self.nodes))
+        return out_degree + (self.matrix.diagonal() != 0)
+
+    def degree(self) -> dict:
+        return dict(zip(self.nodes, self.degree_array().tolist()))
+
+    def degree_centrality(self) -> dict:
+        n = len(self.nodes)
+        if n <= 1:
+            return dict.fromkeys(self.nodes, 1)
+        return dict(zip(self.nodes, (self.degree_array() * (1.0 / (n - 1))).tolist()))
+
+    def component_labels(self):
+        return csgraph.connected_components(self.matrix, directed=self.directed, connection="weak")
+
+    def is_connected(self) -> bool:
+        if not self.nodes:
+            raise nx.NetworkXPointlessConcept("Connectivity is undefined for the null graph.")
+        return self.component_labels()[0] == 1
+
+    def connected_components(self) -> list:
+        """Node-name lists of the (weakly) connected components, largest first."""
+        n_components, labels = self.component_labels()
+        order = np.argsort(labels, kind="stable")
+        bounds = np.cumsum(np.bincount(labels, minlength=n_components))[:-1]
+        groups = [[self.nodes[i] for i in part] for part in np.split(order, bounds)]
+        return sorted(groups, key=len, reverse=True)
+
+    def subgraph(self, nodes):
+        keep = np.fromiter((self.index[node] for node in nodes), dtype=np.int64, count=len(nodes))
+        matrix = self.matrix[keep][:, keep]
+        matrix.sort_indices()
+        return CSRGraph([self.nodes[i] for i in keep], matrix, self.directed)
+
+    def bfs(self, source) -> np.ndarray:
+        """Hop distances along out-edges from ``source``; -1 where unreachable."""
+        indptr, indices = self.indptr, self.indices
+        distance = np.full(len(self.nodes), -1, dtype=np.int64)
+        frontier = np.array([self.index[source]])
+        distance[frontier] = 0
+        depth = 0
+        while frontier.size:
+            depth += 1
+            starts, ends = indptr[frontier], indptr[frontier + 1]
+            lengths = ends - starts
+            offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+            neighbors = np.unique(indices[offsets])
+            frontier = neighbors[distance[neighbors] < 0]
+            distance[frontier] = depth
+        return distance
+
+    def bfs_lengths(self, source) -> dict:
+        distance = self.bfs(source)
+        reached = np.flatnonzero(distance >= 0)
+        return dict(zip((self.nodes[i] for i in reached), distance[reached].tolist()))
+
+    def closeness(self) -> dict:
+        """Exact ``nx.closeness_centrality`` (inward distances, Wasserman-Faust scaling)."""
+        n = len(self.nodes)
+        if n <= 1:
+            return dict.fromkeys(self.nodes, 0.0)
+
+        inward = self.matrix.T.tocsr() if self.directed else self.matrix
+        values = np.zeros(n)
+        block = max(1, DISTANCE_BLOCK_CELLS // n)
+        for start in range(0, n, block):
+            rows = np.arange(start, min(n, start + block))
+            distance = csgraph.shortest_path(inward, method="D", unweighted=True, indices=rows)
+            reached = np.isfinite(distance)
+            others = reached.sum(axis=1) - 1.0
+            total = np.where(reached, distance, 0).sum(axis=1)
+            ok = total > 0
+            part = np.zeros(len(rows))
+            part[ok] = others[ok] / total[ok]
+            part[ok] *= others[ok] / (n - 1)
+            values[rows] = part
+        return dict(zip(self.nodes, values.tolist()))
+
+    def _adjacency_lists(self):
+        if self._lists is None:
+            self._lists = (self.indptr.tolist(), self.indices.tolist(), self.weights.tolist())
+        return self._lists
+
+    def source_dependencies(self, source, weight="weight") -> dict:
+        """Brandes pair dependencies of ``source``, as ``metrics.approximate.source_dependencies``."""
+        indptr, indices, data = self._adjacency_lists()
+        s = self.index[source]
+        order = []
+        predecessors = {s: []}
+        sigma = {s: 1.0}
+
+        if weight is None:
+            distance = {s: 0}
+            queue = [s]
+            for v in queue:
+                order.append(v)
+                for w in indices[indptr[v]:indptr[v + 1]]:
+                    if w not in distance:
+                        distance[w] = distance[v] + 1
+                        queue.append(w)
+                        predecessors[w] = []
+                        sigma[w] = 0.0
+                    if distance[w] == distance[v] + 1:
+                        sigma[w] += sigma[v]
+                        predecessors[w].append(v)
+        else:
+            final = {}
+            seen = {s: 0}
+            tie = count()
+            heap = [(0, next(tie), s, s)]
+            while heap:
+                dist, _, pred, v = heappop(heap)
+                if v in final:
+                    continue
+                if v != s:
+                    sigma[v] += sigma[pred]
+                order.append(v)
+                final[v] = dist
+                for k in range(indptr[v], indptr[v + 1]):
+                    w = indices[k]
+                    vw_dist = dist + data[k]
+                    if w not in final and (w not in seen or vw_dist < seen[w]):
+                        seen[w] = vw_dist
+                        heappush(heap, (vw_dist, next(tie), v, w))
+                        sigma[w] = 0.0
+                        predecessors[w] = [v]
+                    elif vw_dist == seen.get(w):
+                        sigma[w] += sigma[v]
+                        predecessors[w].append(v)
+
+        delta = dict.fromkeys(order, 0.0)
+        while order:
+            w = order.pop()
+            coeff = (1 + delta[w]) / sigma[w]
+            for v in predecessors[w]:
+                delta[v] += sigma[v] * coeff
+        delta[s] = 0.0
+        nodes = self.nodes
+        return {nodes[i]: value for i, value in delta.items()}
+
+    def to_networkx(self):
+        """Fallback for algorithms without a CSR implementation."""
+        G = nx.DiGraph() if self.directed else nx.Graph()
+        G.add_nodes_from(self.nodes)
+        G.add_weighted_edges_from(self.edges(data="weight"))
+        return G
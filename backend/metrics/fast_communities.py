@@ -0,0 +1,232 @@
+import random
+
+import numpy as np
+import scipy.sparse as sp
+import networkx as nx
+
+from metrics.approximate import CENTRALITY_SEED
+from metrics.csr_graph import CSRGraph
+
+# Safety net for label propagation, which can oscillate on some graphs.
+LABEL_PROPAGATION_MAX_PASSES = 100
+
+
+def adjacency_arrays(G):
+    """``(nodes, B)`` for an undirected graph, B being the CSR weight matrix with self loops doubled.
+
+    Row sums of B are the networkx degrees and B.sum() is 2m, so modularity
+    and the aggregated graphs of Leiden need no special case for loops. An
+    undirected CSRGraph already stores its arrays this way, loops aside, and
+    is used as is.
+    """
+    if isinstance(G, CSRGraph):
+        nodes, A = G.nodes, G.matrix
+        if not A.diagonal().any():
+            return nodes, A
+    else:
+        nodes = list(G)
+        A = nx.to_scipy_sparse_array(G, nodelist=nodes, weight="weight", format="csr").astype(float)
+    B = (A + sp.diags(A.diagonal())).tocsr()
+    B.sort_indices()
+    return nodes, B
+
+
+def labels_modularity(B, labels: np.ndarray, resolution: float = 1.0):
+    """Newman modularity of integer ``labels`` on B, as ``nx_community.modularity``; None without edges."""
+    two_m = B.sum()
+    if two_m == 0:
+        return None
+    coo = B.tocoo()
+    same = labels[coo.row] == labels[coo.col]
+    internal = np.bincount(labels[coo.row[same]], weights=coo.data[same], minlength=labels.max() + 1)
+    strength = np.bincount(labels, weights=np.asarray(B.sum(axis=1)).ravel(), minlength=labels.max() + 1)
+    return float(internal.sum() / two_m - resolution * np.square(strength / two_m).sum())
+
+
+def label_propagation_labels(B, seed: int = CENTRALITY_SEED) -> np.ndarray:
+    """Asynchronous label propagation, as ``nx_community.asyn_lpa_communities`` with weights.
+
+    Nodes are visited in a fresh random order each pass and take the label
+    with the largest edge weight among their neighbors (ties broken at
+    random), until every node already holds one of its best labels.
+    """
+    n = B.shape[0]
+    indptr, indices, data = B.indptr.tolist(), B.indices.tolist(), B.data.tolist()
+    labels = list(range(n))
+    rng = random.Random(seed)
+    order = list(range(n))
+    for _ in range(LABEL_PROPAGATION_MAX_PASSES):
+        changed = False
+        rng.shuffle(order)
+        for v in order:
+            weights = {}
+            for k in range(indptr[v], indptr[v + 1]):
+                w = indices[k]
+                if w != v:
+                    weights[labels[w]] = weights.get(labels[w], 0.0) + data[k]
+            if not weights:
+                continue
+            top = max(weights.values())
+            best = [label for label, weight in weights.items() if weight == top]
+            if labels[v] not in best:
+                labels[v] = rng.choice(best)
+                changed = True
+        if not changed:
+            break
+    return np.unique(labels, return_inverse=True)[1]
+
+
+def _move_nodes(B, strength, two_m, labels, resolution, rng):
+    """Leiden's fast local moving: a queue of nodes, each moved to its best community."""
+    n = B.shape[0]
+    indptr, indices, data = B.indptr.tolist(), B.indices.tolist(), B.data.tolist()
+    totals = np.bincount(labels, weights=strength, minlength=n).tolist()
+    labels = labels.tolist()
+    queue = list(range(n))
+    rng.shuffle(queue)
+    queued = [True] * n
+    head = 0
+    while head < len(queue):
+        v = queue[head]
+        head += 1
+        queued[v] = False
+        current = labels[v]
+        k_v = strength[v]
+        links = {current: 0.0}
+        for k in range(indptr[v], indptr[v + 1]):
+            w = indices[k]
+            if w != v:
+                links[labels[w]] = links.get(labels[w], 0.0) + data[k]
+        totals[current] -= k_v
+        scale = resolution * k_v / two_m
+        best, best_gain = current, links[current] - scale * totals[current]
+        for label, weight in links.items():
+            gain = weight - scale * totals[label]
+            if gain > best_gain:
+                best, best_gain = label, gain
+        totals[best] += k_v
+        if best == current:
+            continue
+        labels[v] = best
+        for k in range(indptr[v], indptr[v + 1]):
+            w = indices[k]
+            if not queued[w] and labels[w] != best:
+                queued[w] = True
+                queue.append(w)
+    return np.array(labels, dtype=np.int64)
+
+
+def _refine(B, strength, two_m, labels, resolution, rng):
+    """Leiden's refinement: singletons merged greedily inside each community.
+
+    Only well-connected nodes move, and only into well-connected refined
+    communities of their own community along an edge, so every refined
+    community is connected. Leiden draws the target at random weighted by
+    gain; this takes the best one, which keeps the result seed-stable.
+    """
+    n = B.shape[0]
+    indptr, indices, data = B.indptr.tolist(), B.indices.tolist(), B.data.tolist()
+    labels = labels.tolist()
+    strength = strength.tolist()
+    community_totals = {}
+    for v in range(n):
+        community_totals[labels[v]] = community_totals.get(labels[v], 0.0) + strength[v]
+
+    refined = list(range(n))
+    refined_totals = list(strength)
+    # Weight from each refined community to the rest of its community.
+    outside = [0.0] * n
+    for v in range(n):
+        for k in range(indptr[v], indptr[v + 1]):
+            w = indices[k]
+            if w != v and labels[w] == labels[v]:
+                outside[v] += data[k]
+    singleton = [True] * n
+
+    order = list(range(n))
+    rng.shuffle(order)
+    for v in order:
+        if not singleton[v]:
+            continue
+        k_v = strength[v]
+        total = community_totals[labels[v]]
+        if outside[v] < resolution * k_v * (total - k_v) / two_m:
+            continue
+        links = {}
+        for k in range(indptr[v], indptr[v + 1]):
+            w = indices[k]
+            if w != v and labels[w] == labels[v]:
+                links[refined[w]] = links.get(refined[w], 0.0) + data[k]
+        scale = resolution * k_v / two_m
+        best, best_gain = refined[v], 0.0
+        for target, weight in links.items():
+            size = refined_totals[target]
+            if outside[target] < resolution * size * (total - size) / two_m:
+                continue
+            gain = weight - scale * size
+            if gain > best_gain:
+                best, best_gain = target, gain
+        if best == refined[v]:
+            continue
+        source = refined[v]
+        refined[v] = best
+        singleton[v] = False
+        singleton[best] = False
+        outside[best] += outside[source] - 2 * links[best]
+        refined_totals[best] += k_v
+        refined_totals[source] = 0.0
+    return np.unique(refined, return_inverse=True)[1]
+
+
+def leiden_labels(B, resolution: float = 1.0, seed: int = CENTRALITY_SEED) -> np.ndarray:
+    """Leiden-style modularity optimisation on the CSR matrix from ``adjacency_arrays``.
+
+    Alternates fast local moving, refinement and aggregation of the refined
+    communities (each aggregate node starting in its unrefined community),
+    until local moving leaves every node alone. Unlike Louvain, the
+    communities it returns are always connected.
+    """
+    n = B.shape[0]
+    two_m = B.sum()
+    if n == 0 or two_m == 0:
+        return np.arange(n)
+    rng = random.Random(seed)
+    membership = np.arange(n)
+    labels = np.arange(n)
+    while True:
+        strength = np.asarray(B.sum(axis=1)).ravel()
+        labels = np.unique(_move_nodes(B, strength, two_m, labels, resolution, rng), return_inverse=True)[1]
+        if labels.max() + 1 == B.shape[0]:
+            break
+        refined = _refine(B, strength, two_m, labels, resolution, rng)
+        size = refined.max() + 1
+        if size == B.shape[0]:
+            break
+        S = sp.csr_array((np.ones(len(refined)), (np.arange(len(refined)), refined)), shape=(len(refined), size))
+        B = (S.T @ B @ S).tocsr()
+        B.sort_indices()
+        membership = refined[membership]
+        aggregate_labels = np.zeros(size, dtype=np.int64)
+        aggregate_labels[refined] = labels
+        labels = aggregate_labels
+    return labels[membership]
+
+
+def partition_from_labels(nodes, labels):
+    """``({community_id: [nodes]}, {node: community_id})``, ids numbered by first appearance."""
+    ids = {}
+    node_communities = {node: ids.setdefault(label, len(ids)) for node, label in zip(nodes, labels.tolist())}
+    communities = {}
+    for node, cid in node_communities.items():
+        communities.setdefault(cid, []).append(node)
+    return communities, node_communities
+
+
+def label_propagation(G, seed: int = CENTRALITY_SEED):
+    nodes, B = adjacency_arrays(G)
+    return partition_from_labels(nodes, label_propagation_labels(B, seed))
+
+
+def leiden(G, resolution: float = 1.0, seed: int = CENTRALITY_SEED):
+    nodes, B = adjacency_arrays(G)
+    return partition_from_labels(nodes, leiden_labels(B, resolution, seed))
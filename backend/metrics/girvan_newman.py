@@ -0,0 +1,216 @@
+import random
+import logging
+import threading
+
+import numpy as np
+import scipy.sparse as sp
+
+from metrics.approximate import CENTRALITY_SEED
+from metrics.memo import RESULT_MEMO, graph_fingerprint
+
+logger = logging.getLogger(__name__)
+
+# Pivot sources per component; components up to this size are scored exactly.
+GIRVAN_NEWMAN_PIVOTS = 64
+# Cells of the (arcs x sources) work arrays scored at once (~32 MB of float64).
+SOURCE_BATCH_CELLS = 1 << 22
+
+
+def edge_betweenness(adjacency, rows, cols, edge_of_arc, n_edges: int, sources) -> np.ndarray:
+    """Unweighted Brandes edge betweenness from ``sources``, as networkx's ``most_valuable_edge`` uses.
+
+    Level-synchronous: each BFS level of a whole batch of sources is one
+    sparse product, and so is each level of the dependency accumulation.
+    ``adjacency`` is the symmetric 0/1 CSR matrix (removed edges hold
+    explicit zeros). ``rows``/``cols`` are its live arcs, and
+    ``edge_of_arc`` maps each one to its undirected edge.
+    """
+    n = adjacency.shape[0]
+    scores = np.zeros(n_edges)
+    batch = max(1, SOURCE_BATCH_CELLS // max(len(rows), n, 1))
+    for start in range(0, len(sources), batch):
+        chunk = np.asarray(sources[start:start + batch])
+        k = len(chunk)
+        dist = np.full((n, k), -1, dtype=np.int64)
+        sigma = np.zeros((n, k))
+        dist[chunk, np.arange(k)] = 0
+        sigma[chunk, np.arange(k)] = 1.0
+
+        frontier = sigma.copy()
+        depth = 0
+        while True:
+            reach = adjacency @ frontier
+            new = (reach > 0) & (dist < 0)
+            if not new.any():
+                break
+            depth += 1
+            dist[new] = depth
+            sigma[new] = reach[new]
+            frontier = np.where(new, sigma, 0.0)
+
+        safe_sigma = np.where(sigma > 0, sigma, 1.0)
+        delta = np.zeros((n, k))
+        for level in range(depth, 0, -1):
+            pulled = adjacency @ np.where(dist == level, (1 + delta) / safe_sigma, 0.0)
+            delta += np.where(dist == level - 1, sigma * pulled, 0.0)
+
+        on_path = (dist[cols] == dist[rows] + 1) & (dist[rows] >= 0)
+        credit = np.where(on_path, sigma[rows] * (1 + delta[cols]) / safe_sigma[cols], 0.0)
+        scores += np.bincount(edge_of_arc, weights=credit.sum(axis=1), minlength=n_edges)
+    return scores
+
+
+class Dendrogram:
+    """Girvan-Newman splits of one undirected graph, computed as far as asked.
+
+    Each step removes the edge with the highest estimated edge betweenness
+    and re-scores only the component that edge belonged to, since no other
+    shortest path changes. A component is scored from a fixed sample of
+    pivot sources (all of its nodes when it is small), scaled by
+    size / pivots so components stay comparable.
+
+    Whenever a removal disconnects a component, the smaller side gets a new
+    label and the split is recorded, so the partition into any number of
+    communities is a replay of the first splits. Asking for more
+    communities than recorded resumes from the remaining graph.
+    """
+
+    def __init__(self, G, pivots: int = GIRVAN_NEWMAN_PIVOTS, seed: int = CENTRALITY_SEED):
+        self.nodes = sorted(G)
+        self.pivots = pivots
+        self.splits = []
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+        index = {node: i for i, node in enumerate(self.nodes)}
+        n = len(self.nodes)
+        pairs = {(min(index[u], index[v]), max(index[u], index[v])) for u, v in G.edges() if u != v}
+        self.edges = np.array(sorted(pairs), dtype=np.int64).reshape(-1, 2)
+        m = len(self.edges)
+        rows = np.concatenate((self.edges[:, 0], self.edges[:, 1]))
+        cols = np.concatenate((self.edges[:, 1], self.edges[:, 0]))
+        order = np.lexsort((cols, rows))
+        self._rows, self._cols = rows[order], cols[order]
+        self._edge_of_arc = np.tile(np.arange(m), 2)[order]
+        self._adjacency = sp.csr_array((np.ones(2 * m), (self._rows, self._cols)), shape=(n, n))
+        self._adjacency.sort_indices()
+        self._live = np.ones(m, dtype=bool)
+        self._scores = np.zeros(m)
+        self._neighbors = [set() for _ in range(n)]
+        for a, b in self.edges.tolist():
+            self._neighbors[a].add(b)
+            self._neighbors[b].add(a)
+
+        self._labels = np.full(n, -1, dtype=np.int64)
+        self._sources = {}
+        for i in range(n):
+            if self._labels[i] < 0:
+                self._labels[list(self._reachable(i))] = len(self._sources)
+                self._sources[len(self._sources)] = []
+        self.base = len(self._sources)
+        self.labels = dict(zip(self.nodes, self._labels.tolist()))
+        for label in range(self.base):
+            self._score(label, [])
+
+    @property
+    def footprint(self) -> int:
+        """Nodes plus arcs: what its arrays and adjacency sets hold, as counted by RESULT_MEMO."""
+        return len(self.nodes) + 2 * len(self.edges)
+
+    @property
+    def levels(self) -> int:
+        """Largest community count computed so far."""
+        return self.base + len(self.splits)
+
+    def _reachable(self, source) -> set:
+        seen = {source}
+        stack = [source]
+        while stack:
+            for w in self._neighbors[stack.pop()]:
+                if w not in seen:
+                    seen.add(w)
+                    stack.append(w)
+        return seen
+
+    def _score(self, label, kept):
+        """Re-scores one component's live edges from ``kept`` pivots topped up with new samples."""
+        members = np.flatnonzero(self._labels == label)
+        if len(members) <= self.pivots:
+            sources = members.tolist()
+        else:
+            sources = list(kept)
+            if len(sources) < self.pivots:
+                others = sorted(set(members.tolist()).difference(kept))
+                sources += self._rng.sample(others, self.pivots - len(sources))
+        self._sources[label] = sources
+
+        edges = self._live & (self._labels[self.edges[:, 0]] == label)
+        if not edges.any():
+            return
+        arcs = edges[self._edge_of_arc]
+        scores = edge_betweenness(self._adjacency, self._rows[arcs], self._cols[arcs], self._edge_of_arc[arcs],
+                                  len(self.edges), sources)
+        self._scores[edges] = scores[edges] * (len(members) / len(sources))
+
+    def _split(self) -> bool:
+        """Removes edges until one more component appears; False once no edges are left."""
+        while self._live.any():
+            edge = int(np.argmax(np.where(self._live, self._scores, -np.inf)))
+            u, v = self.edges[edge].tolist()
+            self._live[edge] = False
+            self._adjacency[[u, v], [v, u]] = 0.0
+            self._neighbors[u].discard(v)
+            self._neighbors[v].discard(u)
+            label = int(self._labels[u])
+
+            side = self._reachable(v)
+            if u in side:
+                self._score(label, self._sources[label])
+                continue
+
+            size = int(np.count_nonzero(self._labels == label))
+            moved = side if len(side) <= size - len(side) else self._reachable(u)
+            child = len(self._sources)
+            self._labels[list(moved)] = child
+            self.splits.append((child, tuple(self.nodes[i] for i in moved)))
+            sources = self._sources[label]
+            self._score(label, [s for s in sources if s not in moved])
+            self._score(child, [s for s in sources if s in moved])
+            return True
+        return False
+
+    def partition(self, num_communities: int):
+        """``({community_id: [nodes]}, {node: community_id})`` with at most ``num_communities`` parts."""
+        with self._lock:
+            while self.levels < num_communities and self._split():
+                pass
+            splits = self.splits[:max(0, num_communities - self.base)]
+
+        labels = dict(self.labels)
+        for child, moved in splits:
+            labels.update(dict.fromkeys(moved, child))
+        ids = {}
+        node_communities = {node: ids.setdefault(label, len(ids)) for node, label in labels.items()}
+        communities = {}
+        for node, cid in node_communities.items():
+            communities.setdefault(cid, []).append(node)
+        return communities, node_communities
+
+
+def girvan_newman_dendrogram(G, pivots: int = GIRVAN_NEWMAN_PIVOTS, seed: int = CENTRALITY_SEED) -> Dendrogram:
+    """The dendrogram for G, shared by every request for a graph with the same fingerprint."""
+    key = (graph_fingerprint(G), pivots, seed)
+    dendrogram = RESULT_MEMO.get("dendrogram", key)
+    if dendrogram is None:
+        dendrogram = Dendrogram(G, pivots, seed)
+        RESULT_MEMO.put("dendrogram", key, dendrogram, dendrogram.footprint)
+    return dendrogram
+
+
+def girvan_newman(G, num_communities=None, seed: int = CENTRALITY_SEED):
+    """Girvan-Newman communities; by default the first split, as ``next(nx_community.girvan_newman(G))``."""
+    dendrogram = girvan_newman_dendrogram(G, seed=seed)
+    if num_communities is None:
+        num_communities = dendrogram.base + 1
+    logger.info(f"Girvan-Newman partition into {num_communities} communities")
+    return dendrogram.partition(num_communities)
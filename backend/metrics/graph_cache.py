@@ -0,0 +1,63 @@
+import os
+import json
+import threading
+from collections import OrderedDict
+
+from ingestion.sampling import SAMPLED_LIMIT_TYPES
+
+GRAPH_CACHE_SIZE = 16
+
+# build_graph_from_txt arguments that change the graph itself; output-only
+# options (messages, normalization, which metrics) are left out of the key.
+GRAPH_PARAMS = (
+    "limit", "limit_type", "min_length", "max_length", "anonymize", "keywords",
+    "min_messages", "max_messages", "active_users", "selected_users", "username",
+    "start_date", "start_time", "end_date", "end_time", "directed", "use_history",
+    "history_length", "message_weights", "platform", "sample_seed", "graph_backend",
+)
+
+
+class CachedGraph:
+    __slots__ = ("graph", "is_connected")
+
+    def __init__(self, graph, is_connected):
+        self.graph = graph
+        self.is_connected = is_connected
+
+
+class GraphCache:
+    """Small LRU of built graphs, so a later metric request skips the rebuild."""
+
+    def __init__(self, maxsize: int = GRAPH_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+
+GRAPH_CACHE = GraphCache()
+
+
+def graph_request_key(txt_path: str, params: dict) -> tuple:
+    """Identifies a graph by its source file version and the parameters that shape it."""
+    stat = os.stat(txt_path)
+    shaped = {name: params.get(name) for name in GRAPH_PARAMS}
+    if shaped["limit_type"] not in SAMPLED_LIMIT_TYPES:
+        shaped["sample_seed"] = None
+    return (
+        os.path.abspath(txt_path), stat.st_size, stat.st_mtime_ns,
+        json.dumps(shaped, sort_keys=True, default=str),
+    )
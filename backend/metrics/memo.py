@@ -0,0 +1,83 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+MEMO_MAX_ENTRIES = 256
+# Bound on the summed size of the stored results (nodes per centrality dict,
+# nodes per partition), so a few huge graphs cannot pin unbounded memory.
+MEMO_MAX_VALUES = 2_000_000
+
+
+def graph_fingerprint(G) -> str:
+    """Canonical hash of the final weighted graph: sorted node ids and edge weights.
+
+    Two requests whose filters end in the same graph get the same
+    fingerprint, whatever parameters produced it.
+    """
+    directed = G.is_directed()
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(b"directed\n" if directed else b"undirected\n")
+    for node in sorted(G, key=repr):
+        digest.update(repr(node).encode())
+        digest.update(b"\n")
+    digest.update(b"edges\n")
+
+    edges = []
+    for u, v, weight in G.edges(data="weight", default=1):
+        a, b = repr(u), repr(v)
+        if not directed and b < a:
+            a, b = b, a
+        edges.append((a, b, repr(float(weight))))
+    for a, b, weight in sorted(edges):
+        digest.update(f"{a}\t{b}\t{weight}\n".encode())
+    return digest.hexdigest()
+
+
+class ResultMemo:
+    """Size-bounded LRU of per-graph results, with hit counters per kind."""
+
+    def __init__(self, max_entries: int = MEMO_MAX_ENTRIES, max_values: int = MEMO_MAX_VALUES):
+        self.max_entries = max_entries
+        self.max_values = max_values
+        self._entries = OrderedDict()
+        self._values = 0
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def _count(self, kind, outcome):
+        counters = self._counters.setdefault(kind, {"hits": 0, "misses": 0})
+        counters[outcome] += 1
+
+    def get(self, kind: str, key: tuple):
+        with self._lock:
+            entry = self._entries.get((kind, key))
+            if entry is None:
+                self._count(kind, "misses")
+                return None
+            self._entries.move_to_end((kind, key))
+            self._count(kind, "hits")
+            return entry[0]
+
+    def put(self, kind: str, key: tuple, value, size: int):
+        if size > self.max_values:
+            return
+        with self._lock:
+            previous = self._entries.pop((kind, key), None)
+            if previous is not None:
+                self._values -= previous[1]
+            self._entries[(kind, key)] = (value, size)
+            self._values += size
+            while len(self._entries) > self.max_entries or self._values > self.max_values:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._values -= evicted
+
+    def stats(self) -> dict:
+        with self._lock:
+            kinds = {}
+            for kind, counters in self._counters.items():
+                total = counters["hits"] + counters["misses"]
+                kinds[kind] = {**counters, "hit_rate": round(counters["hits"] / total, 4) if total else 0.0}
+            return {"entries": len(self._entries), "values": self._values, "kinds": kinds}
+
+
+RESULT_MEMO = ResultMemo()
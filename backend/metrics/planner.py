@@ -0,0 +1,143 @@
+import math
+
+from metrics.girvan_newman import GIRVAN_NEWMAN_PIVOTS
+
+# Seconds per unit of work on one core, measured with the implementations
+# the metrics code actually runs (networkx traversals, the sparse power
+# iterations, python-louvain). Estimates only need the right order of
+# magnitude: they decide between exact, sampled and skipped.
+UNIT_SECONDS = {
+    "node": 5e-7,        # degree, per node
+    "visit": 4.5e-8,     # one node or arc visit of a BFS (closeness)
+    "relax": 4e-7,       # one Dijkstra relaxation with heap work (betweenness)
+    "multiply": 6e-9,    # one matrix entry in one power iteration
+    "louvain": 9e-7,     # one node or arc in one Louvain pass
+    "leiden": 8e-7,      # one node or arc in one Leiden pass (local moving and refinement)
+    "label_propagation": 4e-7,  # one node or arc in one label propagation pass
+    "greedy": 3.4e-6,    # one merge candidate of greedy modularity
+    "edge_visit": 2.3e-8,  # one node or arc of a batched edge-betweenness BFS (Girvan-Newman)
+}
+POWER_ITERATIONS = {"pagerank": 30, "eigenvector": 30}
+LOUVAIN_PASSES = 10
+LABEL_PROPAGATION_PASSES = 10
+# scipy's BFS rows against a Python BFS, for exact closeness on a CSRGraph.
+CSR_CLOSENESS_SPEEDUP = 3.5
+
+# Community algorithms from slowest to fastest; a deadline falls back along it.
+PARTITION_FALLBACKS = ("girvan_newman", "greedy_modularity", "louvain", "leiden", "label_propagation")
+
+SAMPLED_METRICS = ("betweenness", "closeness")
+MIN_SAMPLES = 10
+# Share of the deadline the plan may spend; the rest covers parsing,
+# serialization and estimation error.
+PLANNER_HEADROOM = 0.7
+
+
+def source_seconds(name: str, n: int, m: int, directed: bool) -> float:
+    """Cost of one source node's traversal for a sampled measure."""
+    arcs = m if directed else 2 * m
+    if name == "betweenness":
+        return (arcs + n * math.log2(max(n, 2))) * UNIT_SECONDS["relax"]
+    return (n + arcs) * UNIT_SECONDS["visit"]
+
+
+def estimate_seconds(name: str, n: int, m: int, directed=False, samples=None, backend="networkx") -> float:
+    """Estimated run time of one centrality measure; ``samples=None`` means exact."""
+    arcs = m if directed else 2 * m
+    if name == "degree":
+        return n * UNIT_SECONDS["node"]
+    if name in POWER_ITERATIONS:
+        return POWER_ITERATIONS[name] * (n + arcs) * UNIT_SECONDS["multiply"]
+    cost = (n if samples is None else samples) * source_seconds(name, n, m, directed)
+    if name == "closeness" and samples is None and backend == "csr":
+        cost /= CSR_CLOSENESS_SPEEDUP
+    return cost
+
+
+def plan_step(method: str, seconds: float, samples=None) -> dict:
+    return {"method": method, "samples": samples, "estimate_ms": round(seconds * 1000, 1)}
+
+
+def plan_centralities(metrics, n: int, m: int, directed=False, deadline_ms=None, approximate=False,
+                      samples=None, backend="networkx") -> dict:
+    """Chooses exact, approximate or skipped for each requested measure.
+
+    Without a deadline the request's own ``approximate``/``samples`` choice
+    is kept. With one, the cheap measures (degree, PageRank, eigenvector)
+    always run exactly. Betweenness and closeness split what is left of the
+    budget: each runs exactly if that fits its share, otherwise with as
+    many pivots as fit (at most ``samples`` when the request asked for
+    approximation). Below ``MIN_SAMPLES`` pivots it is skipped.
+    """
+    requested = bool(approximate) and samples is not None and samples < n
+    if deadline_ms is None:
+        return {
+            name: plan_step("approximate", estimate_seconds(name, n, m, directed, samples, backend), samples)
+            if requested and name in SAMPLED_METRICS
+            else plan_step("exact", estimate_seconds(name, n, m, directed, None, backend))
+            for name in metrics
+        }
+
+    budget = deadline_ms / 1000 * PLANNER_HEADROOM
+    plan = {}
+    for name in metrics:
+        if name not in SAMPLED_METRICS:
+            seconds = estimate_seconds(name, n, m, directed, None, backend)
+            plan[name] = plan_step("exact", seconds)
+            budget -= seconds
+
+    heavy = [name for name in metrics if name in SAMPLED_METRICS]
+    for i, name in enumerate(heavy):
+        share = max(budget, 0) / (len(heavy) - i)
+        exact = estimate_seconds(name, n, m, directed, None, backend)
+        if not requested and exact <= share:
+            plan[name] = plan_step("exact", exact)
+            budget -= exact
+            continue
+
+        cap = samples if requested else n - 1
+        k = min(cap, int(share / source_seconds(name, n, m, directed)))
+        if k >= min(MIN_SAMPLES, cap) and k > 0:
+            seconds = estimate_seconds(name, n, m, directed, k, backend)
+            plan[name] = plan_step("approximate", seconds, k)
+            budget -= seconds
+        else:
+            plan[name] = plan_step("skipped", 0.0)
+
+    return {name: plan[name] for name in metrics}
+
+
+def partition_seconds(algorithm: str, n: int, m: int, num_communities=None) -> float:
+    """Estimated run time of one community detection algorithm (undirected graph)."""
+    arcs = 2 * m
+    if algorithm in ("louvain", "leiden"):
+        return LOUVAIN_PASSES * (n + arcs) * UNIT_SECONDS[algorithm]
+    if algorithm == "label_propagation":
+        return LABEL_PROPAGATION_PASSES * (n + arcs) * UNIT_SECONDS["label_propagation"]
+    if algorithm == "greedy_modularity":
+        return (n * n + arcs * math.log2(max(n, 2))) * UNIT_SECONDS["greedy"]
+    # Girvan-Newman re-scores a component from sampled pivots after every
+    # removed edge; a split takes roughly as many removals as the mean degree.
+    splits = max(1, (num_communities or 2) - 1)
+    rounds = splits * max(1, round(arcs / max(n, 1)))
+    return rounds * min(n, GIRVAN_NEWMAN_PIVOTS) * (n + arcs) * UNIT_SECONDS["edge_visit"]
+
+
+def plan_partition(algorithm: str, n: int, m: int, deadline_ms=None, num_communities=None) -> dict:
+    """The requested algorithm if it fits the deadline, else the first cheaper one that does.
+
+    Falls back along ``PARTITION_FALLBACKS``, from Girvan-Newman down to
+    label propagation, which is kept as the last resort even when it is
+    over budget.
+    """
+    chain = PARTITION_FALLBACKS[PARTITION_FALLBACKS.index(algorithm):]
+    budget = None if deadline_ms is None else deadline_ms / 1000 * PLANNER_HEADROOM
+    for candidate in chain:
+        seconds = partition_seconds(candidate, n, m, num_communities)
+        if budget is None or seconds <= budget or candidate == chain[-1]:
+            return {
+                "requested": algorithm,
+                "algorithm": candidate,
+                "fallback": candidate != algorithm,
+                "estimate_ms": round(seconds * 1000, 1),
+            }
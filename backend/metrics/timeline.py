@@ -0,0 +1,127 @@
+import numpy as np
+import scipy.sparse as sp
+
+from metrics.sparse import SparseGraph
+from metrics.csr_graph import CSRGraph
+from metrics.graph_cache import GraphCache, graph_request_key
+
+TIMELINE_CACHE_SIZE = 8
+WINDOW_PARAMS = ("start_date", "start_time", "end_date", "end_time")
+WARM_METRICS = ("eigenvector", "pagerank")
+
+
+def timeline_key(txt_path: str, params: dict) -> tuple:
+    """Same file version and filters, any date window: the windows a slider steps through."""
+    return graph_request_key(txt_path, {**params, **dict.fromkeys(WINDOW_PARAMS)})
+
+
+def edge_weights(G) -> dict:
+    if G.is_directed():
+        return {(u, v): w for u, v, w in G.edges(data="weight", default=1)}
+    return {(u, v) if u <= v else (v, u): w for u, v, w in G.edges(data="weight", default=1)}
+
+
+class TimelineState:
+    """One window of a timeline: its edges, degree counts, CSR adjacency and the
+    power-iteration vectors that the next window warm-starts from."""
+
+    __slots__ = ("edges", "degree", "sparse", "start", "values", "changed_edges")
+
+    def __init__(self, edges, degree, sparse, start=None, changed_edges=None):
+        self.edges = edges
+        self.degree = degree
+        self.sparse = sparse
+        self.start = start or {}
+        self.values = {}
+        self.changed_edges = changed_edges
+
+    @property
+    def warm(self) -> bool:
+        return bool(self.start)
+
+    def degree_centrality(self) -> dict:
+        n = len(self.degree)
+        if n <= 1:
+            return dict.fromkeys(self.degree, 1)
+        scale = 1.0 / (n - 1)
+        return {node: d * scale for node, d in self.degree.items()}
+
+    def remember(self, values: dict):
+        self.values = {name: values[name] for name in WARM_METRICS if values.get(name)}
+
+
+def degree_update(degree: dict, edge, sign: int):
+    """Adds or removes one edge; endpoints that left the graph are skipped."""
+    u, v = edge
+    if u == v:
+        if u in degree:
+            degree[u] += 2 * sign
+        return
+    for node in edge:
+        if node in degree:
+            degree[node] += sign
+
+
+def advance(previous, G) -> TimelineState:
+    """State for G, derived from the previous window by applying only the changed edges.
+
+    Degree counts move by O(changed edges). The CSR adjacency is sliced to the
+    surviving nodes, padded for new ones, and then corrected with two sparse
+    matrices: the old weights of changed edges are subtracted and the new ones
+    added. This way every entry ends up exactly equal to a fresh build, and
+    removed edges become exact zeros.
+    """
+    edges = edge_weights(G)
+    if previous is None:
+        adjacency = G.sparse if isinstance(G, CSRGraph) else SparseGraph.from_graph(G)
+        return TimelineState(edges, dict(G.degree()), adjacency, changed_edges=len(edges))
+
+    old_edges = previous.edges
+    changed = [e for e, w in edges.items() if old_edges.get(e) != w]
+    changed.extend(e for e in old_edges if e not in edges)
+
+    degree = {node: d for node, d in previous.degree.items() if node in G}
+    degree.update((node, 0) for node in G if node not in degree)
+    for edge in changed:
+        was, now = edge in old_edges, edge in edges
+        if was != now:
+            degree_update(degree, edge, 1 if now else -1)
+
+    old = previous.sparse
+    survivors = [node for node in old.nodes if node in G]
+    nodes = survivors + [node for node in G if node not in old.index]
+    weights = old.weights
+    if len(survivors) < len(old.nodes):
+        keep = np.fromiter((old.index[node] for node in survivors), dtype=np.int64, count=len(survivors))
+        weights = weights[keep][:, keep]
+    n = len(nodes)
+    indptr = np.concatenate((weights.indptr, np.full(n - len(survivors), weights.indptr[-1])))
+    weights = sp.csr_array((weights.data, weights.indices, indptr), shape=(n, n))
+
+    index = {node: i for i, node in enumerate(nodes)}
+    directed = G.is_directed()
+
+    def correction(source):
+        rows, cols, data = [], [], []
+        for edge in changed:
+            w = source.get(edge)
+            u, v = edge
+            if w is None or u not in index or v not in index:
+                continue
+            rows.append(index[u])
+            cols.append(index[v])
+            data.append(w)
+            if not directed and u != v:
+                rows.append(index[v])
+                cols.append(index[u])
+                data.append(w)
+        return sp.csr_array((data, (rows, cols)), shape=(n, n), dtype=float)
+
+    weights = (weights - correction(old_edges)) + correction(edges)
+    weights.eliminate_zeros()
+
+    return TimelineState(edges, degree, SparseGraph(nodes, weights, directed),
+                         start=previous.values, changed_edges=len(changed))
+
+
+TIMELINE_CACHE = GraphCache(TIMELINE_CACHE_SIZE)
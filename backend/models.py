@@ -63,6 +63,7 @@ class Research(Base):
         server_default='whatsapp' 
     )
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.user_id"), nullable=True)
+    file_name = Column(String, nullable=True)
     created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(pytz.utc))
 
     def to_dict(self):
@@ -72,6 +73,7 @@ class Research(Base):
             "description": self.description,
             "platform": self.platform,
             "user_id": str(self.user_id) if self.user_id else None, 
+            "file_name": self.file_name,
             "created_at": self.created_at.isoformat() if self.created_at else None,
         }
 
@@ -102,6 +104,8 @@ class ResearchFilter(Base):
     normalize = Column(Boolean, default=False)
     history_length = Column(Integer, nullable=True)
     message_weights = Column(JSONB, nullable=True)
+    sample_seed = Column(Integer, nullable=True)
+    community_seed = Column(Integer, nullable=True)
     created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(pytz.utc))
     
     def to_dict(self):
@@ -129,6 +133,8 @@ class ResearchFilter(Base):
             "normalize": self.normalize,
             "history_length": self.history_length,
             "message_weights": self.message_weights,
+            "sample_seed": self.sample_seed,
+            "community_seed": self.community_seed,
             "created_at": self.created_at.isoformat() if self.created_at else None
         }
 
@@ -0,0 +1,48 @@
+import os
+import logging
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+
+logger = logging.getLogger(__name__)
+
+PROCESS_WORKERS = int(os.getenv("PROCESS_WORKERS", os.cpu_count() or 1))
+
+
+class ProcessPool:
+    """One long-lived spawn pool for CPU-bound work that threads cannot spread over cores.
+
+    Started on first use, so requests after the first pay no process
+    start-up, and shut down by the application's shutdown hook. A pool
+    broken by a dying worker is replaced on the next use.
+    """
+
+    def __init__(self, workers: int = PROCESS_WORKERS):
+        self.workers = max(1, workers)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                logger.info(f"Starting process pool with {self.workers} workers")
+                self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=get_context("spawn"))
+            return self._executor
+
+    def submit(self, fn, *args):
+        try:
+            return self.executor().submit(fn, *args)
+        except BrokenProcessPool:
+            logger.warning("Process pool is broken, starting a new one")
+            self.shutdown()
+            return self.executor().submit(fn, *args)
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+PROCESS_POOL = ProcessPool()
@@ -31,6 +31,58 @@ class NetworkAnalysisData(BaseModel):
     links: List[dict]
     metric_name: Optional[str] = None
 
+class RecomputeItem(BaseModel):
+    research_id: str
+
+class RecomputeRequest(BaseModel):
+    researches: List[RecomputeItem]
+
+
+def filter_params(filters) -> dict:
+    """build_graph_from_txt arguments that reproduce a saved research's graph."""
+    params = {
+        "start_date": filters.start_date,
+        "end_date": filters.end_date,
+        "start_time": filters.start_time,
+        "end_time": filters.end_time,
+        "limit": filters.message_limit,
+        "limit_type": filters.limit_type,
+        "min_length": filters.min_message_length,
+        "max_length": filters.max_message_length,
+        "keywords": filters.keywords,
+        "min_messages": filters.min_messages,
+        "max_messages": filters.max_messages,
+        "active_users": filters.top_active_users,
+        "selected_users": filters.selected_users,
+        "username": filters.filter_by_username,
+        "directed": filters.directed,
+        "use_history": filters.use_history,
+        "normalize": filters.normalize,
+        "history_length": filters.history_length,
+        "message_weights": filters.message_weights,
+        "sample_seed": filters.sample_seed,
+        "anonymize": filters.anonymize,
+    }
+    return {key: value for key, value in params.items() if value is not None}
+
+
+async def research_source_file(db: AsyncSession, research: Research) -> Optional[str]:
+    """The uploaded file a saved research was built from, as recorded at save time.
+
+    Researches saved before ``Research.file_name`` existed fall back to the
+    ``original_file_name`` of their comparisons, which lacks ``.txt`` for
+    Wikipedia.
+    """
+    names = [research.file_name] if research.file_name else []
+    if not names:
+        result = await db.execute(
+            select(Comparisons.original_file_name).where(Comparisons.research_id == research.research_id)
+        )
+        stored = next((name for name in result.scalars() if name), None)
+        if stored:
+            names = [stored, f"{stored}.txt"]
+    return next((name for name in names if os.path.exists(os.path.join(UPLOAD_FOLDER, name))), None)
+
 @router.post("/save-research")
 async def save_research(
     file_name: str = Form(...),
@@ -62,6 +114,8 @@ async def save_research(
     normalize: bool = Query(False),
     history_length: int = Query(3),
     message_weights: str = Query([5,3,2]),
+    sample_seed: int = Query(None),
+    community_seed: int = Query(None),
     current_user: dict = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
     communities: Optional[str] = Form(None),
@@ -108,6 +162,7 @@ async def save_research(
             end_time=end_time,
             history_length=int(history_length) if history_length is not None else 3,
             message_weights=parsed_message_weights,
+            sample_seed=sample_seed,
             is_for_save=True
         )
         
@@ -132,6 +187,7 @@ async def save_research(
             description=description,
             user_id=researcher_id,
             platform=platform,
+            file_name=os.path.basename(file_path),
         )
         db.add(new_research)
         await db.commit()
@@ -169,6 +225,8 @@ async def save_research(
             normalize=normalize,
             history_length=history_length if use_history else None,
             message_weights=parsed_message_weights if use_history else None,
+            sample_seed=data.get("sample_seed"),
+            community_seed=community_seed,
         )
         db.add(new_filter) 
         parsed_communities = json.loads(communities) if communities not in [None, "", "[]"] else []
@@ -277,6 +335,69 @@ async def save_research(
         raise HTTPException(status_code=500, detail=f"Error saving data: {str(e)}")
 
 
+@router.post("/research/recompute")
+async def recompute_researches(
+    request: RecomputeRequest,
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Rebuilds saved researches from their stored filters with exact, multi-core betweenness."""
+    results = []
+    for item in request.researches:
+        try:
+            research = await db.get(Research, item.research_id)
+            if not research:
+                raise HTTPException(status_code=404, detail="Research not found")
+            if str(research.user_id) != current_user["user_id"]:
+                raise HTTPException(status_code=403, detail="Not authorized")
+
+            file_name = await research_source_file(db, research)
+            if file_name is None:
+                raise HTTPException(status_code=404, detail="Source file of this research not found.")
+            if research.platform == "wikipedia" and file_name.endswith(".txt"):
+                file_name = file_name[:-4]
+
+            filter_result = await db.execute(select(ResearchFilter).where(ResearchFilter.research_id == research.research_id))
+            filters = filter_result.scalars().first()
+
+            analyzer = get_analyzer(research.platform)
+            data = await analyzer.analyze(
+                filename=file_name,
+                approximate=False,
+                parallel_betweenness=True,
+                **(filter_params(filters) if filters else {})
+            )
+            if hasattr(data, "body"):
+                data = json.loads(data.body)
+
+            analysis_result = await db.execute(select(NetworkAnalysis).where(NetworkAnalysis.research_id == research.research_id))
+            analysis = analysis_result.scalars().first()
+            if analysis:
+                analysis.nodes = data["nodes"]
+                analysis.links = data["links"]
+                analysis.is_connected = data["is_connected"]
+            else:
+                db.add(NetworkAnalysis(
+                    research_id=research.research_id,
+                    nodes=data["nodes"],
+                    links=data["links"],
+                    is_connected=data["is_connected"]
+                ))
+            await db.commit()
+            results.append({"research_id": item.research_id, "status": "recomputed", "nodes": len(data["nodes"])})
+
+        except HTTPException as he:
+            logger.error(f"Error recomputing research {item.research_id}: {he.detail}")
+            await db.rollback()
+            results.append({"research_id": item.research_id, "status": "error", "detail": he.detail})
+        except Exception as e:
+            logger.error(f"Error recomputing research {item.research_id}: {e}")
+            await db.rollback()
+            results.append({"research_id": item.research_id, "status": "error", "detail": str(e)})
+
+    return JSONResponse(content={"results": results}, status_code=200)
+
+
 @router.delete("/research/{research_id}")
 async def delete_research(
     research_id: str,
@@ -394,6 +515,7 @@ async def update_research_data(
         filters_data.pop("top_active_users", None)
         filters_data.pop("filter_by_username", None)
         filters_data.pop("specific_users", None)
+        filters_data.pop("community_seed", None)
         analyzer = get_analyzer(research.platform)
 
         new_data = await analyzer.analyze(
@@ -419,7 +541,8 @@ async def update_research_data(
 
         INT_FIELDS = [
             "message_limit", "min_message_length", "max_message_length",
-            "min_messages", "max_messages", "top_active_users", "history_length"
+            "min_messages", "max_messages", "top_active_users", "history_length",
+            "sample_seed", "community_seed"
         ]
 
         if filters:
@@ -435,6 +558,9 @@ async def update_research_data(
             )
             db.add(filters)
 
+        if new_data.get("sample_seed") is not None:
+            filters.sample_seed = new_data["sample_seed"]
+
 
         await db.execute(delete(Message).where(Message.research_id == research.research_id))
         db.add_all([
@@ -0,0 +1,39 @@
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+USERS = [f"User {i}" for i in range(12)] + ["~ Dana", "Мария", "אבי כהן"]
+WORDS = ["hello", "שלום", "meeting", "today", "ok", "lol", "great idea", "מה קורה", "plan"]
+NOTICES = ["image omitted", "This message was deleted", "הודעה זו נמחקה"]
+
+LINE_FORMATS = {
+    "ios": lambda t, user, text: f"[{t:%d/%m/%Y, %H:%M:%S}] {user}: {text}",
+    "ios_dots": lambda t, user, text: f"[{t.day}.{t.month}.{t.year}, {t:%H:%M:%S}] {user}: {text}",
+    "android": lambda t, user, text: f"{t.month}/{t.day}/{t:%y, %H:%M} - {user}: {text}",
+}
+
+
+def export_lines(count, dialect="ios", seed=1, users=USERS, start=datetime(2023, 1, 3, 8, 0)):
+    rnd = random.Random(seed)
+    t = start
+    lines = []
+    for _ in range(count):
+        t += timedelta(minutes=rnd.randint(1, 300))
+        text = " ".join(rnd.choice(WORDS) for _ in range(rnd.randint(1, 8)))
+        if rnd.random() < 0.05:
+            text = rnd.choice(NOTICES)
+        lines.append(LINE_FORMATS[dialect](t, rnd.choice(users), text))
+        if rnd.random() < 0.03:
+            lines.append("continuation line without header")
+    return lines
+
+
+@pytest.fixture
+def write_export(tmp_path):
+    """Writes a generated WhatsApp export and returns its path."""
+    def write(count=300, dialect="ios", seed=1, name="chat.txt", **kwargs):
+        path = tmp_path / name
+        path.write_text("\n".join(export_lines(count, dialect, seed, **kwargs)) + "\n", encoding="utf-8")
+        return str(path)
+    return write
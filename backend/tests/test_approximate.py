@@ -0,0 +1,46 @@
+import networkx as nx
+import pytest
+
+from graph_builder import build_graph_from_txt
+from metrics.approximate import approximate_betweenness, approximate_closeness, sample_pivots
+
+
+def graphs():
+    G = nx.gnm_random_graph(60, 200, seed=1)
+    for u, v in G.edges():
+        G[u][v]["weight"] = 1 + (u * v) % 4
+    D = nx.gnm_random_graph(60, 250, seed=2, directed=True)
+    split = nx.disjoint_union(nx.path_graph(5), nx.cycle_graph(7))
+    return [G, D, split]
+
+
+@pytest.mark.parametrize("G", graphs())
+def test_all_pivots_give_the_exact_values(G):
+    n = len(G)
+    betweenness, errors = approximate_betweenness(G, n)
+    assert betweenness == pytest.approx(nx.betweenness_centrality(G, weight="weight"), abs=1e-12)
+    assert max(errors.values()) == pytest.approx(0, abs=1e-12)
+
+    closeness, _ = approximate_closeness(G, n)
+    assert closeness == pytest.approx(nx.closeness_centrality(G), abs=1e-12)
+
+
+def top(values, count=10):
+    return set(sorted(values, key=values.get, reverse=True)[:count])
+
+
+def test_sampled_estimate_tracks_the_exact_values():
+    G = nx.barabasi_albert_graph(400, 3, seed=4)
+    exact = nx.betweenness_centrality(G)
+    estimate, _ = approximate_betweenness(G, 100, weight=None)
+    assert sum(estimate.values()) == pytest.approx(sum(exact.values()), rel=0.05)
+    assert len(top(estimate) & top(exact)) >= 8
+    assert sample_pivots(G, 100) == sample_pivots(G, 100)
+
+
+def test_graph_reports_approximate_errors(write_export):
+    graph_data = build_graph_from_txt(write_export(400), approximate=True, centrality_samples=5,
+                                      metrics="betweenness,closeness")
+    methods = {name: step["method"] for name, step in graph_data["plan"]["metrics"].items()}
+    assert methods == {"betweenness": "approximate", "closeness": "approximate"}
+    assert all(node["approximate"] and "betweenness_error" in node for node in graph_data["nodes"])
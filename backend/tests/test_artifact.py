@@ -0,0 +1,54 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from ingestion.artifact import (
+    ARTIFACT_DIRNAME, artifact_path, build_artifact, iter_records, load_artifact, load_or_build_artifact,
+    remove_artifacts,
+)
+from ingestion.whatsapp_parser import sniff_dialect
+
+
+def artifact_rows(artifact):
+    return [
+        (artifact.users[artifact.user_ids[i]], artifact.text(i), int(artifact.timestamps[i]))
+        for i in range(len(artifact))
+    ]
+
+
+def test_artifact_matches_parsed_records(write_export):
+    path = write_export(500)
+    artifact = build_artifact(path)
+
+    records = [(user, text, timestamp) for user, text, timestamp, _ in iter_records(path, "whatsapp", sniff_dialect(path))]
+    assert artifact_rows(artifact) == records
+    assert artifact.meta["count"] == len(records)
+    assert artifact_rows(load_artifact(path)) == records
+
+
+def test_changed_source_makes_artifact_stale(write_export):
+    path = write_export(200)
+    load_or_build_artifact(path)
+    assert load_artifact(path) is not None
+
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("[01/01/2030, 10:00:00] Late User: hello\n")
+    assert load_artifact(path) is None
+    assert artifact_rows(load_or_build_artifact(path))[-1] == ("Late User", "hello", 1893492000)
+
+
+def test_concurrent_builds_publish_one_artifact(write_export):
+    path = write_export(300)
+    with ThreadPoolExecutor(4) as pool:
+        artifacts = list(pool.map(lambda _: build_artifact(path), range(4)))
+
+    assert len({len(artifact) for artifact in artifacts}) == 1
+    artifacts_dir = os.path.join(os.path.dirname(path), ARTIFACT_DIRNAME)
+    assert sorted(os.listdir(artifacts_dir)) == ["chat.txt.whatsapp", "chat.txt.whatsapp.lock"]
+
+
+def test_remove_artifacts(write_export):
+    path = write_export(50)
+    build_artifact(path)
+    remove_artifacts(path)
+    assert not os.path.exists(artifact_path(path, "whatsapp"))
+    assert load_artifact(path) is None
@@ -0,0 +1,46 @@
+import networkx as nx
+import pytest
+
+from metrics import betweenness
+from metrics.betweenness import exact_betweenness, parallel_betweenness
+from metrics.csr_graph import CSRGraph
+from process_pool import PROCESS_POOL
+
+
+def weighted_graph(directed):
+    G = nx.gnm_random_graph(120, 500, seed=7, directed=directed)
+    for i, (u, v) in enumerate(G.edges()):
+        G[u][v]["weight"] = 1 + i % 4
+    return G
+
+
+def csr(G):
+    return CSRGraph.from_edges(G, G.edges(data="weight"), G.is_directed())
+
+
+@pytest.fixture
+def pooled(monkeypatch):
+    monkeypatch.setattr(betweenness, "PARALLEL_MIN_NODES", 10)
+    yield
+    PROCESS_POOL.shutdown()
+
+
+@pytest.mark.parametrize("directed", [False, True])
+def test_parallel_betweenness_matches_networkx(directed, pooled):
+    G = weighted_graph(directed)
+    expected = nx.betweenness_centrality(G, weight="weight")
+    assert parallel_betweenness(G, workers=3) == pytest.approx(expected, abs=1e-12)
+    assert parallel_betweenness(csr(G), workers=2) == pytest.approx(expected, abs=1e-12)
+
+
+def test_exact_betweenness_on_csr_matches_networkx():
+    G = weighted_graph(False)
+    assert exact_betweenness(csr(G)) == pytest.approx(nx.betweenness_centrality(G, weight="weight"), abs=1e-12)
+
+
+def test_small_graphs_stay_inline(monkeypatch):
+    def fail(*args):
+        raise AssertionError("small graph sent to the process pool")
+    monkeypatch.setattr(PROCESS_POOL, "submit", fail)
+    G = nx.karate_club_graph()
+    assert parallel_betweenness(G, workers=4) == pytest.approx(nx.betweenness_centrality(G, weight="weight"))
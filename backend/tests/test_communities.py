@@ -0,0 +1,44 @@
+import networkx as nx
+import pytest
+from community import community_louvain
+
+from graph_builder import build_graph_from_txt
+from metrics.communities import COMMUNITY_SEED, community_graph, partition_report
+
+
+def baseline_graph(nodes, links):
+    """The graph the analyzers built before partitioning the built graph."""
+    G = nx.Graph()
+    for node in nodes:
+        G.add_node(node["id"], **{k: v for k, v in node.items() if k != "id"})
+    for link in links:
+        G.add_edge(link["source"], link["target"], weight=link.get("weight", 1))
+    return G
+
+
+@pytest.fixture
+def normalized_directed(write_export):
+    return build_graph_from_txt(write_export(600), directed=True, normalize=True, metrics="")
+
+
+def test_community_graph_keeps_link_weights(normalized_directed):
+    nodes, links = normalized_directed["nodes"], normalized_directed["links"]
+    expected = baseline_graph(nodes, links)
+
+    for backend in ("networkx", "csr"):
+        G = community_graph(nodes, links, backend)
+        assert not G.is_directed()
+        assert list(G) == list(expected)
+        weights = {frozenset((u, v)): w for u, v, w in G.edges(data="weight")}
+        assert weights == {frozenset((u, v)): w for u, v, w in expected.edges(data="weight")}
+
+
+def test_louvain_matches_baseline_partition(normalized_directed):
+    nodes, links = normalized_directed["nodes"], normalized_directed["links"]
+    expected = community_louvain.best_partition(baseline_graph(nodes, links), random_state=COMMUNITY_SEED)
+
+    report = partition_report(nodes, links, "louvain")
+    assert report["node_communities"] == expected
+    assert report["modularity"] == pytest.approx(
+        community_louvain.modularity(expected, baseline_graph(nodes, links))
+    )
@@ -0,0 +1,54 @@
+import networkx as nx
+import pytest
+from community import community_louvain
+
+from graph_builder import build_graph_from_txt
+from metrics.communities import community_graph
+from metrics.community_stats import COMMUNITY_STAT_DIGITS, community_stats
+
+
+def per_community_rows(G, communities, nodes):
+    """The per-community scans the analyzers ran before, plus density and conductance from networkx."""
+    rows = []
+    for cid, members in communities.items():
+        comm_nodes = [n for n in nodes if n["id"] in members]
+        row = {"id": cid, "size": len(members), "nodes": members}
+        for field in ("betweenness", "pagerank", "messages"):
+            average = sum(n[field] for n in comm_nodes) / len(comm_nodes) if comm_nodes else 0
+            row[f"avg_{field}"] = round(average, COMMUNITY_STAT_DIGITS[field])
+        row["internal_density"] = round(nx.density(G.subgraph(members)), 4)
+        row["conductance"] = round(nx.conductance(G, members), 4) if len(members) < len(G) else 0.0
+        rows.append(row)
+    return rows
+
+
+def community_edges(G, node_communities):
+    links = {}
+    for u, v, w in G.edges(data="weight"):
+        a, b = node_communities[u], node_communities[v]
+        if a != b:
+            key = frozenset((a, b))
+            edges, weight = links.get(key, (0, 0.0))
+            links[key] = (edges + 1, weight + w)
+    return links
+
+
+@pytest.mark.parametrize("directed", [False, True])
+def test_grouped_stats_match_per_community_scans(write_export, directed):
+    graph_data = build_graph_from_txt(write_export(800, users=[f"P{i}" for i in range(40)]), directed=directed)
+    nodes, links = graph_data["nodes"], graph_data["links"]
+    G = community_graph(nodes, links)
+    node_communities = community_louvain.best_partition(G, random_state=3)
+    communities = {}
+    for node, cid in node_communities.items():
+        communities.setdefault(cid, []).append(node)
+    assert len(communities) > 1
+
+    rows, community_links = community_stats(G, communities, node_communities, nodes, digits=COMMUNITY_STAT_DIGITS)
+    assert rows == per_community_rows(G, communities, nodes)
+
+    expected = community_edges(G, node_communities)
+    assert {frozenset((link["source"], link["target"])): (link["edges"], pytest.approx(link["weight"]))
+            for link in community_links} == {
+        key: (edges, pytest.approx(weight)) for key, (edges, weight) in expected.items()
+    }
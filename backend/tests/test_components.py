@@ -0,0 +1,51 @@
+import math
+
+import networkx as nx
+import pytest
+
+from metrics import centrality
+from metrics.centrality import compute_centralities
+from process_pool import PROCESS_POOL
+
+
+def split_graph(directed=False):
+    parts = [nx.gnm_random_graph(size, 3 * size, seed=size, directed=directed) for size in (30, 12, 6)]
+    G = nx.disjoint_union_all(parts + [nx.path_graph(2, create_using=nx.DiGraph if directed else nx.Graph)])
+    for i, (u, v) in enumerate(G.edges()):
+        G[u][v]["weight"] = 1 + i % 3
+    return G
+
+
+@pytest.mark.parametrize("directed", [False, True])
+def test_closeness_and_pagerank_match_the_whole_graph(directed):
+    G = split_graph(directed)
+    values, _, _, methods = compute_centralities(G, ("closeness", "pagerank"), is_connected=False)
+    assert methods["closeness"]["method"] == "exact"
+    assert values["closeness"] == pytest.approx(nx.closeness_centrality(G), abs=1e-9)
+    if not directed:
+        assert values["pagerank"] == pytest.approx(nx.pagerank(G), abs=1e-5)
+    assert sum(values["pagerank"].values()) == pytest.approx(1)
+
+
+def test_eigenvector_is_solved_per_component():
+    G = split_graph()
+    values = compute_centralities(G, ("eigenvector",), is_connected=False)[0]["eigenvector"]
+    for component in nx.connected_components(G):
+        expected = nx.eigenvector_centrality(G.subgraph(component), max_iter=1000)
+        scale = math.sqrt(len(component) / len(G))
+        assert {v: values[v] for v in component} == pytest.approx({v: scale * x for v, x in expected.items()}, abs=1e-5)
+
+
+def test_large_components_on_the_process_pool_match_inline(monkeypatch):
+    G = split_graph()
+    inline = compute_centralities(G, ("closeness", "pagerank"), is_connected=False)[0]
+
+    monkeypatch.setattr(centrality, "PARALLEL_MIN_COMPONENT", 10)
+    monkeypatch.setattr(PROCESS_POOL, "workers", 2)
+    monkeypatch.setattr(centrality, "RESULT_MEMO", type(centrality.RESULT_MEMO)())
+    try:
+        pooled = compute_centralities(G, ("closeness", "pagerank"), is_connected=False)[0]
+    finally:
+        PROCESS_POOL.shutdown()
+    for name in ("closeness", "pagerank"):
+        assert pooled[name] == pytest.approx(inline[name], abs=1e-12)
@@ -0,0 +1,61 @@
+import asyncio
+import threading
+
+import pytest
+
+pytest.importorskip("fastapi")
+from fastapi import HTTPException
+
+from compute_service import STAGE_TIMEOUTS, ComputeService, parse_timeout
+
+
+def test_run_returns_the_result():
+    service = ComputeService(workers=2, queue_depth=0)
+    assert asyncio.run(service.run("graph", lambda a, b=0: a + b, 2, b=3)) == 5
+    service.shutdown()
+
+
+def test_full_queue_rejects_with_503():
+    service = ComputeService(workers=1, queue_depth=1)
+    release = threading.Event()
+
+    async def scenario():
+        jobs = [asyncio.ensure_future(service.run("graph", release.wait)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        with pytest.raises(HTTPException) as rejected:
+            await service.run("graph", lambda: None)
+        release.set()
+        await asyncio.gather(*jobs)
+        return rejected.value
+
+    assert asyncio.run(scenario()).status_code == 503
+    service.shutdown()
+
+
+def test_timed_out_job_keeps_its_slot_until_it_finishes():
+    service = ComputeService(workers=1, queue_depth=0)
+    release = threading.Event()
+    finished = threading.Event()
+
+    def job():
+        release.wait()
+        finished.set()
+
+    async def scenario():
+        with pytest.raises(HTTPException) as timed_out:
+            await service.run_with_timeout("parse", 0.05, job)
+        with pytest.raises(HTTPException) as rejected:
+            await service.run("graph", lambda: None)
+        release.set()
+        await asyncio.get_running_loop().run_in_executor(None, finished.wait)
+        await asyncio.sleep(0.05)
+        return timed_out.value, rejected.value, await service.run("graph", lambda: "free again")
+
+    timed_out, rejected, result = asyncio.run(scenario())
+    assert (timed_out.status_code, rejected.status_code, result) == (504, 503, "free again")
+    service.shutdown()
+
+
+def test_parse_timeout_grows_with_the_upload():
+    assert parse_timeout(0) == STAGE_TIMEOUTS["parse"]
+    assert parse_timeout(512 * 1024 * 1024) > parse_timeout(1024 * 1024) > STAGE_TIMEOUTS["parse"]
@@ -0,0 +1,59 @@
+import networkx as nx
+import pytest
+
+from graph_builder import build_graph_from_txt
+from metrics.csr_graph import CSRGraph
+
+
+def graphs():
+    G = nx.disjoint_union(nx.gnm_random_graph(40, 120, seed=3), nx.path_graph(4))
+    G.add_edge(5, 5)
+    D = nx.gnm_random_graph(40, 150, seed=4, directed=True)
+    D.add_node(99)
+    for H in (G, D):
+        for i, (u, v) in enumerate(H.edges()):
+            H[u][v]["weight"] = 1 + i % 3
+    return [G, D]
+
+
+def csr(G):
+    return CSRGraph.from_edges(G, G.edges(data="weight"), G.is_directed())
+
+
+@pytest.mark.parametrize("G", graphs())
+def test_csr_graph_matches_networkx(G):
+    C = csr(G)
+    assert list(C) == list(G)
+    assert (C.number_of_nodes(), C.number_of_edges()) == (G.number_of_nodes(), G.number_of_edges())
+    assert sorted(C.edges(data="weight")) == sorted(G.edges(data="weight"))
+    assert C.degree() == dict(G.degree())
+    assert C.degree_centrality() == pytest.approx(nx.degree_centrality(G))
+    assert C.closeness() == pytest.approx(nx.closeness_centrality(G))
+
+    components = nx.weakly_connected_components(G) if G.is_directed() else nx.connected_components(G)
+    assert sorted(map(sorted, C.connected_components())) == sorted(map(sorted, components))
+    assert not C.is_connected()
+    assert nx.utils.graphs_equal(C.to_networkx(), G)
+
+
+def test_repeated_edges_keep_the_last_weight():
+    C = CSRGraph.from_edges("abc", [("a", "b", 1), ("b", "a", 5), ("b", "c", 2)])
+    assert sorted(C.edges(data="weight")) == [("a", "b", 5.0), ("b", "c", 2.0)]
+
+
+@pytest.mark.parametrize("directed", [False, True])
+def test_backends_build_the_same_response(write_export, directed):
+    path = write_export(600)
+    expected = build_graph_from_txt(path, directed=directed)
+    result = build_graph_from_txt(path, directed=directed, graph_backend="csr")
+
+    assert result["links"] == expected["links"]
+    assert result["is_connected"] == expected["is_connected"]
+    assert sorted(result["nodes"], key=lambda node: node["id"]) == pytest.approx(
+        sorted(expected["nodes"], key=lambda node: node["id"]), abs=2e-4
+    )
+
+
+def test_unknown_backend_is_rejected(write_export):
+    with pytest.raises(ValueError, match="Unknown graph backend"):
+        build_graph_from_txt(write_export(10), graph_backend="igraph")
@@ -0,0 +1,69 @@
+import networkx as nx
+import numpy as np
+import pytest
+from community import community_louvain
+
+from metrics.csr_graph import CSRGraph
+from metrics.fast_communities import adjacency_arrays, label_propagation, labels_modularity, leiden
+
+
+def weighted(G):
+    for i, (u, v) in enumerate(G.edges()):
+        G[u][v]["weight"] = 1 + i % 3
+    return G
+
+
+GRAPHS = [
+    weighted(nx.planted_partition_graph(4, 40, 0.25, 0.01, seed=3)),
+    weighted(nx.karate_club_graph()),
+    weighted(nx.disjoint_union(nx.les_miserables_graph(), nx.path_graph(3))),
+]
+
+
+def csr(G):
+    return CSRGraph.from_edges(G, G.edges(data="weight"), directed=False)
+
+
+def modularity(G, node_communities):
+    return nx.community.modularity(G, partition_sets(node_communities), weight="weight")
+
+
+def partition_sets(node_communities):
+    communities = {}
+    for node, cid in node_communities.items():
+        communities.setdefault(cid, set()).add(node)
+    return list(communities.values())
+
+
+@pytest.mark.parametrize("G", GRAPHS)
+def test_leiden_finds_connected_communities_as_good_as_louvain(G):
+    communities, node_communities = leiden(G, seed=1)
+    assert set(node_communities) == set(G)
+    assert sum(len(nodes) for nodes in communities.values()) == len(G)
+    assert all(nx.is_connected(G.subgraph(nodes)) for nodes in communities.values())
+
+    louvain = community_louvain.best_partition(G, random_state=1)
+    assert modularity(G, node_communities) >= modularity(G, louvain) - 0.02
+
+
+@pytest.mark.parametrize("G", GRAPHS)
+def test_label_propagation_labels_are_valid(G):
+    communities, node_communities = label_propagation(G, seed=1)
+    assert set(node_communities) == set(G)
+    assert all(nx.is_connected(G.subgraph(nodes)) for nodes in communities.values())
+    assert label_propagation(G, seed=1) == (communities, node_communities)
+
+
+@pytest.mark.parametrize("algorithm", [leiden, label_propagation])
+@pytest.mark.parametrize("G", GRAPHS)
+def test_csr_backend_gives_the_same_partition(algorithm, G):
+    assert algorithm(csr(G), seed=5) == algorithm(G, seed=5)
+
+
+@pytest.mark.parametrize("G", GRAPHS)
+def test_labels_modularity_matches_networkx(G):
+    node_communities = community_louvain.best_partition(G, random_state=0)
+    nodes, B = adjacency_arrays(G)
+    labels = np.array([node_communities[node] for node in nodes])
+    assert labels_modularity(B, labels) == pytest.approx(modularity(G, node_communities))
+    assert labels_modularity(adjacency_arrays(nx.empty_graph(3))[1], np.arange(3)) is None
@@ -0,0 +1,54 @@
+from datetime import datetime
+
+import pytest
+
+from ingestion.artifact import build_artifact
+from ingestion.filter_plan import FilterPlan
+from ingestion.parsing import to_epoch
+
+FILTERS = [
+    {},
+    {"start_dt": datetime(2023, 1, 20), "end_dt": datetime(2023, 2, 10)},
+    {"username": " user 3 "},
+    {"username": "nobody"},
+    {"min_length": "10", "max_length": 30},
+    {"min_length": 30, "max_length": 10},
+    {"keywords": "plan, שלום"},
+    {"start_dt": datetime(2023, 1, 10), "username": "Мария", "min_length": 5, "keywords": "ok,lol"},
+]
+
+
+def naive_rows(artifact, filters):
+    start = to_epoch(filters["start_dt"]) if filters.get("start_dt") else None
+    end = to_epoch(filters["end_dt"]) if filters.get("end_dt") else None
+    username = (filters.get("username") or "").strip().lower()
+    min_len, max_len = filters.get("min_length"), filters.get("max_length")
+    keywords = [k.strip().lower() for k in filters["keywords"].split(",")] if filters.get("keywords") else None
+
+    rows = []
+    for i in range(len(artifact)):
+        text = artifact.text(i)
+        if start is not None and artifact.timestamps[i] < start or end is not None and artifact.timestamps[i] > end:
+            continue
+        if username and artifact.users[artifact.user_ids[i]].lower() != username:
+            continue
+        if min_len is not None and len(text) < int(min_len) or max_len is not None and len(text) > int(max_len):
+            continue
+        if keywords and not any(k in text.lower() for k in keywords):
+            continue
+        rows.append(i)
+    return rows
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+def test_filter_plan_matches_row_by_row_filtering(write_export, filters):
+    artifact = build_artifact(write_export(800))
+    plan = FilterPlan(artifact, filters)
+    assert plan.select_rows(plan.rows).tolist() == naive_rows(artifact, filters)
+
+
+def test_cheapest_predicates_run_first(write_export):
+    artifact = build_artifact(write_export(800))
+    plan = FilterPlan(artifact, {"username": "User 3", "min_length": 1, "keywords": "ok"})
+    assert [p.name for p in plan.predicates] == ["username", "length"]
+    assert plan.describe()[0] == "date window" and plan.describe()[-1] == "keywords"
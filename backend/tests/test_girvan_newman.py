@@ -0,0 +1,47 @@
+import itertools
+
+import networkx as nx
+import pytest
+from networkx.algorithms import community as nx_community
+
+from metrics import girvan_newman as girvan_newman_module
+from metrics.girvan_newman import girvan_newman, girvan_newman_dendrogram
+from metrics.memo import ResultMemo
+
+
+def parts(communities):
+    return {frozenset(nodes) for nodes in communities}
+
+
+@pytest.fixture(autouse=True)
+def fresh_memo(monkeypatch):
+    memo = ResultMemo()
+    monkeypatch.setattr(girvan_newman_module, "RESULT_MEMO", memo)
+    return memo
+
+
+@pytest.mark.parametrize("G", [nx.karate_club_graph(), nx.les_miserables_graph(), nx.davis_southern_women_graph()])
+def test_exact_splits_match_networkx(G):
+    G = nx.Graph(G.edges())
+    levels = list(itertools.islice(nx_community.girvan_newman(G), 4))
+    assert parts(girvan_newman(G)[0].values()) == parts(levels[0])
+    for level in levels:
+        communities, node_communities = girvan_newman(G, len(level))
+        assert parts(communities.values()) == parts(level)
+        assert all(node in communities[cid] for node, cid in node_communities.items())
+
+
+def test_more_communities_resume_the_cached_dendrogram(fresh_memo):
+    G = nx.karate_club_graph()
+    assert len(girvan_newman(G, 2)[0]) == 2
+    assert len(girvan_newman(G, 5)[0]) == 5
+    assert len(girvan_newman(G, 3)[0]) == 3
+    assert girvan_newman_dendrogram(G) is girvan_newman_dendrogram(nx.Graph(G))
+    assert fresh_memo.stats()["kinds"]["dendrogram"]["misses"] == 1
+
+
+def test_sampled_pivots_split_planted_communities():
+    G = nx.planted_partition_graph(3, 60, 0.3, 0.005, seed=2)
+    communities, _ = girvan_newman(G, 3)
+    planted = parts(G.graph["partition"])
+    assert parts(communities.values()) == planted
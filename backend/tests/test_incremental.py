@@ -0,0 +1,42 @@
+import os
+
+import numpy as np
+import pytest
+
+from ingestion.artifact import COLUMNS, build_artifact, load_artifact
+from ingestion.incremental import extend_artifact, shares_prefix
+
+
+@pytest.mark.parametrize("fraction, complete_line", [(0.5, True), (0.5, False), (0.9, False), (0.999, True)])
+def test_extension_matches_a_fresh_build(write_export, tmp_path, fraction, complete_line):
+    fresh_path = write_export(600, name="fresh.txt")
+    with open(fresh_path, "rb") as f:
+        data = f.read()
+    cut = data.rfind(b"\n", 0, int(len(data) * fraction)) + 1
+    head = data[:cut] if complete_line else data[:cut - 1]
+
+    path = str(tmp_path / "chat.txt")
+    with open(path, "wb") as f:
+        f.write(head)
+    previous = build_artifact(path)
+    reader = load_artifact(path)
+    assert shares_prefix(previous.meta, data)
+    assert not shares_prefix(previous.meta, b"x" + data)
+
+    with open(path, "wb") as f:
+        f.write(data)
+    extended = extend_artifact(path, "whatsapp", previous)
+    fresh = build_artifact(fresh_path)
+
+    for name in COLUMNS:
+        assert np.array_equal(getattr(extended, name), getattr(fresh, name)), name
+    assert extended.users == fresh.users
+    assert [extended.text(i) for i in range(len(fresh))] == [fresh.text(i) for i in range(len(fresh))]
+    assert extended.meta["prefix_hashes"] == fresh.meta["prefix_hashes"]
+    for name in ("user_counts", "pair_users", "pair_previous", "pair_counts", "pair_first_rows"):
+        assert np.array_equal(getattr(extended.summary, name), getattr(fresh.summary, name)), name
+
+    assert load_artifact(path) is not None
+    # Another reader's mapping of the old files stays readable after the swap.
+    assert reader.text(0) == fresh.text(0)
+    assert not [name for name in os.listdir(os.path.dirname(extended.path)) if ".tmp-" in name or ".old-" in name]
@@ -0,0 +1,30 @@
+import random
+
+import pytest
+
+from ingestion.matcher import MultiPatternMatcher
+from ingestion.parsing import is_system_message
+from utils import MEDIA_RE, spam_messages
+
+KEYWORDS = ["plan", "Plan B", "meet", "meeting", "שלום", "מה", "a", "ab", "abc", "?", "(x)"]
+
+
+def texts(count=400, seed=3):
+    rnd = random.Random(seed)
+    alphabet = list("abcxyz ()?.") + ["plan", "Meet", "שלום", "מה קורה", "image omitted", "GIF ", "הושמט"]
+    samples = ["".join(rnd.choice(alphabet) for _ in range(rnd.randint(0, 12))) for _ in range(count)]
+    return samples + spam_messages + [f"x {spam} y" for spam in spam_messages]
+
+
+def test_system_messages_match_the_substring_and_regex_baseline():
+    for text in texts():
+        expected = any(spam in text for spam in spam_messages) or MEDIA_RE.search(text) is not None
+        assert is_system_message(text) == expected, text
+
+
+@pytest.mark.parametrize("keywords", [KEYWORDS, KEYWORDS[:3], ["ab", "a"], [""], []])
+def test_keyword_matcher_matches_the_lowercase_baseline(keywords):
+    matcher = MultiPatternMatcher(keywords, lowercase=True)
+    lowered = [k.lower() for k in keywords]
+    for text in texts():
+        assert matcher.search(text) == any(k in text.lower() for k in lowered), text
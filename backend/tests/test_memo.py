@@ -0,0 +1,47 @@
+import networkx as nx
+
+from metrics import centrality
+from metrics.csr_graph import CSRGraph
+from metrics.memo import ResultMemo, graph_fingerprint
+
+
+def test_fingerprint_ignores_construction_order():
+    G = nx.Graph()
+    G.add_weighted_edges_from([("a", "b", 2), ("b", "c", 1)])
+    H = nx.Graph()
+    H.add_nodes_from(["c", "b", "a"])
+    H.add_weighted_edges_from([("c", "b", 1.0), ("b", "a", 2.0)])
+    assert graph_fingerprint(G) == graph_fingerprint(H)
+    assert graph_fingerprint(G) == graph_fingerprint(CSRGraph.from_edges(["a", "b", "c"], [("a", "b", 2), ("b", "c", 1)]))
+
+    H["a"]["b"]["weight"] = 3
+    assert graph_fingerprint(G) != graph_fingerprint(H)
+    assert graph_fingerprint(G) != graph_fingerprint(G.to_directed())
+
+
+def test_memo_counts_hits_and_evicts_by_size():
+    memo = ResultMemo(max_entries=3, max_values=10)
+    assert memo.get("centrality", ("a",)) is None
+    memo.put("centrality", ("a",), {"x": 1}, 4)
+    memo.put("centrality", ("b",), {"x": 2}, 4)
+    assert memo.get("centrality", ("a",)) == {"x": 1}
+    memo.put("partition", ("c",), {}, 4)
+
+    assert memo.get("centrality", ("b",)) is None
+    assert memo.stats() == {
+        "entries": 2, "values": 8,
+        "kinds": {"centrality": {"hits": 1, "misses": 2, "hit_rate": 0.3333}},
+    }
+    memo.put("partition", ("huge",), {}, 11)
+    assert memo.get("partition", ("huge",)) is None
+
+
+def test_identical_graphs_reuse_centralities(monkeypatch):
+    memo = ResultMemo()
+    monkeypatch.setattr(centrality, "RESULT_MEMO", memo)
+    G = nx.karate_club_graph()
+    first = centrality.compute_centralities(G)[0]
+    again = centrality.compute_centralities(nx.relabel_nodes(G, {}, copy=True))[0]
+
+    assert again == first
+    assert memo.stats()["kinds"]["centrality"] == {"hits": 5, "misses": 5, "hit_rate": 0.5}
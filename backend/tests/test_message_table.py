@@ -0,0 +1,70 @@
+import random
+from collections import defaultdict, deque
+
+import pytest
+
+from ingestion.message_table import MessageTable
+
+USERS = ["dana", "Avi", "bob", "Мария", "carol"]
+
+
+def messages(count=500, threaded=False, seed=2):
+    rnd = random.Random(seed)
+    rows = []
+    for i in range(count):
+        user = rnd.choice(USERS)
+        if threaded:
+            rows.append((user, f"text {i}", rnd.choice(USERS + [None, None])))
+        else:
+            rows.append((user, f"text {i}"))
+    return rows
+
+
+def baseline_weights(sequence, n_prev, message_weights):
+    """The per-message loop utils.calculate_sequential_weights ran before the table."""
+    window = deque(maxlen=n_prev)
+    edge_weights = defaultdict(float)
+    for current_sender, *_ in sequence:
+        for idx, previous_sender in enumerate(reversed(window)):
+            if previous_sender != current_sender:
+                edge_weights[(current_sender, previous_sender)] += message_weights[idx]
+        window.append(current_sender)
+    return dict(edge_weights)
+
+
+def baseline_edges(sequence, directed):
+    """The sequential edge loop graph_builder ran before the table."""
+    edges = defaultdict(int)
+    previous_user = None
+    for msg in sequence:
+        user, reply_to = msg[0], msg[2] if len(msg) == 3 else None
+        if reply_to and reply_to != user:
+            edges[(user, reply_to) if directed else tuple(sorted([user, reply_to]))] += 1
+        elif previous_user and previous_user != user:
+            edges[(user, previous_user) if directed else tuple(sorted([user, previous_user]))] += 1
+        previous_user = user
+    return dict(edges)
+
+
+@pytest.mark.parametrize("n_prev, message_weights", [(1, [1.0]), (3, [1.0, 0.5, 0.25]), (5, [0.9, 0.7, 0.5])])
+def test_sequential_weights_match_the_loop(n_prev, message_weights):
+    sequence = messages()
+    weights = MessageTable.from_messages(sequence).sequential_weights(n_prev, message_weights)
+    expected = baseline_weights(sequence, min(n_prev, len(message_weights)), message_weights)
+    assert list(weights) == list(expected)
+    assert list(weights.values()) == pytest.approx(list(expected.values()))
+
+
+@pytest.mark.parametrize("threaded", [False, True])
+@pytest.mark.parametrize("directed", [False, True])
+def test_sequential_edges_match_the_loop(threaded, directed):
+    sequence = messages(threaded=threaded)
+    edges = MessageTable.from_messages(sequence).sequential_edges(directed)
+    assert list(edges.items()) == list(baseline_edges(sequence, directed).items())
+
+
+def test_counts_messages_and_anonymizes_in_first_seen_order():
+    table = MessageTable.from_messages([("b", "x"), ("a", "y"), ("b", "z")])
+    assert table.message_counts() == {"b": 2, "a": 1}
+    assert list(table.message_counts()) == ["b", "a"]
+    assert table.anonymized().messages() == [("User_1", "x"), ("User_2", "y"), ("User_1", "z")]
@@ -0,0 +1,36 @@
+import pytest
+
+import graph_builder
+from graph_builder import build_graph_from_txt, compute_graph_metric
+from metrics.centrality import CENTRALITY_METRICS, parse_metrics
+from metrics.graph_cache import GraphCache
+
+
+def test_parse_metrics():
+    assert parse_metrics() == CENTRALITY_METRICS
+    assert parse_metrics(" PageRank,degree,,degree") == ("degree", "pagerank")
+    assert parse_metrics("") == ()
+    with pytest.raises(ValueError, match="harmonic"):
+        parse_metrics(["degree", "harmonic"])
+
+
+def test_only_requested_metrics_are_computed(write_export):
+    graph_data = build_graph_from_txt(write_export(400), metrics="degree,pagerank")
+    assert set(graph_data["plan"]["metrics"]) == {"degree", "pagerank"}
+    for node in graph_data["nodes"]:
+        assert set(node) >= {"degree", "pagerank"}
+        assert not set(node) & {"betweenness", "closeness", "eigenvector"}
+
+
+@pytest.mark.parametrize("evict", [False, True])
+def test_lazy_metric_matches_a_full_build(write_export, monkeypatch, evict):
+    path = write_export(400)
+    full = {node["id"]: node for node in build_graph_from_txt(path, directed=True)["nodes"]}
+    build_graph_from_txt(path, directed=True, metrics="degree")
+
+    for name in ("betweenness", "closeness"):
+        if evict:
+            monkeypatch.setattr(graph_builder, "GRAPH_CACHE", GraphCache())
+        response = compute_graph_metric(path, name, directed=True)
+        assert response["cached_graph"] is not evict
+        assert response["values"] == {node: values[name] for node, values in full.items()}
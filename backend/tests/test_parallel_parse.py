@@ -0,0 +1,41 @@
+import shutil
+
+import pytest
+
+from ingestion import artifact as artifact_module
+from ingestion.artifact import build_artifact, default_parse_workers
+from process_pool import PROCESS_POOL
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    monkeypatch.setattr(artifact_module, "PARALLEL_MIN_BYTES", 1)
+    monkeypatch.setattr(artifact_module, "PARALLEL_CHUNK_BYTES", 1024)
+    yield
+    PROCESS_POOL.shutdown()
+
+
+def columns(artifact):
+    return [
+        (artifact.users[artifact.user_ids[i]], artifact.text(i), int(artifact.timestamps[i]), int(artifact.lengths[i]))
+        for i in range(len(artifact))
+    ]
+
+
+def test_parallel_parse_matches_serial_parse(write_export, tmp_path, small_chunks):
+    path = write_export(800)
+    serial_path = str(tmp_path / "serial" / "chat.txt")
+    (tmp_path / "serial").mkdir()
+    shutil.copy2(path, serial_path)
+
+    assert default_parse_workers(path, 3) == 3
+    parallel = build_artifact(path, workers=3)
+    serial = build_artifact(serial_path, workers=1)
+
+    assert columns(parallel) == columns(serial)
+    assert parallel.users == serial.users
+    assert list(parallel.text_offsets) == list(serial.text_offsets)
+
+
+def test_small_files_parse_inline(write_export):
+    assert default_parse_workers(write_export(50), 8) == 1
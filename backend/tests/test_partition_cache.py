@@ -0,0 +1,62 @@
+import networkx as nx
+import pytest
+
+from metrics import communities as communities_module
+from metrics.communities import COMMUNITY_ALGORITHMS, COMMUNITY_SEED, detect_partition, partition_settings
+from metrics.memo import ResultMemo
+
+
+@pytest.fixture(autouse=True)
+def memo(monkeypatch):
+    memo = ResultMemo()
+    monkeypatch.setattr(communities_module, "RESULT_MEMO", memo)
+    return memo
+
+
+def graph():
+    G = nx.planted_partition_graph(5, 30, 0.3, 0.02, seed=9)
+    for i, (u, v) in enumerate(G.edges()):
+        G[u][v]["weight"] = 1 + i % 2
+    return G
+
+
+@pytest.mark.parametrize("algorithm", COMMUNITY_ALGORITHMS)
+def test_seeded_runs_repeat_from_the_cache(algorithm, monkeypatch):
+    G = graph()
+    first = detect_partition(G, algorithm, seed=7)
+    monkeypatch.setattr(communities_module, "RESULT_MEMO", ResultMemo())
+    recomputed = detect_partition(G, algorithm, seed=7)
+    cached = detect_partition(nx.Graph(G), algorithm, seed=7)
+
+    assert recomputed[:2] == first[:2] and cached[:2] == first[:2]
+    assert (first[2], recomputed[2], cached[2]) == (False, False, True)
+
+
+def test_default_seed_shares_the_cache_entry(memo):
+    G = graph()
+    detect_partition(G, "louvain")
+    assert detect_partition(G, "louvain", seed=COMMUNITY_SEED)[2]
+    assert not detect_partition(G, "louvain", seed=COMMUNITY_SEED + 1)[2]
+    assert not detect_partition(G, "louvain", resolution=2.0)[2]
+    assert memo.stats()["kinds"]["partition"] == {"hits": 1, "misses": 3, "hit_rate": 0.25}
+
+
+def test_settings_only_key_what_changes_the_result():
+    assert partition_settings("greedy_modularity", 3, 5, 0.5) == {"num_communities": None, "seed": None, "resolution": 0.5}
+    assert partition_settings("girvan_newman", 3) == {"num_communities": 3, "seed": COMMUNITY_SEED, "resolution": None}
+    assert partition_settings("label_propagation", resolution=2) == {"num_communities": None, "seed": COMMUNITY_SEED,
+                                                                      "resolution": None}
+
+
+def test_cached_results_are_copies():
+    G = graph()
+    communities, node_communities, _ = detect_partition(G, "louvain")
+    communities[0].append("intruder")
+    node_communities["intruder"] = 0
+    again, again_nodes, hit = detect_partition(G, "louvain")
+    assert hit and "intruder" not in again[0] and "intruder" not in again_nodes
+
+
+def test_unknown_algorithm():
+    with pytest.raises(ValueError, match="Unknown algorithm"):
+        detect_partition(graph(), "spectral")
@@ -0,0 +1,58 @@
+import asyncio
+import json
+import os
+
+import pytest
+
+from graph_builder import build_graph_from_txt
+from metrics.planner import PARTITION_FALLBACKS, PLANNER_HEADROOM, plan_centralities, plan_partition
+
+
+def test_spent_deadline_skips_sampled_metrics(write_export):
+    graph_data = build_graph_from_txt(write_export(400), deadline_ms=1)
+
+    methods = {name: step["method"] for name, step in graph_data["plan"]["metrics"].items()}
+    assert graph_data["plan"]["deadline_ms"] == 1
+    assert methods["betweenness"] == "skipped"
+    assert methods["closeness"] == "skipped"
+    assert methods["degree"] == "exact"
+    assert all(node["betweenness"] is None for node in graph_data["nodes"])
+
+
+def test_no_deadline_keeps_requested_methods():
+    plan = plan_centralities(("degree", "betweenness", "closeness"), 500, 2000, approximate=True, samples=50)
+    assert plan["degree"]["method"] == "exact"
+    assert (plan["betweenness"]["method"], plan["betweenness"]["samples"]) == ("approximate", 50)
+
+
+def test_deadline_samples_before_skipping():
+    n, m = 20000, 100000
+    plan = plan_centralities(("betweenness", "closeness"), n, m, deadline_ms=20000)
+    assert plan["betweenness"]["method"] == "approximate"
+    assert 10 <= plan["betweenness"]["samples"] < n
+    assert plan["closeness"]["method"] in ("exact", "approximate")
+    assert plan_centralities(("betweenness",), n, m, deadline_ms=0)["betweenness"]["method"] == "skipped"
+
+
+def test_analyze_response_carries_plan(write_export, monkeypatch):
+    pytest.importorskip("fastapi")
+    from analyzers import whatsapp_analyzer
+
+    path = write_export(400)
+    monkeypatch.setattr(whatsapp_analyzer, "UPLOAD_FOLDER", os.path.dirname(path))
+    response = asyncio.run(whatsapp_analyzer.WhatsAppAnalyzer().analyze(os.path.basename(path), deadline_ms=1))
+
+    plan = json.loads(response.body)["plan"]
+    assert plan["metrics"]["betweenness"]["method"] == "skipped"
+    assert plan["metrics"]["closeness"]["method"] == "skipped"
+
+
+def test_partition_falls_back_to_cheaper_algorithms():
+    assert plan_partition("girvan_newman", 5000, 40000)["algorithm"] == "girvan_newman"
+
+    plan = plan_partition("girvan_newman", 5000, 40000, deadline_ms=500)
+    assert plan["fallback"] and plan["requested"] == "girvan_newman"
+    assert PARTITION_FALLBACKS.index(plan["algorithm"]) > PARTITION_FALLBACKS.index("greedy_modularity")
+    assert plan["estimate_ms"] <= 500 * PLANNER_HEADROOM
+
+    assert plan_partition("leiden", 10 ** 7, 10 ** 8, deadline_ms=1)["algorithm"] == "label_propagation"
@@ -0,0 +1,50 @@
+import random
+from collections import Counter
+
+import pytest
+
+from graph_builder import build_graph_from_txt
+from ingestion.sampling import allocate, reservoir_sample, sample_messages, stratified_sample
+
+
+@pytest.mark.parametrize("stratum", [None, lambda item: item % 7])
+def test_seeded_samples_are_reproducible_and_in_stream_order(stratum):
+    first = sample_messages(iter(range(10000)), 50, seed=11, stratum=stratum)
+    assert first == sample_messages(iter(range(10000)), 50, seed=11, stratum=stratum)
+    assert first != sample_messages(iter(range(10000)), 50, seed=12, stratum=stratum)
+    assert len(first) == 50 and first == sorted(set(first))
+
+
+def test_short_streams_are_kept_whole():
+    assert reservoir_sample(range(5), 10, random.Random(0)) == [0, 1, 2, 3, 4]
+    assert stratified_sample(range(5), 10, random.Random(0), lambda item: item % 2) == [0, 1, 2, 3, 4]
+
+
+def test_reservoir_sample_is_uniform():
+    n, k, runs = 40, 10, 4000
+    hits = Counter(item for seed in range(runs) for item in reservoir_sample(range(n), k, random.Random(seed)))
+    expected = runs * k / n
+    assert all(abs(hits[item] - expected) < 0.15 * expected for item in range(n))
+
+
+def test_allocation_is_proportional_and_sums_to_k():
+    quotas = allocate({"a": 50, "b": 30, "c": 15, "d": 5}, 10)
+    assert quotas == {"a": 5, "b": 3, "c": 2, "d": 0}
+    assert allocate({"a": 2, "b": 1}, 10) == {"a": 2, "b": 1}
+
+
+def test_stratified_sample_follows_the_allocation():
+    items = list(range(3000))
+    stratum = lambda item: "small" if item % 10 == 0 else "large"
+    sample = stratified_sample(items, 100, random.Random(3), stratum)
+    assert Counter(map(stratum, sample)) == allocate(Counter(map(stratum, items)), 100)
+
+
+@pytest.mark.parametrize("limit_type", ["random", "random_per_user", "random_by_time"])
+def test_graph_sample_is_reproducible_from_its_seed(write_export, limit_type):
+    path = write_export(600)
+    first = build_graph_from_txt(path, limit=100, limit_type=limit_type, metrics="")
+    again = build_graph_from_txt(path, limit=100, limit_type=limit_type, sample_seed=first["sample_seed"], metrics="")
+    assert first["sample_seed"] is not None
+    assert again["links"] == first["links"]
+    assert sum(node["messages"] for node in first["nodes"]) == 100
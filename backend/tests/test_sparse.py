@@ -0,0 +1,45 @@
+import networkx as nx
+import pytest
+
+from metrics.sparse import SparseGraph, eigenvector, pagerank
+
+
+def weighted(G, seed=0):
+    for i, (u, v) in enumerate(G.edges()):
+        G[u][v]["weight"] = 1 + (i * 7 + seed) % 5
+    return G
+
+
+GRAPHS = {
+    "undirected": weighted(nx.gnm_random_graph(80, 300, seed=1)),
+    "directed": weighted(nx.gnm_random_graph(80, 400, seed=2, directed=True)),
+    "dangling": weighted(nx.DiGraph([(0, 1), (1, 2), (2, 0), (2, 3), (4, 3)])),
+    "karate": weighted(nx.karate_club_graph()),
+}
+
+
+@pytest.mark.parametrize("name", list(GRAPHS))
+def test_pagerank_matches_networkx(name):
+    G = GRAPHS[name]
+    result = pagerank(SparseGraph.from_graph(G))
+    assert result.values == pytest.approx(nx.pagerank(G), abs=1e-6)
+    assert result.iterations == len(result.residuals)
+
+
+@pytest.mark.parametrize("name", ["undirected", "directed", "karate"])
+def test_eigenvector_matches_networkx(name):
+    G = GRAPHS[name]
+    assert eigenvector(SparseGraph.from_graph(G)).values == pytest.approx(nx.eigenvector_centrality(G), abs=1e-6)
+
+
+def test_subgraph_keeps_weights():
+    graph = SparseGraph.from_graph(GRAPHS["karate"])
+    nodes = [0, 1, 2, 33]
+    sub = graph.subgraph(nodes)
+    assert sub.nodes == nodes
+    assert (sub.weights.toarray() == nx.to_numpy_array(GRAPHS["karate"].subgraph(nodes), nodelist=nodes)).all()
+
+
+def test_unconverged_iteration_raises():
+    with pytest.raises(nx.PowerIterationFailedConvergence):
+        pagerank(SparseGraph.from_graph(GRAPHS["directed"]), max_iter=2)
@@ -0,0 +1,35 @@
+import pytest
+
+from ingestion.stream import iter_blocks, iter_lines, limit_messages, split_line_ranges
+
+
+@pytest.fixture
+def text_file(tmp_path):
+    path = tmp_path / "lines.txt"
+    path.write_bytes("first\r\nשלום עולם\n\nlast line without newline".encode("utf-8"))
+    return str(path)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 5, 1 << 20])
+def test_iter_lines_is_independent_of_chunk_size(text_file, chunk_size):
+    assert list(iter_lines(text_file, chunk_size=chunk_size)) == ["first", "שלום עולם", "", "last line without newline"]
+
+
+@pytest.mark.parametrize("parts", [1, 2, 3, 7, 50])
+def test_line_ranges_cover_every_line_once(write_export, parts):
+    path = write_export(200)
+    expected = list(iter_lines(path))
+
+    ranges = split_line_ranges(path, parts)
+    assert ranges[0][0] == 0 and all(a[1] == b[0] for a, b in zip(ranges, ranges[1:]))
+    assert [line for start, end in ranges for line in iter_lines(path, start, end, chunk_size=64)] == expected
+
+
+def test_limit_messages_keeps_the_first_or_last_rows():
+    assert list(limit_messages(iter(range(10)), 3)) == [0, 1, 2]
+    assert list(limit_messages(iter(range(10)), "3", "last")) == [7, 8, 9]
+    assert list(limit_messages(iter(range(10)), None)) == list(range(10))
+
+
+def test_iter_blocks():
+    assert list(iter_blocks(5, 17, 5)) == [(5, 10), (10, 15), (15, 17)]
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from ingestion.timestamp_index import TimestampIndex
+
+WINDOWS = [(None, None), (None, 50), (50, None), (20, 60), (60, 20), (-5, 0), (101, 200), (37, 37)]
+
+
+def brute_force(timestamps, start_ts, end_ts):
+    return [
+        i for i, ts in enumerate(timestamps)
+        if (start_ts is None or ts >= start_ts) and (end_ts is None or ts <= end_ts)
+    ]
+
+
+def rows(selection, count):
+    return list(range(count))[selection] if isinstance(selection, slice) else selection.tolist()
+
+
+@pytest.mark.parametrize("chronological", [True, False])
+def test_rows_between_matches_a_scan(chronological):
+    timestamps = np.random.default_rng(5).integers(0, 100, 500)
+    if chronological:
+        timestamps.sort()
+    index = TimestampIndex.build(timestamps)
+    assert index.is_chronological == chronological
+
+    for start_ts, end_ts in WINDOWS:
+        assert rows(index.rows_between(start_ts, end_ts), len(timestamps)) == brute_force(timestamps, start_ts, end_ts)
+
+
+def test_saved_order_round_trips(tmp_path):
+    timestamps = np.array([5, 3, 9, 3, 1])
+    TimestampIndex.build(timestamps).save(str(tmp_path))
+    loaded = TimestampIndex.load(str(tmp_path), timestamps)
+    assert rows(loaded.rows_between(3, 5), 5) == [0, 1, 3]
+
+
+def test_extend_only_rebuilds_out_of_order_tails():
+    previous = TimestampIndex.build(np.array([1, 2, 3]))
+    assert TimestampIndex.extend(previous, np.array([1, 2, 3, 3, 8])).is_chronological
+
+    extended = TimestampIndex.extend(previous, np.array([1, 2, 3, 0, 8]))
+    assert not extended.is_chronological
+    assert rows(extended.rows_between(0, 2), 5) == [0, 1, 3]
@@ -0,0 +1,42 @@
+from datetime import datetime
+
+import pytest
+
+from ingestion.parsing import to_epoch
+from ingestion.whatsapp_parser import WhatsAppDialect, WhatsAppParser, detect_dialect, sniff_dialect
+
+MOMENTS = [datetime(2023, 1, 3, 9, 5, 7), datetime(2023, 2, 14, 18, 30, 0), datetime(2023, 11, 25, 0, 1, 59)]
+
+
+@pytest.mark.parametrize("line_format, name, seconds", [
+    ("[{t:%d/%m/%Y, %H:%M:%S}] {user}: {text}", "bracket_dmy", True),
+    ("[{t.day}.{t.month}.{t.year}, {t:%H:%M:%S}] ‎{user}: {text}", "bracket_dmy", True),
+    ("{t.month}/{t.day}/{t:%y, %H:%M} - {user}: {text}", "dash_mdy", False),
+    ("{t:%d/%m/%Y, %H:%M} - {user}: {text}", "dash_dmy", False),
+])
+def test_detects_dialect_and_parses_lines(line_format, name, seconds):
+    lines = [line_format.format(t=t, user=f"User {i}", text=f"message {i}") for i, t in enumerate(MOMENTS)]
+    dialect = detect_dialect(lines)
+    assert dialect.name == name
+
+    parser = WhatsAppParser(dialect)
+    for i, (line, t) in enumerate(zip(lines, MOMENTS)):
+        expected = t if seconds else t.replace(second=0)
+        assert parser.parse(line) == (f"User {i}", f"message {i}", to_epoch(expected))
+
+
+def test_ambiguous_dates_keep_the_format_order_default():
+    assert detect_dialect(["[03/01/2023, 09:09:00] A: hi"]).day_first
+    assert not detect_dialect(["1/3/23, 09:09 - A: hi"]).day_first
+
+
+def test_parser_reads_stray_lines_of_another_layout():
+    parser = WhatsAppParser(WhatsAppDialect.from_name("bracket_dmy"))
+    assert parser.parse("03/01/2023, 09:09 - ~ Dana: hi") == ("Dana", "hi", to_epoch(datetime(2023, 1, 3, 9, 9)))
+    assert parser.parse("continuation line without header") is None
+    assert parser.parse("[31/02/2023, 09:09:00] A: impossible date")[2] is None
+
+
+def test_sniff_reads_the_file_sample(write_export):
+    assert sniff_dialect(write_export(100, dialect="android")).name == "dash_mdy"
+    assert sniff_dialect(write_export(100, dialect="ios_dots", name="dots.txt")).name == "bracket_dmy"
@@ -1,9 +1,11 @@
 from typing import List, Tuple, Any, Dict, TypedDict, Dict, List, DefaultDict
 from datetime import datetime
-from collections import defaultdict, deque
+from collections import defaultdict
 import re
 import logging
 
+from ingestion.message_table import MessageTable
+
 logger = logging.getLogger(__name__)
 
 MEDIA_RE = re.compile(r'\b(Media|image|video|GIF|sticker|Contact card) omitted\b', re.I)
@@ -41,14 +43,6 @@ class LinkDict(TypedDict):
     target: str
     weight: float
 
-def detect_date_format(first_line: str) -> list[str]:
-    if re.search(r"\[\d{1,2}[.]\d{1,2}[.]\d{4},\s\d{2}:\d{2}:\d{2}\]", first_line):
-        return ["%d.%m.%Y, %H:%M:%S", "%d.%m.%Y, %H:%M"]
-    elif re.search(r"\d{1,2}/\d{1,2}/\d{2,4},\s\d{1,2}:\d{2}", first_line):
-        return ["%m/%d/%y, %H:%M", "%m/%d/%Y, %H:%M"]
-    else:
-        return ["%d/%m/%y, %H:%M", "%d.%m.%Y, %H:%M"]
-
 def parse_date_time(date_str: str | None, time_str: str | None) -> datetime | None:
     if not date_str:
         return None
@@ -141,7 +135,7 @@ def get_network_metrics(original_data, comparison_data, metrics_list):
 
 
 def calculate_sequential_weights(
-    sequence: List[Tuple[str, str]],
+    sequence: MessageTable | List[Tuple[str, str]],
     n_prev: int = 3,
     message_weights: List[float] | None = None
 ) -> Dict[Tuple[str, str], float]:
@@ -157,19 +151,9 @@ def calculate_sequential_weights(
     print(f"Using weights: {message_weights}")
    
 
-    window: deque = deque(maxlen=n_prev)
-    edge_weights: DefaultDict[Tuple[str, str], float] = defaultdict(float)
-
-    for current_sender, _ in sequence:
-        for idx, previous_sender in enumerate(reversed(window)):
-            if previous_sender == current_sender:  
-                continue 
-            
-            edge_weights[(current_sender, previous_sender)] += message_weights[idx]
-        
-        window.append(current_sender)
-
-    return dict(edge_weights)
+    if not isinstance(sequence, MessageTable):
+        sequence = MessageTable.from_messages(sequence)
+    return sequence.sequential_weights(n_prev, message_weights)
 
 
 
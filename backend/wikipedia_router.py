@@ -15,6 +15,7 @@ from analyzers.factory import get_analyzer
 from typing import Optional
 import json
 from graph_builder import build_graph_from_txt
+from compute_service import COMPUTE, STAGE_TIMEOUTS
 from requests.exceptions import HTTPError, RequestException
 
 
@@ -40,9 +41,11 @@ async def fetch_wikipedia_data(request: Request):
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
-        response = requests.get(url, headers=headers)
+        response = await COMPUTE.run("fetch", requests.get, url, headers=headers, timeout=STAGE_TIMEOUTS["fetch"])
         response.raise_for_status()  
 
+    except HTTPException:
+        raise
     except HTTPError as http_err:
         logger.error(f"HTTP error while fetching Wikipedia URL: {http_err}")
         raise HTTPException(
@@ -63,48 +66,7 @@ async def fetch_wikipedia_data(request: Request):
         )
 
     try:
-        soup = BeautifulSoup(response.text, "html.parser")
-        title = soup.find("h1", id="firstHeading").get_text(strip=True)
-        metadata = extract_metadata(soup)
-        content_data = extract_main_content(soup, url)
-
-        discussion_graph = None
-        opinions = {"for": 0, "against": 0, "neutral": 0}
-        opinion_users = {"for": [], "against": [], "neutral": []}
-
-        if content_data and len(content_data) > 0 and 'discussion_graph' in content_data[0]:
-            discussion_graph = content_data[0]['discussion_graph']
-            for section in content_data[0]["sections"]:
-                opinions["for"] += section["opinion_count"]["for"]
-                opinions["against"] += section["opinion_count"]["against"]
-                opinions["neutral"] += section["opinion_count"]["neutral"]
-                for comment in section["comments"]:
-                    username = comment["username"]
-                    opinion = comment["opinion"]
-                    if username not in opinion_users[opinion]:
-                        opinion_users[opinion].append(username)
-
-        result = {
-            "title": title,
-            "url": url,
-            "metadata": metadata,
-            "content": content_data,
-            "opinions": opinions,
-            "opinion_users": opinion_users
-        }
-
-        if discussion_graph:
-            result["nodes"] = discussion_graph["nodes"]
-            result["links"] = discussion_graph["links"]
-            degree_map = {}
-            for link in discussion_graph["links"]:
-                source = link["source"]
-                target = link["target"]
-                degree_map[source] = degree_map.get(source, 0) + 1
-                degree_map[target] = degree_map.get(target, 0) + 1
-            for node in discussion_graph["nodes"]:
-                node_id = node["id"]
-                node["degree"] = degree_map.get(node_id, 0)
+        result = await COMPUTE.run("parse", build_page_result, response.text, url)
 
         target_dir = "uploads"
         os.makedirs(target_dir, exist_ok=True)
@@ -113,9 +75,11 @@ async def fetch_wikipedia_data(request: Request):
         with open(json_path, "w", encoding="utf-8") as f:
             json.dump(result, f, ensure_ascii=False, indent=2)
 
-        logger.info(f"Successfully extracted Wikipedia content for: {title}")
+        logger.info(f"Successfully extracted Wikipedia content for: {result['title']}")
         return result
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching Wikipedia data: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -155,7 +119,9 @@ async def analyze_network(
         start_datetime = None
         end_datetime = None
 
-    graph_data = build_graph_from_txt(
+    graph_data = await COMPUTE.run(
+        "graph",
+        build_graph_from_txt,
         txt_path,
         limit=limit,
         limit_type=limit_type,
@@ -182,6 +148,53 @@ async def analyze_network(
     }
 
 
+def build_page_result(html, url):
+    soup = BeautifulSoup(html, "html.parser")
+    title = soup.find("h1", id="firstHeading").get_text(strip=True)
+    metadata = extract_metadata(soup)
+    content_data = extract_main_content(soup, url)
+
+    discussion_graph = None
+    opinions = {"for": 0, "against": 0, "neutral": 0}
+    opinion_users = {"for": [], "against": [], "neutral": []}
+
+    if content_data and len(content_data) > 0 and 'discussion_graph' in content_data[0]:
+        discussion_graph = content_data[0]['discussion_graph']
+        for section in content_data[0]["sections"]:
+            opinions["for"] += section["opinion_count"]["for"]
+            opinions["against"] += section["opinion_count"]["against"]
+            opinions["neutral"] += section["opinion_count"]["neutral"]
+            for comment in section["comments"]:
+                username = comment["username"]
+                opinion = comment["opinion"]
+                if username not in opinion_users[opinion]:
+                    opinion_users[opinion].append(username)
+
+    result = {
+        "title": title,
+        "url": url,
+        "metadata": metadata,
+        "content": content_data,
+        "opinions": opinions,
+        "opinion_users": opinion_users
+    }
+
+    if discussion_graph:
+        result["nodes"] = discussion_graph["nodes"]
+        result["links"] = discussion_graph["links"]
+        degree_map = {}
+        for link in discussion_graph["links"]:
+            source = link["source"]
+            target = link["target"]
+            degree_map[source] = degree_map.get(source, 0) + 1
+            degree_map[target] = degree_map.get(target, 0) + 1
+        for node in discussion_graph["nodes"]:
+            node_id = node["id"]
+            node["degree"] = degree_map.get(node_id, 0)
+
+    return result
+
+
 def extract_metadata(soup):
     metadata = {}
     last_modified = soup.find("li", id="footer-info-lastmod")
@@ -731,7 +744,7 @@ async def convert_wikipedia_to_txt(request: Request):
     with open(txt_path, "w", encoding="utf-8") as txt_file:
         txt_file.write("\n".join(txt_lines))
 
-    graph_data = build_graph_from_txt(txt_path)
+    graph_data = await COMPUTE.run("graph", build_graph_from_txt, txt_path)
 
     return {
         "message": "TXT created with clean user names and reply info",
@@ -778,7 +791,12 @@ async def analyze_communities(
     start_date: Optional[str] = Query(None),
     start_time: Optional[str] = Query(None),
     end_date: Optional[str] = Query(None),
-    end_time: Optional[str] = Query(None)
+    end_time: Optional[str] = Query(None),
+    sample_seed: Optional[int] = Query(None),
+    deadline_ms: Optional[int] = Query(None, gt=0),
+    num_communities: Optional[int] = Query(None, ge=1),
+    seed: Optional[int] = Query(None),
+    resolution: Optional[float] = Query(None, gt=0)
 ):
     analyzer = get_analyzer(platform)
     return await analyzer.detect_communities(
@@ -799,5 +817,10 @@ async def analyze_communities(
         start_date=start_date,
         start_time=start_time,
         end_date=end_date,
-        end_time=end_time
+        end_time=end_time,
+        sample_seed=sample_seed,
+        deadline_ms=deadline_ms,
+        num_communities=num_communities,
+        seed=seed,
+        resolution=resolution
     )
\ No newline at end of file
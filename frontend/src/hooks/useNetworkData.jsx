@@ -56,6 +56,7 @@ export const useNetworkData = (research) => {
                 body: JSON.stringify({
                     nodes: networkData.nodes,
                     links: networkData.links,
+                    seed: research.filters?.community_seed ?? null,
                 }),
             });
             